@@ -1,25 +1,9 @@
 from typing import AsyncGenerator
 from fastapi import Depends
 from fastapi_users.db import SQLAlchemyUserDatabase
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import engine, get_session
 from .models import User, Base
-from .config import get_settings
-
-settings = get_settings()
-
-# Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True,
-)
-
-# Create async session factory
-async_session_maker = sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
 
 async def create_db_and_tables():
     """Create database and tables"""
@@ -27,8 +11,8 @@ async def create_db_and_tables():
         await conn.run_sync(Base.metadata.create_all)
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
-    """Get async database session"""
-    async with async_session_maker() as session:
+    """Get async database session from the shared application pool"""
+    async for session in get_session():
         yield session
 
 async def get_user_db(session: AsyncSession = Depends(get_async_session)):
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional, Set
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.core.cache import LRUCache, redis_client
+from app.models.user import User
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# User attributes whose change must drop any cached principal for that user
+SECURITY_ATTRIBUTES = ("email", "is_active", "hashed_password", "mfa_enabled", "mfa_secret")
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated user snapshot that is safe to share across requests"""
+    id: Any
+    email: str
+    is_active: bool
+    is_superuser: bool
+    is_verified: bool
+    mfa_enabled: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            is_active=user.is_active,
+            is_superuser=user.is_superuser,
+            is_verified=user.is_verified,
+            mfa_enabled=user.mfa_enabled,
+        )
+
+class PrincipalCache:
+    """Short-lived cache of verified token subjects and the users behind them
+
+    Entries are dropped locally and on every other worker (via Redis pub/sub)
+    when a user's security-relevant attributes change.
+    """
+    def __init__(self, max_entries: int, ttl: int, channel: str):
+        self.tokens = LRUCache(max_entries, ttl)      # token -> subject (email)
+        self.principals = LRUCache(max_entries, ttl)  # subject -> Principal
+        self.channel = channel
+
+    def invalidate_local(self, subject: str) -> None:
+        self.principals.pop(subject)
+
+    async def publish(self, subject: str) -> None:
+        """Tell the other workers to drop a user's principal"""
+        try:
+            await redis_client.publish(self.channel, subject)
+        except RedisError as exc:
+            logger.warning(f"Failed to publish principal invalidation: {exc}")
+
+    async def invalidate(self, subject: str) -> None:
+        """Drop a user's principal in this worker and broadcast to the others"""
+        self.invalidate_local(subject)
+        await self.publish(subject)
+
+    async def listen(self) -> None:
+        """Apply invalidations published by other workers until cancelled"""
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.invalidate_local(message["data"].decode())
+            except RedisError as exc:
+                # Entries may be stale while disconnected, bounded by the TTL
+                logger.warning(f"Principal invalidation listener lost Redis: {exc}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.close()
+
+    def stats(self) -> dict:
+        return {
+            "tokens": self.tokens.stats(),
+            "principals": self.principals.stats(),
+        }
+
+# Create a singleton instance
+principal_cache = PrincipalCache(
+    settings.AUTH_CACHE_MAX_ENTRIES,
+    settings.AUTH_CACHE_TTL,
+    settings.AUTH_INVALIDATION_CHANNEL,
+)
+
+_PENDING_KEY = "principal_invalidations"
+# The event loop only keeps weak references to tasks; hold publishes until done
+_publish_tasks: Set[asyncio.Task] = set()
+
+def _publish_done(task: asyncio.Task) -> None:
+    _publish_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Principal invalidation publish failed", exc_info=task.exception())
+
+@event.listens_for(Session, "after_flush")
+def _collect_user_changes(session: Session, flush_context: Any) -> None:
+    """Remember users whose security attributes changed in this transaction"""
+    pending: Optional[Set[str]] = None
+    for obj in list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, User):
+            continue
+        state = inspect(obj)
+        histories = [state.attrs[name].history for name in SECURITY_ATTRIBUTES]
+        if obj not in session.deleted and not any(h.has_changes() for h in histories):
+            continue
+        pending = session.info.setdefault(_PENDING_KEY, set())
+        pending.add(obj.email)
+        # A changed email must also drop the principal cached under the old one
+        pending.update(email for email in histories[0].deleted if email)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    subjects = session.info.pop(_PENDING_KEY, None)
+    if not subjects:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    for subject in subjects:
+        principal_cache.invalidate_local(subject)
+        if loop is not None:
+            task = loop.create_task(principal_cache.publish(subject))
+            _publish_tasks.add(task)
+            task.add_done_callback(_publish_done)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -12,7 +12,9 @@ from app.config import get_settings
 from sqlalchemy.orm import Session
 from app.auth.schemas import UserCreate, UserUpdate
 from app.core.security import get_password_hash, verify_password
+from app.auth.principal_cache import Principal, principal_cache
 import pyotp
+import time
 from uuid import UUID
 
 settings = get_settings()
@@ -114,6 +116,7 @@ class UserManager:
         user.mfa_enabled = True
         user.mfa_secret = secret
         self.db.commit()
+        await principal_cache.invalidate(user.email)
         return secret, provisioning_uri
 
     async def verify_mfa(self, user_id: UUID, code: str) -> bool:
@@ -132,11 +135,54 @@ class UserManager:
         user.mfa_enabled = False
         user.mfa_secret = None
         self.db.commit()
+        await principal_cache.invalidate(user.email)
 
 async def get_user_manager(session: AsyncSession = Depends(get_session)) -> UserManager:
     """Get user manager dependency"""
     return UserManager(session)
 
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_session)
+) -> Principal:
+    """Resolve the bearer token to a user, served from the principal cache when possible"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    subject = principal_cache.tokens.get(token)
+    if subject is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            raise credentials_exception
+        subject = payload.get("sub")
+        if not subject:
+            raise credentials_exception
+        # Never cache a token past its own expiry
+        remaining = payload.get("exp", time.time() + settings.AUTH_CACHE_TTL) - time.time()
+        principal_cache.tokens.set(token, subject, ttl=min(settings.AUTH_CACHE_TTL, remaining))
+
+    principal = principal_cache.principals.get(subject)
+    if principal is None:
+        user = await session.scalar(select(User).where(User.email == subject))
+        if user is None:
+            raise credentials_exception
+        principal = Principal.from_user(user)
+        principal_cache.principals.set(subject, principal)
+
+    if not principal.is_active:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
+    return principal
+
+async def get_current_superuser(current_user: Principal = Depends(get_current_user)) -> Principal:
+    """Require an active superuser, for operational endpoints"""
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough privileges")
+    return current_user
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
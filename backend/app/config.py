@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-from typing import Optional
+from typing import List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -16,6 +16,80 @@ class Settings(BaseSettings):
     POSTGRES_PORT: str = "5432"
     POSTGRES_DB: str = "budget_app"
 
+    # Connection pool settings (per worker process)
+    DB_POOL_SIZE: int = 10          # persistent connections kept open
+    DB_MAX_OVERFLOW: int = 10       # extra connections allowed under burst load
+    DB_POOL_RECYCLE: int = 1800     # seconds before a connection is replaced
+    DB_POOL_TIMEOUT: float = 5.0    # seconds to wait for a free connection
+    DB_POOL_PRE_PING: bool = True   # validate connections on checkout
+
+    # Read replicas (JSON list of DSNs); empty means all reads use the primary
+    DATABASE_REPLICA_URLS: List[str] = []
+    REPLICA_HEALTH_CHECK_INTERVAL: int = 15  # seconds between replica probes
+    REPLICA_HEALTH_CHECK_TIMEOUT: float = 2  # seconds before a probe counts as failed
+    READ_AFTER_WRITE_SECONDS: int = 5        # pin a user to the primary after a write
+
+    # Bulk endpoints
+    BULK_MAX_ITEMS: int = 500  # rows accepted per bulk request
+
+    # Dashboard
+    DASHBOARD_MAX_DAYS: int = 731  # widest date range one request may cover
+
+    # Balance projection cache
+    PROJECTION_CACHE_MAX_USERS: int = 1000  # users whose series are kept per worker
+    PROJECTION_CACHE_TTL: int = 900  # seconds before a user's series is reloaded
+    PROJECTION_INVALIDATION_CHANNEL: str = "projection:invalidate"
+
+    # Recurring due bill expansion
+    RECURRENCE_HORIZON_DAYS: int = 366   # how far ahead occurrences are created
+    RECURRENCE_INSERT_BATCH: int = 1000  # rows per multi-row INSERT
+    RECURRENCE_RULE_CACHE_SIZE: int = 10000  # compiled calculations kept per worker
+
+    # Hourly balance update job
+    BALANCE_UPDATE_LOOKBACK_HOURS: int = 48   # paid bills considered per run
+    BALANCE_UPDATE_CHUNK_USERS: int = 500     # users per statement and commit
+
+    # Audit log retention
+    AUDIT_RETENTION_DAYS: int = 90
+    AUDIT_PARTITION_MONTHS_AHEAD: int = 3     # monthly partitions created in advance
+    AUDIT_DELETE_BATCH_SIZE: int = 5000       # rows per DELETE when trimming row by row
+    AUDIT_DELETE_SLEEP_SECONDS: float = 0.5   # pause between delete batches
+    AUDIT_LOCK_TIMEOUT_MS: int = 5000         # give up on partition DDL rather than queue
+
+    # Cluster-safe job scheduler (cron expressions are in UTC)
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_JITTER_SECONDS: float = 30.0    # random delay after each slot
+    SCHEDULER_ENQUEUE_TIMEOUT_SECONDS: float = 60.0  # a scheduled run only enqueues its job
+    BALANCE_UPDATE_CRON: str = "0 * * * *"
+    AUDIT_RETENTION_CRON: str = "30 3 * * *"
+    RECURRENCE_EXPANSION_CRON: str = "0 2 * * *"
+
+    # Background job queue (python -m app.worker)
+    JOB_WORKER_CONCURRENCY: int = 4           # jobs run at once per worker process
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0    # idle wait before checking the queue again
+    JOB_MAX_ATTEMPTS: int = 5                 # then the job is dead-lettered
+    JOB_TIMEOUT_SECONDS: int = 3600           # default per-attempt limit
+    JOB_BACKOFF_BASE_SECONDS: float = 10.0    # doubled after each failed attempt
+    JOB_BACKOFF_MAX_SECONDS: float = 3600.0
+    JOB_REAP_INTERVAL_SECONDS: int = 60       # expired lease recovery and cleanup
+    JOB_RETENTION_DAYS: int = 7               # succeeded jobs kept for metrics
+
+    # Application-side audit writer for AuditLogMixin models
+    AUDIT_WRITER_MODE: str = "off"           # off, transaction, outbox or buffered
+    AUDIT_FLUSH_SIZE: int = 500              # rows per multi-row insert / outbox batch
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 2.0
+    AUDIT_BUFFER_MAX: int = 50000            # buffered mode only; oldest dropped beyond
+
+    # Drag-and-drop ordering
+    PRIORITY_GAP: int = 1024  # spacing between priorities after a rebalance
+    PRIORITY_REBALANCE_WINDOW: int = 32  # rows on each side of a move respaced first
+
+    # Streaming list responses (Accept: application/x-ndjson)
+    STREAM_YIELD_PER: int = 500  # rows fetched per server-side cursor batch
+
+    # Sparse fieldsets (?fields=)
+    PARTIAL_SCHEMA_CACHE_SIZE: int = 256  # partial response schemas kept per process
+
     # Encryption Settings
     ENCRYPTION_KEY: str = os.getenv("ENCRYPTION_KEY", "your-encryption-key-here")  # Change this in production
     ENCRYPTION_ALGORITHM: str = "aes-256-cbc"
@@ -45,6 +119,11 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Authenticated principal cache
+    AUTH_CACHE_TTL: int = 30               # seconds a resolved user stays cached
+    AUTH_CACHE_MAX_ENTRIES: int = 10000    # tokens and users kept per worker
+    AUTH_INVALIDATION_CHANNEL: str = "auth:invalidate"
+
     # Frontend settings
     FRONTEND_URL: str = "http://localhost:3000"  # Default frontend URL
 
@@ -52,10 +131,16 @@ class Settings(BaseSettings):
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: Optional[str] = None
+    REDIS_MAX_CONNECTIONS: int = 50  # per worker connection pool
+
+    # Response cache settings
+    RESPONSE_CACHE_ENABLED: bool = True  # global switch for routers that opt in
+    RESPONSE_CACHE_TTL: int = 300        # seconds a cached list response lives
 
     # Rate limiting settings
-    RATE_LIMIT_USER: int = 100  # requests per minute per user
-    RATE_LIMIT_IP: int = 200    # requests per minute per IP
+    RATE_LIMIT_USER: int = 100  # requests per window per user
+    RATE_LIMIT_IP: int = 200    # requests per window per IP
+    RATE_LIMIT_WINDOW_SECONDS: int = 60  # sliding window length
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Tuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Monthly partitions are named audit_log_pYYYYMM and cover that UTC month
+PARTITION_PREFIX = "audit_log_p"
+# Partitions that can hold rows of any age and so are trimmed row by row
+UNBOUNDED_PARTITIONS = ("audit_log_legacy", "audit_log_default")
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return day.replace(year=day.year + month // 12, month=month % 12 + 1, day=1)
+
+def partition_name(month: date) -> str:
+    return f"{PARTITION_PREFIX}{month:%Y%m}"
+
+async def is_partitioned(session: AsyncSession) -> bool:
+    relkind = await session.scalar(
+        text("SELECT relkind FROM pg_class WHERE oid = 'audit_log'::regclass")
+    )
+    return relkind == "p"
+
+async def _partitions(session: AsyncSession) -> List[str]:
+    result = await session.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = 'audit_log'::regclass"
+    ))
+    return list(result.scalars())
+
+async def _is_empty(session: AsyncSession, table: str) -> bool:
+    return not await session.scalar(text(f"SELECT EXISTS (SELECT 1 FROM {table})"))
+
+async def create_partitions(session: AsyncSession, months_ahead: int) -> List[str]:
+    """Create monthly partitions from this month to months_ahead months out"""
+    existing = set(await _partitions(session))
+    created = []
+    current = month_start(datetime.now(timezone.utc).date())
+    monthly = sorted(name for name in existing if name.startswith(PARTITION_PREFIX))
+    if "audit_log_legacy" in existing and monthly:
+        # Months before the first monthly partition are still in the legacy
+        # range, and a partition overlapping it cannot be created
+        first = datetime.strptime(monthly[0][len(PARTITION_PREFIX):], "%Y%m").date()
+        current = max(current, first)
+    for offset in range(months_ahead + 1):
+        start = add_months(current, offset)
+        name = partition_name(start)
+        if name in existing:
+            continue
+        # Short lock_timeout: give up and retry next run rather than queue
+        # behind a long query while blocking audit writes
+        await session.execute(text(f"SET LOCAL lock_timeout = '{settings.AUDIT_LOCK_TIMEOUT_MS}ms'"))
+        await session.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF audit_log "
+            f"FOR VALUES FROM ('{start.isoformat()} 00:00:00+00') "
+            f"TO ('{add_months(start, 1).isoformat()} 00:00:00+00')"
+        ))
+        await session.commit()
+        created.append(name)
+    return created
+
+async def drop_expired_partitions(session: AsyncSession, cutoff: datetime) -> List[str]:
+    """Drop monthly partitions whose whole month is older than cutoff"""
+    dropped = []
+    for name in sorted(await _partitions(session)):
+        if not name.startswith(PARTITION_PREFIX):
+            continue
+        month = datetime.strptime(name[len(PARTITION_PREFIX):], "%Y%m").date()
+        month_end = datetime.combine(add_months(month, 1), datetime.min.time(), timezone.utc)
+        if month_end > cutoff:
+            continue
+        await session.execute(text(f"SET LOCAL lock_timeout = '{settings.AUDIT_LOCK_TIMEOUT_MS}ms'"))
+        await session.execute(text(f"ALTER TABLE audit_log DETACH PARTITION {name}"))
+        await session.execute(text(f"DROP TABLE {name}"))
+        await session.commit()
+        dropped.append(name)
+    return dropped
+
+async def delete_in_batches(session: AsyncSession, table: str, cutoff: datetime) -> int:
+    """Delete rows older than cutoff AUDIT_DELETE_BATCH_SIZE at a time
+
+    Each batch picks its rows through the created_at index and deletes them
+    by ctid in its own short transaction, then sleeps so autovacuum and
+    replicas keep up. Nothing is loaded into Python.
+    """
+    statement = text(
+        f"DELETE FROM {table} WHERE ctid IN ("
+        f"SELECT ctid FROM {table} WHERE created_at < :cutoff LIMIT :batch_size)"
+    )
+    deleted = 0
+    while True:
+        result = await session.execute(
+            statement,
+            {"cutoff": cutoff, "batch_size": settings.AUDIT_DELETE_BATCH_SIZE}
+        )
+        await session.commit()
+        deleted += result.rowcount
+        if result.rowcount < settings.AUDIT_DELETE_BATCH_SIZE:
+            return deleted
+        await asyncio.sleep(settings.AUDIT_DELETE_SLEEP_SECONDS)
+
+async def enforce_audit_retention(session: AsyncSession) -> Tuple[List[str], int]:
+    """Apply AUDIT_RETENTION_DAYS to audit_log and audit_change
+
+    With the monthly partitioning migration applied, expired months are
+    dropped whole and upcoming months are created ahead of time; only the
+    legacy and default partitions are trimmed row by row. Before it, the
+    whole table is trimmed row by row.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.AUDIT_RETENTION_DAYS)
+    # The single-row JSONB trail is small enough to trim row by row
+    changes_deleted = 0
+    if await session.scalar(text("SELECT to_regclass('audit_change') IS NOT NULL")):
+        changes_deleted = await delete_in_batches(session, "audit_change", cutoff)
+    if not await is_partitioned(session):
+        await session.commit()
+        return [], changes_deleted + await delete_in_batches(session, "audit_log", cutoff)
+
+    await create_partitions(session, settings.AUDIT_PARTITION_MONTHS_AHEAD)
+    dropped = await drop_expired_partitions(session, cutoff)
+    existing = set(await _partitions(session))
+    await session.commit()
+    deleted = changes_deleted
+    for name in UNBOUNDED_PARTITIONS:
+        if name in existing:
+            deleted += await delete_in_batches(session, name, cutoff)
+    if "audit_log_legacy" in existing and await _is_empty(session, "audit_log_legacy"):
+        # Everything attached by the migration has aged out; later rows in
+        # its old range (back-dated writes) fall through to the default
+        await session.execute(text(f"SET LOCAL lock_timeout = '{settings.AUDIT_LOCK_TIMEOUT_MS}ms'"))
+        await session.execute(text("ALTER TABLE audit_log DETACH PARTITION audit_log_legacy"))
+        await session.execute(text("DROP TABLE audit_log_legacy"))
+        await session.commit()
+        dropped.append("audit_log_legacy")
+    return dropped, deleted
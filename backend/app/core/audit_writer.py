@@ -0,0 +1,258 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, event, insert, inspect, select
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.database import async_session_maker
+from app.models.audit_change import AuditChange
+from app.models.audit_outbox import AuditOutbox
+from app.models.base import AuditLogMixin
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Durability modes for AUDIT_WRITER_MODE
+MODE_OFF = "off"
+MODE_TRANSACTION = "transaction"  # audit_change rows written before the commit
+MODE_OUTBOX = "outbox"            # unindexed outbox rows before the commit, moved later
+MODE_BUFFERED = "buffered"        # in-process buffer after the commit; lost on a crash
+MODES = (MODE_OFF, MODE_TRANSACTION, MODE_OUTBOX, MODE_BUFFERED)
+
+# Never written to the trail
+EXCLUDED_COLUMNS = {"id", "created_at", "updated_at"}
+
+_PENDING_KEY = "audit_pending"
+
+def diff_values(before: Dict[str, Any], after: Dict[str, Any], excluded=()) -> Dict[str, List[Any]]:
+    """[before, after] for each field whose JSON value differs"""
+    before = jsonable_encoder(before)
+    after = jsonable_encoder(after)
+    return {
+        key: [before.get(key), after.get(key)]
+        for key in before.keys() | after.keys()
+        if key not in EXCLUDED_COLUMNS
+        and key not in excluded
+        and before.get(key) != after.get(key)
+    }
+
+class AuditWriter:
+    """Application-side audit trail for AuditLogMixin models
+
+    Changes are captured per session (from flushes, or recorded directly by
+    code that writes with bulk statements) and written according to the
+    mode: in the same transaction, via the outbox, or from an in-process
+    buffer flushed by the run() task on size or time.
+    """
+    def __init__(self, mode: str, flush_size: int, flush_interval: float, buffer_max: int):
+        if mode not in MODES:
+            raise ValueError(f"AUDIT_WRITER_MODE must be one of {MODES}, got '{mode}'")
+        self.mode = mode
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.buffer_max = buffer_max
+        self._buffer: List[Dict[str, Any]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != MODE_OFF
+
+    def record(
+        self,
+        session: Session,
+        table_name: str,
+        user_id: Any,
+        row_id: Any,
+        action: str,
+        before: Dict[str, Any],
+        after: Dict[str, Any],
+        excluded=()
+    ) -> None:
+        """Queue one change on the session; it is written when the session commits"""
+        changes = diff_values(before, after, excluded)
+        if not changes:
+            return
+        session.info.setdefault(_PENDING_KEY, []).append({
+            "user_id": user_id,
+            "table_name": table_name,
+            "row_id": str(row_id),
+            "action": action,
+            "changes": changes,
+        })
+
+    def _write_pending(self, session: Session) -> None:
+        """before_commit: write queued rows inside the committing transaction"""
+        if self.mode not in (MODE_TRANSACTION, MODE_OUTBOX):
+            return
+        rows = session.info.pop(_PENDING_KEY, None)
+        if not rows:
+            return
+        table = AuditChange.__table__ if self.mode == MODE_TRANSACTION else AuditOutbox.__table__
+        # Core insert on the session's connection: no flush, no ORM events
+        session.connection().execute(insert(table), rows)
+        self.written += len(rows)
+        if self.mode == MODE_OUTBOX:
+            self._wake()
+
+    def _hand_off(self, session: Session) -> None:
+        """after_commit: move queued rows into the buffer (buffered mode)"""
+        rows = session.info.pop(_PENDING_KEY, None)
+        if not rows or self.mode != MODE_BUFFERED:
+            return
+        self._buffer.extend(rows)
+        overflow = len(self._buffer) - self.buffer_max
+        if overflow > 0:
+            # Bounded memory: drop the oldest and say so
+            del self._buffer[:overflow]
+            self.dropped += overflow
+            logger.error(f"Audit buffer full; dropped {overflow} changes")
+        if len(self._buffer) >= self.flush_size:
+            self._wake()
+
+    def _wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def flush_buffer(self) -> int:
+        """Write buffered changes as multi-row inserts; failed batches are kept"""
+        flushed = 0
+        while self._buffer:
+            batch = self._buffer[:self.flush_size]
+            del self._buffer[:len(batch)]
+            try:
+                async with async_session_maker() as session:
+                    await session.execute(insert(AuditChange.__table__), batch)
+                    await session.commit()
+            except Exception as exc:
+                self._buffer[:0] = batch
+                self.failed_flushes += 1
+                logger.warning(f"Audit buffer flush failed, will retry: {exc}")
+                break
+            flushed += len(batch)
+            self.written += len(batch)
+        return flushed
+
+    async def relay_outbox(self) -> int:
+        """Move outbox rows into audit_change, flush_size rows per statement
+
+        DELETE ... RETURNING feeds the INSERT in one statement, so a row is
+        either still in the outbox or in audit_change. SKIP LOCKED lets
+        every worker relay at once without blocking on each other.
+        """
+        columns = ["user_id", "table_name", "row_id", "action", "changes", "created_at"]
+        relayed = 0
+        while True:
+            claimed = (
+                select(AuditOutbox.id)
+                .order_by(AuditOutbox.id)
+                .limit(self.flush_size)
+                .with_for_update(skip_locked=True)
+            )
+            moved = (
+                delete(AuditOutbox)
+                .where(AuditOutbox.id.in_(claimed))
+                .returning(*(getattr(AuditOutbox, name) for name in columns))
+                .cte("moved")
+            )
+            statement = (
+                insert(AuditChange)
+                .from_select(columns, select(*(moved.c[name] for name in columns)))
+                .returning(AuditChange.id)
+            )
+            async with async_session_maker() as session:
+                result = await session.execute(statement)
+                count = len(result.all())
+                await session.commit()
+            relayed += count
+            if count < self.flush_size:
+                return relayed
+
+    async def run(self) -> None:
+        """Flush on size or every flush_interval seconds until cancelled"""
+        self._wakeup = asyncio.Event()
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                if self.mode == MODE_BUFFERED:
+                    await self.flush_buffer()
+                elif self.mode == MODE_OUTBOX:
+                    await self.relay_outbox()
+            except Exception as exc:
+                logger.warning(f"Audit writer flush failed: {exc}")
+
+    async def close(self) -> None:
+        """Write whatever is still buffered (called on shutdown)"""
+        if self.mode == MODE_BUFFERED:
+            await self.flush_buffer()
+            if self._buffer:
+                logger.error(f"Shutting down with {len(self._buffer)} unwritten audit changes")
+        elif self.mode == MODE_OUTBOX:
+            await self.relay_outbox()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "buffered": len(self._buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes,
+        }
+
+# Create a singleton instance
+audit_writer = AuditWriter(
+    settings.AUDIT_WRITER_MODE,
+    settings.AUDIT_FLUSH_SIZE,
+    settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    settings.AUDIT_BUFFER_MAX,
+)
+
+def _column_values(obj: Any) -> Dict[str, Any]:
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+@event.listens_for(Session, "after_flush")
+def _capture_flushed_changes(session: Session, flush_context: Any) -> None:
+    """Record unit-of-work changes to AuditLogMixin models"""
+    if not audit_writer.enabled:
+        return
+    for obj in session.new:
+        if isinstance(obj, AuditLogMixin):
+            audit_writer.record(session, obj.__tablename__, obj.user_id, obj.id, "add", {}, _column_values(obj))
+    for obj in session.dirty:
+        if not isinstance(obj, AuditLogMixin) or not session.is_modified(obj):
+            continue
+        before, after = {}, {}
+        for attr in inspect(obj).mapper.column_attrs:
+            history = inspect(obj).attrs[attr.key].history
+            if history.has_changes():
+                before[attr.key] = history.deleted[0] if history.deleted else None
+                after[attr.key] = history.added[0] if history.added else None
+        audit_writer.record(session, obj.__tablename__, obj.user_id, obj.id, "update", before, after)
+    for obj in session.deleted:
+        if isinstance(obj, AuditLogMixin):
+            audit_writer.record(session, obj.__tablename__, obj.user_id, obj.id, "delete", _column_values(obj), {})
+
+@event.listens_for(Session, "before_commit")
+def _write_before_commit(session: Session) -> None:
+    if audit_writer.enabled:
+        # before_commit fires ahead of commit's own final flush; flush now so
+        # its changes are captured before the pending rows are written
+        session.flush()
+        audit_writer._write_pending(session)
+
+@event.listens_for(Session, "after_commit")
+def _hand_off_committed(session: Session) -> None:
+    if audit_writer.enabled:
+        audit_writer._hand_off(session)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -1,114 +1,155 @@
-from fastapi import BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime, timedelta
-from typing import List
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, List
+from app.config import get_settings
+from app.core.audit_retention import enforce_audit_retention
+from app.core.cache import response_cache
+from app.core.jobs import job_handler
+from app.core.projection import projection_cache
+from app.core.recurrence import expand_due_bills
+from app.models.applied_payment import AppliedPayment
 from app.models.due_bills import DueBill
 from app.models.bank_account_instance import BankAccountInstance
-from app.models.recurrence import Recurrence
-from sqlalchemy import select, and_
+from sqlalchemy import select, case, false, func
+from sqlalchemy.dialects.postgresql import insert
 
-async def calculate_next_due_bill(
-    db: AsyncSession,
-    due_bill: DueBill,
-    background_tasks: BackgroundTasks
-) -> None:
-    """Calculate and create the next due bill based on recurrence pattern"""
-    if not due_bill.recurrence:
-        return
+settings = get_settings()
+logger = logging.getLogger(__name__)
 
-    # Get the recurrence pattern
-    recurrence = await db.get(Recurrence, due_bill.recurrence_id)
-    if not recurrence:
-        return
+@job_handler("recurrence.expand", timeout_seconds=2 * 60 * 60)
+async def expand_recurring_due_bills(db: AsyncSession) -> None:
+    """Create due bills for every recurring bill up to the horizon"""
+    through = date.today() + timedelta(days=settings.RECURRENCE_HORIZON_DAYS)
+    inserted = await expand_due_bills(db, through)
+    logger.info(f"Created {inserted} recurring due bills through {through}")
 
-    # Calculate next due date based on recurrence pattern
-    next_due_date = calculate_next_date(due_bill.due_date, recurrence.pattern)
+def _apply_payments_statement(user_ids: List[Any], since: datetime):
+    """Claim new payments and write one new balance per affected account
 
-    # Create new due bill
-    new_due_bill = DueBill(
-        bill_id=due_bill.bill_id,
-        due_date=next_due_date,
-        amount=due_bill.amount,
-        status_id=due_bill.status_id,
-        recurrence_id=due_bill.recurrence_id,
-        user_id=due_bill.user_id
+    A single statement: the claimed CTE inserts unapplied paid bills into
+    applied_payment (ON CONFLICT skips ones a previous run already took),
+    totals sums them per account, latest picks each account's current
+    balance (the newest dated on or before today) with DISTINCT ON, and
+    the outer INSERT writes the new instances. Work is proportional to
+    changed accounts, not bills.
+    """
+    has_balance = (
+        select(BankAccountInstance.id)
+        .where(
+            BankAccountInstance.bank_account == DueBill.draft_account,
+            BankAccountInstance.archived == False,
+            # Same bound as latest, so no payment is claimed without a balance to deduct it from
+            BankAccountInstance.due_date <= func.current_date(),
+        )
+        .exists()
     )
-
-    db.add(new_due_bill)
-    await db.commit()
-
-def calculate_next_date(current_date: datetime, pattern: str) -> datetime:
-    """Calculate next date based on recurrence pattern"""
-    if pattern == "monthly":
-        return current_date + timedelta(days=30)
-    elif pattern == "biweekly":
-        return current_date + timedelta(days=14)
-    elif pattern == "weekly":
-        return current_date + timedelta(days=7)
-    elif pattern == "annually":
-        return current_date + timedelta(days=365)
-    else:
-        # Handle custom patterns (e.g., "every 3 months")
-        try:
-            num, unit = pattern.split()
-            num = int(num)
-            if unit == "months":
-                return current_date + timedelta(days=30 * num)
-            elif unit == "days":
-                return current_date + timedelta(days=num)
-            else:
-                return current_date + timedelta(days=30)  # Default to monthly
-        except:
-            return current_date + timedelta(days=30)  # Default to monthly
-
-async def update_bank_account_balances(
-    db: AsyncSession,
-    background_tasks: BackgroundTasks
-) -> None:
-    """Update bank account balances based on paid bills"""
-    # Get all paid bills within the last 24 hours
-    yesterday = datetime.utcnow() - timedelta(days=1)
-    query = select(DueBill).where(
-        and_(
-            DueBill.status_id == 2,  # Assuming 2 is the ID for "Paid" status
-            DueBill.updated_at >= yesterday
+    claimed = (
+        insert(AppliedPayment)
+        .from_select(
+            ["id", "user_id", "bank_account", "amount"],
+            select(DueBill.id, DueBill.user_id, DueBill.draft_account, DueBill.total_amount_due)
+            .where(
+                DueBill.user_id.in_(user_ids),
+                DueBill.pay_date.isnot(None),
+                DueBill.draft_account.isnot(None),
+                DueBill.archived == False,
+                DueBill.updated_at >= since,
+                has_balance,
+            )
         )
+        .on_conflict_do_nothing(index_elements=[AppliedPayment.id])
+        .returning(AppliedPayment.user_id, AppliedPayment.bank_account, AppliedPayment.amount)
+        .cte("claimed")
+    )
+    totals = (
+        select(
+            claimed.c.user_id,
+            claimed.c.bank_account,
+            func.sum(claimed.c.amount).label("paid"),
+        )
+        .group_by(claimed.c.user_id, claimed.c.bank_account)
+        .cte("totals")
+    )
+    latest = (
+        select(
+            BankAccountInstance.bank_account,
+            BankAccountInstance.due_date,
+            BankAccountInstance.priority,
+            BankAccountInstance.current_balance,
+        )
+        .where(
+            BankAccountInstance.bank_account.in_(select(totals.c.bank_account)),
+            BankAccountInstance.archived == False,
+            # A future-dated balance is a plan, not the current balance;
+            # starting from it would drop every earlier run's deduction
+            BankAccountInstance.due_date <= func.current_date(),
+        )
+        .distinct(BankAccountInstance.bank_account)
+        .order_by(
+            BankAccountInstance.bank_account,
+            BankAccountInstance.due_date.desc(),
+            BankAccountInstance.priority.desc(),
+            BankAccountInstance.id.desc(),
+        )
+        .cte("latest")
+    )
+    today = func.current_date()
+    return (
+        insert(BankAccountInstance)
+        .from_select(
+            ["user_id", "bank_account", "due_date", "priority", "current_balance", "archived"],
+            select(
+                totals.c.user_id,
+                totals.c.bank_account,
+                today,
+                # Sort after the balance it replaces when both fall on today
+                case(
+                    (latest.c.due_date == today, latest.c.priority + settings.PRIORITY_GAP),
+                    else_=0,
+                ),
+                latest.c.current_balance - totals.c.paid,
+                false(),
+            )
+            .join(latest, latest.c.bank_account == totals.c.bank_account)
+        )
+        .returning(BankAccountInstance.user_id)
     )
-    result = await db.execute(query)
-    paid_bills = result.scalars().all()
-
-    # Update bank account balances
-    for bill in paid_bills:
-        if bill.draft_account_id:
-            # Get the latest bank account instance
-            query = select(BankAccountInstance).where(
-                BankAccountInstance.bank_account_id == bill.draft_account_id
-            ).order_by(BankAccountInstance.created_at.desc())
-            result = await db.execute(query)
-            latest_instance = result.scalars().first()
 
-            if latest_instance:
-                # Create new instance with updated balance
-                new_instance = BankAccountInstance(
-                    bank_account_id=bill.draft_account_id,
-                    balance=latest_instance.balance - bill.amount,
-                    user_id=bill.user_id
-                )
-                db.add(new_instance)
+# Finishes before the next hourly run is due
+@job_handler("balances.update", timeout_seconds=55 * 60)
+async def update_bank_account_balances(db: AsyncSession) -> None:
+    """Deduct newly paid bills from their draft accounts' balances
 
-    await db.commit()
+    Users with payments in the lookback window are processed
+    BALANCE_UPDATE_CHUNK_USERS at a time, one statement and one commit per
+    chunk. applied_payment records what has been deducted, so a rerun after
+    a crash continues where the last committed chunk stopped.
+    """
+    since = datetime.now(timezone.utc) - timedelta(hours=settings.BALANCE_UPDATE_LOOKBACK_HOURS)
+    pending = select(DueBill.user_id).where(
+        DueBill.pay_date.isnot(None),
+        DueBill.draft_account.isnot(None),
+        DueBill.updated_at >= since,
+        ~select(AppliedPayment.id).where(AppliedPayment.id == DueBill.id).exists(),
+    ).distinct().order_by(DueBill.user_id)
+    user_ids = (await db.scalars(pending)).all()
 
-async def cleanup_old_audit_logs(
-    db: AsyncSession,
-    background_tasks: BackgroundTasks
-) -> None:
-    """Clean up audit logs older than 90 days"""
-    ninety_days_ago = datetime.utcnow() - timedelta(days=90)
-    query = select(AuditLog).where(AuditLog.created_at < ninety_days_ago)
-    result = await db.execute(query)
-    old_logs = result.scalars().all()
+    updated_users = set()
+    chunk_size = settings.BALANCE_UPDATE_CHUNK_USERS
+    for offset in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[offset:offset + chunk_size]
+        result = await db.execute(_apply_payments_statement(chunk, since))
+        updated_users.update(result.scalars().all())
+        await db.commit()
 
-    for log in old_logs:
-        await db.delete(log)
+    for user_id in updated_users:
+        await response_cache.invalidate(BankAccountInstance.__tablename__, user_id)
+        await projection_cache.handle_write(BankAccountInstance, user_id)
+    logger.info(f"Applied payments to balances for {len(updated_users)} users")
 
-    await db.commit()
+@job_handler("audit.retention", timeout_seconds=4 * 60 * 60)
+async def cleanup_old_audit_logs(db: AsyncSession) -> None:
+    """Clean up audit logs older than AUDIT_RETENTION_DAYS"""
+    dropped, deleted = await enforce_audit_retention(db)
+    logger.info(f"Audit retention dropped partitions {dropped} and deleted {deleted} rows")
@@ -0,0 +1,196 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from redis.asyncio import ConnectionPool, Redis
+from redis.exceptions import RedisError
+from app.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+class LRUCache:
+    """Bounded in-process LRU cache with an optional per-entry TTL"""
+    def __init__(self, max_entries: int, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return entry[0] if entry else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+class CachedResponse:
+    """A serialized response body and the headers needed to replay it"""
+    def __init__(self, body: bytes, etag: str, next_cursor: Optional[str] = None):
+        self.body = body
+        self.etag = etag
+        self.next_cursor = next_cursor
+
+class ResponseCache:
+    """Redis cache of serialized list responses, invalidated by generation counters
+
+    Each (table, user) pair has a generation number that is part of every
+    cache key. Writes bump the generation instead of deleting keys, so stale
+    entries are never read again and simply expire with their TTL.
+    """
+    def __init__(self, redis_client: Redis, ttl: int):
+        self.redis = redis_client
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @staticmethod
+    def _generation_key(table: str, user_id: Any) -> str:
+        return f"cache:gen:{table}:{user_id}"
+
+    async def generation(self, table: str, user_id: Any) -> Optional[int]:
+        """Get the current generation of a user's table, or None if Redis is down
+
+        Generations also version list ETags, so a missing counter is seeded
+        from the clock rather than restarting at 0, which could repeat an
+        ETag issued before the counter was evicted.
+        """
+        key = self._generation_key(table, user_id)
+        try:
+            generation = await self.redis.get(key)
+            if generation is None:
+                await self.redis.set(key, time.time_ns() // 1000, nx=True)
+                generation = await self.redis.get(key)
+        except RedisError as exc:
+            self.errors += 1
+            logger.warning(f"Response cache read failed: {exc}")
+            return None
+        return int(generation)
+
+    def key(self, table: str, user_id: Any, generation: int, variant: str) -> str:
+        """Get the cache key for a response under a generation
+
+        Resolve the generation before reading the database and reuse the key
+        when storing, so a write that lands in between leaves the entry under
+        a dead generation.
+        """
+        digest = hashlib.sha1(variant.encode()).hexdigest()
+        return f"cache:list:{table}:{user_id}:{generation}:{digest}"
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        """Get a cached response, treating Redis failures as misses"""
+        try:
+            entry = await self.redis.hgetall(key)
+        except RedisError as exc:
+            self.errors += 1
+            logger.warning(f"Response cache read failed: {exc}")
+            return None
+        if not entry:
+            self.misses += 1
+            return None
+        self.hits += 1
+        next_cursor = entry.get(b"next_cursor")
+        return CachedResponse(
+            body=entry[b"body"],
+            etag=entry[b"etag"].decode(),
+            next_cursor=next_cursor.decode() if next_cursor else None,
+        )
+
+    async def set(self, key: str, response: CachedResponse) -> None:
+        mapping = {"body": response.body, "etag": response.etag}
+        if response.next_cursor:
+            mapping["next_cursor"] = response.next_cursor
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, self.ttl)
+                await pipe.execute()
+        except RedisError as exc:
+            self.errors += 1
+            logger.warning(f"Response cache write failed: {exc}")
+
+    async def invalidate(self, table: str, user_id: Any) -> None:
+        """Invalidate every cached response for a user's table in O(1)"""
+        key = self._generation_key(table, user_id)
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.set(key, time.time_ns() // 1000, nx=True)
+                pipe.incr(key)
+                await pipe.execute()
+            self.invalidations += 1
+        except RedisError as exc:
+            self.errors += 1
+            logger.warning(f"Response cache invalidation failed: {exc}")
+
+    async def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for this worker and server-side evictions"""
+        stats = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+        }
+        try:
+            info = await self.redis.info("stats")
+            stats["evicted_keys"] = info.get("evicted_keys")
+            stats["expired_keys"] = info.get("expired_keys")
+        except RedisError:
+            pass
+        return stats
+
+# Shared async connection pool for all Redis users in the process
+redis_pool = ConnectionPool(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    password=settings.REDIS_PASSWORD,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+)
+redis_client = Redis(connection_pool=redis_pool)
+
+# Create a singleton instance
+response_cache = ResponseCache(redis_client, settings.RESPONSE_CACHE_TTL)
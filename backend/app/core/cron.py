@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+from typing import FrozenSet
+
+# (name, lowest, highest) for the five cron fields; day of week accepts 7
+# as well as 0 for Sunday
+FIELDS = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day of month", 1, 31),
+    ("month", 1, 12),
+    ("day of week", 0, 7),
+)
+
+class CronError(ValueError):
+    """A cron expression that cannot be parsed"""
+
+def _parse_field(text: str, name: str, lowest: int, highest: int) -> FrozenSet[int]:
+    """Values matched by one field: *, n, a-b, and /step on any of them"""
+    values = set()
+    for part in text.split(","):
+        spec, slash, step_text = part.partition("/")
+        step = int(step_text) if step_text.isdigit() else 0
+        if slash and step < 1:
+            raise CronError(f"Invalid step '{part}' in {name}")
+        if spec == "*":
+            start, end = lowest, highest
+        elif "-" in spec:
+            start_text, _, end_text = spec.partition("-")
+            if not (start_text.isdigit() and end_text.isdigit()):
+                raise CronError(f"Invalid range '{part}' in {name}")
+            start, end = int(start_text), int(end_text)
+        elif spec.isdigit():
+            # "5/15" means every 15 starting at 5
+            start = int(spec)
+            end = highest if slash else start
+        else:
+            raise CronError(f"Invalid value '{part}' in {name}")
+        if start < lowest or end > highest or start > end:
+            raise CronError(f"'{part}' is out of range for {name}")
+        values.update(range(start, end + 1, step or 1))
+    if name == "day of week" and 7 in values:
+        values.discard(7)
+        values.add(0)
+    return frozenset(values)
+
+class CronSchedule:
+    """A standard five-field cron expression, evaluated in UTC
+
+    When both day of month and day of week are restricted a day matching
+    either one fires, as in cron.
+    """
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise CronError(f"Cron expression '{expression}' must have five fields")
+        self.expression = expression
+        minutes, hours, days, months, weekdays = (
+            _parse_field(text, *field) for text, field in zip(parts, FIELDS)
+        )
+        self.minutes = sorted(minutes)
+        self.hours = sorted(hours)
+        self.days = days
+        self.months = months
+        self.weekdays = weekdays
+        self._either_day = parts[2] != "*" and parts[4] != "*"
+
+    def _day_matches(self, day: datetime) -> bool:
+        if day.month not in self.months:
+            return False
+        # Python counts from Monday = 0, cron from Sunday = 0
+        in_days = day.day in self.days
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+        return in_days or in_weekdays if self._either_day else in_days and in_weekdays
+
+    def next_after(self, after: datetime) -> datetime:
+        """The first matching minute strictly after `after`"""
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.replace(hour=0, minute=0)
+        # Five years is enough for any satisfiable expression (Feb 29)
+        for _ in range(366 * 5):
+            if self._day_matches(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate >= start:
+                            return candidate
+            day += timedelta(days=1)
+        raise CronError(f"Cron expression '{self.expression}' never matches")
+
+    def __repr__(self) -> str:
+        return f"CronSchedule({self.expression!r})"
@@ -54,10 +54,11 @@ class ConflictException(BudgException):
 
 class RateLimitException(BudgException):
     """Rate limit exceeded exception"""
-    def __init__(self, detail: str = "Rate limit exceeded"):
+    def __init__(self, detail: str = "Rate limit exceeded", headers: Optional[Dict[str, Any]] = None):
         super().__init__(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail=detail
+            detail=detail,
+            headers=headers
         )
 
 class DatabaseException(BudgException):
@@ -0,0 +1,335 @@
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Set
+from sqlalchemy import case, delete, extract, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.database import async_session_maker
+from app.models.job import Job
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+class JobError(Exception):
+    """A job that cannot be enqueued or run"""
+
+@dataclass(frozen=True)
+class JobHandler:
+    job_type: str
+    func: Callable[..., Awaitable[Any]]
+    max_attempts: int
+    timeout_seconds: float
+
+# job_type -> handler, filled in by @job_handler at import time
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+def job_handler(job_type: str, max_attempts: Optional[int] = None, timeout_seconds: Optional[float] = None):
+    """Register `func(session, **payload)` as the handler for job_type"""
+    def decorator(func):
+        JOB_HANDLERS[job_type] = JobHandler(
+            job_type,
+            func,
+            max_attempts or settings.JOB_MAX_ATTEMPTS,
+            timeout_seconds or settings.JOB_TIMEOUT_SECONDS,
+        )
+        return func
+    return decorator
+
+async def enqueue(
+    session: AsyncSession,
+    job_type: str,
+    payload: Optional[Dict[str, Any]] = None,
+    run_at: Optional[datetime] = None,
+    unique: bool = False
+) -> Optional[int]:
+    """Add a job on the caller's session and return its id
+
+    Nothing is committed here: the job becomes visible to workers only if
+    the caller's transaction commits, so work is never queued for a change
+    that rolled back. With unique, nothing is added (None is returned) if
+    an identical job is already queued.
+    """
+    handler = JOB_HANDLERS.get(job_type)
+    if handler is None:
+        raise JobError(f"No handler registered for job type '{job_type}'")
+    payload = payload or {}
+    if unique:
+        queued = await session.scalar(
+            select(Job.id).where(
+                Job.job_type == job_type,
+                Job.status == "queued",
+                Job.payload == payload,
+            ).limit(1)
+        )
+        if queued is not None:
+            return None
+    job = Job(job_type=job_type, payload=payload, max_attempts=handler.max_attempts)
+    if run_at is not None:
+        job.run_at = run_at
+    session.add(job)
+    await session.flush()
+    return job.id
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff after the given number of attempts, with jitter"""
+    delay = min(settings.JOB_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), settings.JOB_BACKOFF_MAX_SECONDS)
+    # Half fixed, half random so a burst of failures does not retry in lockstep
+    return delay / 2 + random.uniform(0, delay / 2)
+
+async def requeue_dead(session: AsyncSession, job_type: Optional[str] = None) -> int:
+    """Give dead-lettered jobs a fresh set of attempts"""
+    statement = (
+        update(Job)
+        .where(Job.status == "dead")
+        .values(status="queued", attempts=0, run_at=func.now(), finished_at=None)
+    )
+    if job_type is not None:
+        statement = statement.where(Job.job_type == job_type)
+    result = await session.execute(statement)
+    await session.commit()
+    return result.rowcount
+
+async def queue_stats(session: AsyncSession) -> Dict[str, Dict[str, Any]]:
+    """Per job type backlog, throughput and latency from the job table
+
+    Throughput and latency cover jobs finished in the last hour; duration is
+    started to finished, wait is due (run_at) to started.
+    """
+    recent = (Job.status == "succeeded") & (Job.finished_at > func.now() - timedelta(hours=1))
+    # NULL outside the window; percentile_cont skips NULLs
+    duration = case((recent, extract("epoch", Job.finished_at - Job.started_at)))
+    wait = case((recent, extract("epoch", Job.started_at - Job.run_at)))
+    result = await session.execute(
+        select(
+            Job.job_type,
+            func.count().filter(Job.status == "queued").label("queued"),
+            func.count().filter(Job.status == "running").label("running"),
+            func.count().filter(Job.status == "dead").label("dead"),
+            func.count().filter(recent).label("succeeded_last_hour"),
+            func.percentile_cont(0.5).within_group(duration).label("duration_p50"),
+            func.percentile_cont(0.95).within_group(duration).label("duration_p95"),
+            func.percentile_cont(0.5).within_group(wait).label("wait_p50"),
+            func.percentile_cont(0.95).within_group(wait).label("wait_p95"),
+            func.min(Job.run_at).filter(Job.status == "queued").label("oldest_queued"),
+        ).group_by(Job.job_type)
+    )
+    return {row.job_type: dict(row._mapping) for row in result}
+
+class JobMetrics:
+    """In-process counters and recent latencies per job type for one worker"""
+    def __init__(self, window: int = 1000):
+        self.counters: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"succeeded": 0, "retried": 0, "dead": 0}
+        )
+        self.durations: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self.started = time.monotonic()
+
+    def record(self, job_type: str, outcome: str, duration: float) -> None:
+        self.counters[job_type][outcome] += 1
+        self.durations[job_type].append(duration)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        elapsed = max(time.monotonic() - self.started, 1.0)
+        snapshot = {}
+        for job_type, counters in self.counters.items():
+            durations = sorted(self.durations[job_type])
+            snapshot[job_type] = {
+                **counters,
+                "per_minute": round(sum(counters.values()) * 60 / elapsed, 2),
+                "duration_p50": durations[len(durations) // 2] if durations else None,
+                "duration_p95": durations[int(len(durations) * 0.95)] if durations else None,
+            }
+        return snapshot
+
+class JobWorker:
+    """Claims jobs with FOR UPDATE SKIP LOCKED and runs up to `concurrency` at once
+
+    A claimed job is leased until its handler's timeout plus a grace period
+    has passed; the handler is cancelled at the timeout, so a job still
+    'running' after its lease belonged to a worker that died, and the reaper
+    requeues it. Failures are retried with exponential backoff and moved to
+    'dead' after max_attempts.
+    """
+    LEASE_GRACE_SECONDS = 60
+    PURGE_BATCH_SIZE = 5000
+
+    def __init__(self, concurrency: int, poll_interval: float, job_types: Optional[Sequence[str]] = None):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.job_types = list(job_types) if job_types else None
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.metrics = JobMetrics()
+        self._running: Set[asyncio.Task] = set()
+        self._slot_freed = asyncio.Event()
+        self._stopping = asyncio.Event()
+
+    def _lease(self):
+        """locked_until for a claimed row: its handler's timeout plus the grace period"""
+        grace = timedelta(seconds=self.LEASE_GRACE_SECONDS)
+        default = timedelta(seconds=settings.JOB_TIMEOUT_SECONDS) + grace
+        if not JOB_HANDLERS:
+            return func.now() + default
+        leases = {
+            job_type: timedelta(seconds=handler.timeout_seconds) + grace
+            for job_type, handler in JOB_HANDLERS.items()
+        }
+        return func.now() + case(leases, value=Job.job_type, else_=default)
+
+    async def _claim(self, limit: int) -> List[Dict[str, Any]]:
+        claimable = (
+            select(Job.id)
+            .where(Job.status == "queued", Job.run_at <= func.now())
+            .order_by(Job.run_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        if self.job_types is not None:
+            claimable = claimable.where(Job.job_type.in_(self.job_types))
+        statement = (
+            update(Job)
+            .where(Job.id.in_(claimable.scalar_subquery()))
+            .values(
+                status="running",
+                attempts=Job.attempts + 1,
+                started_at=func.now(),
+                locked_until=self._lease(),
+                locked_by=self.worker,
+            )
+            .returning(Job.id, Job.job_type, Job.payload, Job.attempts, Job.max_attempts)
+            .execution_options(synchronize_session=False)
+        )
+        async with async_session_maker() as session:
+            result = await session.execute(statement)
+            claimed = [dict(row) for row in result.mappings()]
+            await session.commit()
+        return claimed
+
+    async def _finish(self, job_id: int, **values: Any) -> None:
+        """Update a job this worker still holds; a lost lease leaves it alone"""
+        async with async_session_maker() as session:
+            await session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == "running", Job.locked_by == self.worker)
+                .values(locked_until=None, locked_by=None, **values)
+            )
+            await session.commit()
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        started = time.monotonic()
+        try:
+            handler = JOB_HANDLERS.get(job["job_type"])
+            if handler is None:
+                raise JobError(f"No handler registered for job type '{job['job_type']}'")
+            async with async_session_maker() as session:
+                await asyncio.wait_for(handler.func(session, **job["payload"]), timeout=handler.timeout_seconds)
+        except Exception as exc:
+            duration = time.monotonic() - started
+            error = f"{type(exc).__name__}: {exc}"
+            if job["attempts"] >= job["max_attempts"]:
+                logger.error(f"Job {job['id']} ({job['job_type']}) dead after {job['attempts']} attempts: {error}")
+                await self._finish(job["id"], status="dead", finished_at=func.now(), last_error=error)
+                self.metrics.record(job["job_type"], "dead", duration)
+            else:
+                delay = retry_delay(job["attempts"])
+                logger.warning(f"Job {job['id']} ({job['job_type']}) failed, retrying in {delay:.0f}s: {error}")
+                await self._finish(
+                    job["id"],
+                    status="queued",
+                    run_at=func.now() + timedelta(seconds=delay),
+                    last_error=error,
+                )
+                self.metrics.record(job["job_type"], "retried", duration)
+            return
+        await self._finish(job["id"], status="succeeded", finished_at=func.now())
+        self.metrics.record(job["job_type"], "succeeded", time.monotonic() - started)
+
+    async def reap(self) -> None:
+        """Requeue jobs whose lease expired and purge old succeeded jobs"""
+        async with async_session_maker() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.status == "running", Job.locked_until < func.now())
+                .values(
+                    status=case((Job.attempts >= Job.max_attempts, "dead"), else_="queued"),
+                    finished_at=case((Job.attempts >= Job.max_attempts, func.now()), else_=None),
+                    run_at=func.now(),
+                    locked_until=None,
+                    locked_by=None,
+                    last_error="Lease expired; the worker running it stopped",
+                )
+            )
+            if result.rowcount:
+                logger.warning(f"Recovered {result.rowcount} jobs from expired leases")
+            expired = (
+                select(Job.id)
+                .where(
+                    Job.status == "succeeded",
+                    Job.finished_at < func.now() - timedelta(days=settings.JOB_RETENTION_DAYS),
+                )
+                .limit(self.PURGE_BATCH_SIZE)
+            )
+            await session.execute(delete(Job).where(Job.id.in_(expired.scalar_subquery())))
+            await session.commit()
+
+    async def _reap_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.JOB_REAP_INTERVAL_SECONDS)
+            try:
+                await self.reap()
+            except Exception as exc:
+                logger.warning(f"Job reaper failed: {exc}")
+            logger.info(f"Job worker {self.worker} metrics: {self.metrics.snapshot()}")
+
+    async def _wait(self, timeout: Optional[float]) -> None:
+        """Until a slot frees up, stop() is called, or timeout passes"""
+        waiters = [
+            asyncio.ensure_future(self._slot_freed.wait()),
+            asyncio.ensure_future(self._stopping.wait()),
+        ]
+        await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        for waiter in waiters:
+            waiter.cancel()
+
+    def _done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self._slot_freed.set()
+
+    async def run(self) -> None:
+        """Claim and run jobs until stop(); running jobs are allowed to finish"""
+        logger.info(f"Job worker {self.worker} started with concurrency {self.concurrency}")
+        reaper = asyncio.create_task(self._reap_loop())
+        try:
+            while not self._stopping.is_set():
+                self._slot_freed.clear()
+                free = self.concurrency - len(self._running)
+                claimed = []
+                if free > 0:
+                    try:
+                        claimed = await self._claim(free)
+                    except Exception as exc:
+                        logger.warning(f"Could not claim jobs: {exc}")
+                for job in claimed:
+                    task = asyncio.create_task(self._run(job))
+                    self._running.add(task)
+                    task.add_done_callback(self._done)
+                if free > 0 and len(claimed) == free:
+                    # A full batch: there may be more waiting
+                    continue
+                # All slots busy: wait for one; queue drained: poll again later
+                await self._wait(None if len(self._running) >= self.concurrency else self.poll_interval)
+        finally:
+            reaper.cancel()
+            if self._running:
+                logger.info(f"Waiting for {len(self._running)} running jobs")
+                await asyncio.gather(*self._running, return_exceptions=True)
+            logger.info(f"Job worker {self.worker} stopped")
+
+    def stop(self) -> None:
+        self._stopping.set()
@@ -0,0 +1,324 @@
+import asyncio
+import logging
+import uuid
+from datetime import date
+from itertools import accumulate, count
+from typing import Any, Dict, Iterable, List, Optional
+from redis.exceptions import RedisError
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.core.cache import LRUCache, redis_client
+from app.core.projection_series import AccountSeries
+from app.models.bank_account import BankAccount
+from app.models.bank_account_instance import BankAccountInstance
+from app.models.due_bills import DueBill
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+def _baseline_query(user_id: Any, start: date):
+    """Latest balance on or before start for each of the user's bank accounts"""
+    return (
+        select(
+            BankAccountInstance.bank_account,
+            BankAccountInstance.due_date,
+            BankAccountInstance.current_balance,
+        )
+        .where(
+            BankAccountInstance.user_id == user_id,
+            BankAccountInstance.archived == False,
+            BankAccountInstance.due_date <= start,
+        )
+        .distinct(BankAccountInstance.bank_account)
+        .order_by(
+            BankAccountInstance.bank_account,
+            BankAccountInstance.due_date.desc(),
+            BankAccountInstance.priority.desc(),
+            BankAccountInstance.id.desc(),
+        )
+        .subquery("baseline")
+    )
+
+def projection_query(user_id: Any, start: date, end: date):
+    """Running balance per account after each unpaid bill, computed in SQL
+
+    The running total is a window SUM over each account's unpaid bills in
+    due-date and priority order, so the database does the arithmetic in one
+    pass and Python only groups the rows.
+    """
+    baseline = _baseline_query(user_id, start)
+    order = (DueBill.due_date, DueBill.priority, DueBill.id)
+    paid_so_far = func.sum(DueBill.total_amount_due).over(
+        partition_by=baseline.c.bank_account,
+        order_by=order,
+        rows=(None, 0),
+    )
+    return (
+        select(
+            baseline.c.bank_account,
+            BankAccount.name,
+            BankAccount.font_color_hex,
+            baseline.c.due_date.label("as_of"),
+            baseline.c.current_balance,
+            DueBill.id.label("due_bill_id"),
+            DueBill.due_date,
+            DueBill.priority,
+            DueBill.total_amount_due,
+            (baseline.c.current_balance - paid_so_far).label("balance"),
+        )
+        .join(BankAccount, BankAccount.id == baseline.c.bank_account)
+        .outerjoin(
+            DueBill,
+            and_(
+                DueBill.draft_account == baseline.c.bank_account,
+                DueBill.user_id == user_id,
+                DueBill.archived == False,
+                DueBill.pay_date.is_(None),
+                DueBill.due_date >= baseline.c.due_date,
+                DueBill.due_date <= end,
+            ),
+        )
+        .order_by(baseline.c.bank_account, *order)
+    )
+
+async def project_balances(
+    session: AsyncSession,
+    user_id: Any,
+    start: date,
+    end: date
+) -> List[Dict[str, Any]]:
+    """Project each bank account's balance across unpaid bills up to end"""
+    result = await session.execute(projection_query(user_id, start, end))
+    accounts: Dict[Any, Dict[str, Any]] = {}
+    for row in result:
+        account = accounts.get(row.bank_account)
+        if account is None:
+            account = accounts[row.bank_account] = {
+                "bank_account_id": row.bank_account,
+                "name": row.name,
+                "font_color_hex": row.font_color_hex,
+                "as_of": row.as_of,
+                "starting_balance": row.current_balance,
+                "ending_balance": row.current_balance,
+                "points": [],
+            }
+        if row.due_bill_id is None:
+            # Account with no unpaid bills in range
+            continue
+        account["points"].append({
+            "due_bill_id": row.due_bill_id,
+            "due_date": row.due_date,
+            "priority": row.priority,
+            "amount": row.total_amount_due,
+            "balance": row.balance,
+        })
+        account["ending_balance"] = row.balance
+    return list(accounts.values())
+
+def _bill_is_projected(bill: DueBill) -> bool:
+    return not bill.archived and bill.pay_date is None and bill.draft_account is not None
+
+class ProjectionCache:
+    """Per-user projection series kept current by router writes
+
+    Entries are per user (holding every account's series) in a bounded LRU.
+    Writes through the routers patch the cached series in this worker and
+    tell other workers, over Redis pub/sub, to drop their copy. Entries
+    expire after a TTL, so a write that bypassed both paths ages out.
+    """
+    def __init__(self, max_users: int, channel: str, ttl: float):
+        # Keyed by str(user_id) so ids published over Redis match
+        self.entries = LRUCache(max_users, ttl=ttl)
+        self.channel = channel
+        # Lets the listener skip this worker's own (already applied) writes
+        self.worker_id = uuid.uuid4().hex
+        # Replaced on every change so a load racing a write is not stored.
+        # Values come from one counter and are never reused, so a version
+        # evicted during a load cannot match again and the load is dropped.
+        self._versions = LRUCache(2 * max_users, ttl=ttl)
+        self._counter = count(1)
+
+    def _bump(self, user_key: str) -> None:
+        self._versions.set(user_key, next(self._counter))
+
+    async def _load(self, session: AsyncSession, user_id: Any) -> Dict[Any, AccountSeries]:
+        user_key = str(user_id)
+        version = self._versions.get(user_key)
+        if version is None:
+            self._bump(user_key)
+            version = self._versions.get(user_key)
+        accounts = {
+            row.id: AccountSeries(row.id, row.name, row.font_color_hex)
+            for row in await session.execute(
+                select(BankAccount.id, BankAccount.name, BankAccount.font_color_hex)
+                .where(BankAccount.user_id == user_id)
+            )
+        }
+        instances = await session.execute(
+            select(BankAccountInstance).where(
+                BankAccountInstance.user_id == user_id,
+                BankAccountInstance.archived == False,
+            )
+        )
+        for instance in instances.scalars():
+            if instance.bank_account in accounts:
+                accounts[instance.bank_account].balances.insert(
+                    (instance.due_date, instance.priority, instance.id),
+                    instance.current_balance,
+                )
+        bills = await session.execute(
+            select(DueBill)
+            .where(
+                DueBill.user_id == user_id,
+                DueBill.archived == False,
+                DueBill.pay_date.is_(None),
+                DueBill.draft_account.isnot(None),
+            )
+            .order_by(DueBill.due_date, DueBill.priority, DueBill.id)
+        )
+        for bill in bills.scalars():
+            series = accounts.get(bill.draft_account)
+            if series is not None:
+                # Rows arrive sorted, so appends keep order; totals built once below
+                key = (bill.due_date, bill.priority, bill.id)
+                series.bills.keys.append(key)
+                series.bills.dates.append(bill.due_date)
+                series.bills.amounts.append(bill.total_amount_due)
+                series.bills.by_id[bill.id] = key
+        for series in accounts.values():
+            series.totals = list(accumulate(series.bills.amounts))
+        if self._versions.get(user_key) == version:
+            self.entries.set(user_key, accounts)
+        return accounts
+
+    async def project(
+        self,
+        session: AsyncSession,
+        user_id: Any,
+        start: date,
+        end: date
+    ) -> List[Dict[str, Any]]:
+        accounts = self.entries.get(str(user_id))
+        if accounts is None:
+            accounts = await self._load(session, user_id)
+        projections = (series.project(start, end) for series in accounts.values())
+        return [projection for projection in projections if projection is not None]
+
+    async def check_consistency(
+        self,
+        session: AsyncSession,
+        user_id: Any,
+        start: date,
+        end: date
+    ) -> List[Any]:
+        """Compare cached projections with a full SQL recompute
+
+        Returns the ids of accounts that differ and drops the user's entry
+        when any do, so the next request reloads it.
+        """
+        cached = {
+            account["bank_account_id"]: account
+            for account in await self.project(session, user_id, start, end)
+        }
+        expected = {
+            account["bank_account_id"]: account
+            for account in await project_balances(session, user_id, start, end)
+        }
+        fields = ("as_of", "starting_balance", "ending_balance", "points")
+        mismatched = [
+            account_id
+            for account_id in set(cached) | set(expected)
+            if account_id not in cached
+            or account_id not in expected
+            or any(cached[account_id][f] != expected[account_id][f] for f in fields)
+        ]
+        if mismatched:
+            logger.warning(f"Projection cache for user {user_id} diverged on accounts {mismatched}")
+            self.invalidate_local(user_id)
+        return mismatched
+
+    def _apply(self, model: Any, user_id: Any, items: Iterable[Any], deleted_ids: Iterable[Any]) -> bool:
+        """Patch cached series in place; returns False if a full reload is needed"""
+        accounts = self.entries.get(str(user_id))
+        if accounts is None:
+            return True
+        if model.__tablename__ == DueBill.__tablename__:
+            for row_id in deleted_ids:
+                for series in accounts.values():
+                    series.discard_bill(row_id)
+            for bill in items:
+                for series in accounts.values():
+                    if series.account_id != bill.draft_account:
+                        series.discard_bill(bill.id)
+                target = accounts.get(bill.draft_account)
+                if _bill_is_projected(bill) and target is not None:
+                    target.upsert_bill(bill.id, (bill.due_date, bill.priority, bill.id), bill.total_amount_due)
+                elif target is not None:
+                    target.discard_bill(bill.id)
+            return True
+        if model.__tablename__ == BankAccountInstance.__tablename__:
+            for row_id in deleted_ids:
+                for series in accounts.values():
+                    series.balances.discard(row_id)
+            for instance in items:
+                for series in accounts.values():
+                    series.balances.discard(instance.id)
+                target = accounts.get(instance.bank_account)
+                if target is None:
+                    return False
+                if not instance.archived:
+                    target.balances.insert(
+                        (instance.due_date, instance.priority, instance.id),
+                        instance.current_balance,
+                    )
+            return True
+        return False
+
+    async def handle_write(
+        self,
+        model: Any,
+        user_id: Any,
+        items: Optional[List[Any]] = None,
+        deleted_ids: Optional[List[Any]] = None
+    ) -> None:
+        """Router write listener: patch when the change is known, else drop"""
+        self._bump(str(user_id))
+        if items is None and deleted_ids is None:
+            self.invalidate_local(user_id)
+        elif not self._apply(model, user_id, items or [], deleted_ids or []):
+            self.invalidate_local(user_id)
+        try:
+            await redis_client.publish(self.channel, f"{self.worker_id}:{user_id}")
+        except RedisError as exc:
+            logger.warning(f"Failed to publish projection invalidation: {exc}")
+
+    def invalidate_local(self, user_id: Any) -> None:
+        user_key = str(user_id)
+        self._bump(user_key)
+        self.entries.pop(user_key)
+
+    async def listen(self) -> None:
+        """Drop entries changed by other workers until cancelled"""
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    worker_id, _, user_key = message["data"].decode().partition(":")
+                    if worker_id != self.worker_id:
+                        self.invalidate_local(user_key)
+            except RedisError as exc:
+                logger.warning(f"Projection invalidation listener lost Redis: {exc}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.close()
+
+# Create a singleton instance
+projection_cache = ProjectionCache(
+    settings.PROJECTION_CACHE_MAX_USERS,
+    settings.PROJECTION_INVALIDATION_CHANNEL,
+    settings.PROJECTION_CACHE_TTL,
+)
@@ -0,0 +1,92 @@
+from bisect import bisect_left, bisect_right
+from datetime import date
+from decimal import Decimal
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Tuple
+
+class _SortedSeries:
+    """Rows kept in (due_date, priority, id) order with their amounts"""
+    def __init__(self):
+        self.keys: List[Tuple[date, int, Any]] = []
+        self.dates: List[date] = []
+        self.amounts: List[Decimal] = []
+        self.by_id: Dict[Any, Tuple[date, int, Any]] = {}
+
+    def insert(self, key: Tuple[date, int, Any], amount: Decimal) -> int:
+        index = bisect_left(self.keys, key)
+        self.keys.insert(index, key)
+        self.dates.insert(index, key[0])
+        self.amounts.insert(index, amount)
+        self.by_id[key[2]] = key
+        return index
+
+    def discard(self, row_id: Any) -> Optional[int]:
+        key = self.by_id.pop(row_id, None)
+        if key is None:
+            return None
+        index = bisect_left(self.keys, key)
+        del self.keys[index], self.dates[index], self.amounts[index]
+        return index
+
+class AccountSeries:
+    """One bank account's balances and unpaid bills with a running total
+
+    totals[i] is the sum of bill amounts 0..i, so the balance after any bill
+    relative to any baseline is a subtraction. Changing a bill only
+    recomputes totals from its position onwards.
+    """
+    def __init__(self, account_id: Any, name: str, font_color_hex: Optional[str]):
+        self.account_id = account_id
+        self.name = name
+        self.font_color_hex = font_color_hex
+        self.balances = _SortedSeries()
+        self.bills = _SortedSeries()
+        self.totals: List[Decimal] = []
+
+    def _recompute_from(self, index: int) -> None:
+        """Recompute running totals for the suffix starting at index"""
+        previous = self.totals[index - 1] if index > 0 else Decimal(0)
+        del self.totals[index:]
+        self.totals.extend(accumulate(self.bills.amounts[index:], initial=previous))
+        # accumulate() repeats the initial value first
+        del self.totals[index]
+
+    def upsert_bill(self, row_id: Any, key: Tuple[date, int, Any], amount: Decimal) -> None:
+        removed = self.bills.discard(row_id)
+        inserted = self.bills.insert(key, amount)
+        self._recompute_from(min(inserted, removed if removed is not None else inserted))
+
+    def discard_bill(self, row_id: Any) -> None:
+        removed = self.bills.discard(row_id)
+        if removed is not None:
+            self._recompute_from(removed)
+
+    def project(self, start: date, end: date) -> Optional[Dict[str, Any]]:
+        """Project this account from its latest balance on or before start"""
+        baseline = bisect_right(self.balances.dates, start) - 1
+        if baseline < 0:
+            return None
+        as_of = self.balances.dates[baseline]
+        starting_balance = self.balances.amounts[baseline]
+        first = bisect_left(self.bills.dates, as_of)
+        last = bisect_right(self.bills.dates, end)
+        offset = self.totals[first - 1] if first > 0 else Decimal(0)
+        points = [
+            {
+                "due_bill_id": self.bills.keys[index][2],
+                "due_date": self.bills.keys[index][0],
+                "priority": self.bills.keys[index][1],
+                "amount": self.bills.amounts[index],
+                "balance": starting_balance - (self.totals[index] - offset),
+            }
+            for index in range(first, last)
+        ]
+        return {
+            "bank_account_id": self.account_id,
+            "name": self.name,
+            "font_color_hex": self.font_color_hex,
+            "as_of": as_of,
+            "starting_balance": starting_balance,
+            "ending_balance": points[-1]["balance"] if points else starting_balance,
+            "points": points,
+        }
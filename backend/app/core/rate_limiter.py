@@ -1,16 +1,108 @@
-from fastapi import HTTPException, Request, status
+from fastapi import Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from redis import Redis
-from typing import Optional
-import time
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import hashlib
+import logging
+import math
+import os
 from app.config import get_settings
+from app.core.cache import redis_client
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Sliding-window log per key in a sorted set scored by arrival time (ms).
+# KEYS: the windows to check; ARGV: window ms, a unique member, then one
+# limit per key. Every window is trimmed and counted first; the request is
+# recorded in all of them only if all are under their limit, so rejected
+# requests do not extend a block. Time comes from the Redis server so
+# every app node shares one clock; effect replication, which that needs, is
+# the default from Redis 5 and only requested where the call still exists.
+# Returns {allowed, remaining_1, reset_ms_1, remaining_2, reset_ms_2, ...}.
+SLIDING_WINDOW_SCRIPT = """
+if redis.replicate_commands then redis.replicate_commands() end
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local window = tonumber(ARGV[1])
+local member = ARGV[2]
+local counts = {}
+local allowed = 1
+for i, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    counts[i] = redis.call('ZCARD', key)
+    if counts[i] >= tonumber(ARGV[2 + i]) then
+        allowed = 0
+    end
+end
+local result = {allowed}
+for i, key in ipairs(KEYS) do
+    local count = counts[i]
+    if allowed == 1 then
+        redis.call('ZADD', key, now, member)
+        redis.call('PEXPIRE', key, window)
+        count = count + 1
+    end
+    local reset = window
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    if oldest[2] then
+        reset = tonumber(oldest[2]) + window - now
+    end
+    table.insert(result, math.max(tonumber(ARGV[2 + i]) - count, 0))
+    table.insert(result, reset)
+end
+return result
+"""
+
+@dataclass
+class WindowState:
+    """One window after a check"""
+    scope: str
+    limit: int
+    remaining: int
+    reset: float  # seconds until the oldest request leaves the window
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    windows: List[WindowState]
+
+    @property
+    def tightest(self) -> WindowState:
+        return min(self.windows, key=lambda window: (window.remaining, -window.reset))
+
+    @property
+    def exceeded(self) -> List[WindowState]:
+        return [window for window in self.windows if window.remaining == 0]
+
+    def headers(self) -> Dict[str, str]:
+        """X-RateLimit-* for the tightest window, plus Retry-After when blocked"""
+        window = self.tightest
+        headers = {
+            "X-RateLimit-Limit": str(window.limit),
+            "X-RateLimit-Remaining": str(window.remaining),
+            "X-RateLimit-Reset": str(math.ceil(window.reset)),
+        }
+        if not self.allowed:
+            # Every exceeded window must free a slot before a retry can pass
+            headers["Retry-After"] = str(max(math.ceil(w.reset) for w in self.exceeded) or 1)
+        return headers
 
 class RateLimiter:
-    def __init__(self, redis_client: Redis):
+    """Per-user and per-IP sliding-window limits, checked in one EVALSHA
+
+    The script is loaded once and then invoked by hash; redis-py reloads it
+    if the server was restarted. When Redis is unavailable requests are let
+    through rather than failing the API.
+    """
+    def __init__(self, redis_client: Redis, window_seconds: int):
         self.redis = redis_client
+        self.window_ms = window_seconds * 1000
+        self.script = redis_client.register_script(SLIDING_WINDOW_SCRIPT)
         self.bearer = HTTPBearer()
+        self.errors = 0
 
     async def get_user_id_from_token(self, request: Request) -> Optional[str]:
         """Extract user ID from JWT token"""
@@ -18,9 +110,8 @@ class RateLimiter:
             credentials: HTTPAuthorizationCredentials = await self.bearer(request)
             if not credentials:
                 return None
-            # In a real implementation, you would decode the JWT and get the user ID
-            # For now, we'll use the token itself as a unique identifier
-            return credentials.credentials
+            # The token identifies the caller; hash it so it never appears in Redis keys
+            return hashlib.sha256(credentials.credentials.encode()).hexdigest()
         except Exception:
             return None
 
@@ -28,50 +119,35 @@ class RateLimiter:
         """Get IP address from request"""
         forwarded = request.headers.get("X-Forwarded-For")
         if forwarded:
-            return forwarded.split(",")[0]
+            return forwarded.split(",")[0].strip()
         return request.client.host
 
-    async def check_rate_limit(self, request: Request) -> None:
-        """Check if request should be rate limited"""
-        # Get user ID from token if available
-        user_id = await self.get_user_id_from_token(request)
+    async def check_rate_limit(self, request: Request) -> Optional[RateLimitResult]:
+        """Count the request against its user and IP windows
 
-        # Check user-based rate limit
+        Returns None if Redis could not be reached.
+        """
+        scopes = []
+        user_id = await self.get_user_id_from_token(request)
         if user_id:
-            user_key = f"rate_limit:user:{user_id}"
-            if not await self._check_key(user_key, settings.RATE_LIMIT_USER):
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail="User rate limit exceeded"
-                )
-
-        # Check IP-based rate limit
-        ip_key = f"rate_limit:ip:{self.get_ip_key(request)}"
-        if not await self._check_key(ip_key, settings.RATE_LIMIT_IP):
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="IP rate limit exceeded"
+            scopes.append(("user", f"rate_limit:user:{user_id}", settings.RATE_LIMIT_USER))
+        scopes.append(("ip", f"rate_limit:ip:{self.get_ip_key(request)}", settings.RATE_LIMIT_IP))
+
+        try:
+            reply = await self.script(
+                keys=[key for _, key, _ in scopes],
+                args=[self.window_ms, os.urandom(8).hex(), *(limit for _, _, limit in scopes)],
             )
+        except RedisError as exc:
+            self.errors += 1
+            logger.warning(f"Rate limit check failed, allowing request: {exc}")
+            return None
+
+        windows = [
+            WindowState(scope, limit, int(reply[1 + 2 * i]), int(reply[2 + 2 * i]) / 1000)
+            for i, (scope, _, limit) in enumerate(scopes)
+        ]
+        return RateLimitResult(bool(reply[0]), windows)
 
-    async def _check_key(self, key: str, limit: int) -> bool:
-        """Check if a key has exceeded its rate limit"""
-        current = self.redis.get(key)
-        if current is None:
-            self.redis.setex(key, 60, 1)  # 1 request, expires in 60 seconds
-            return True
-
-        current = int(current)
-        if current >= limit:
-            return False
-
-        self.redis.incr(key)
-        return True
-
-# Create a singleton instance
-redis_client = Redis(
-    host=settings.REDIS_HOST,
-    port=settings.REDIS_PORT,
-    password=settings.REDIS_PASSWORD,
-    decode_responses=True
-)
-rate_limiter = RateLimiter(redis_client)
+# Create a singleton instance on the shared async connection pool
+rate_limiter = RateLimiter(redis_client, settings.RATE_LIMIT_WINDOW_SECONDS)
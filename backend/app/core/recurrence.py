@@ -0,0 +1,146 @@
+import logging
+import uuid
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.core.cache import LRUCache, response_cache
+from app.core.projection import projection_cache
+from app.core.recurrence_rules import (
+    CompiledCalculation,
+    RecurrenceError,
+    RecurrenceRule,
+    compile_calculation,
+    parse_calculation,
+)
+from app.models.bills import Bill
+from app.models.due_bills import DueBill
+from app.models.recurrence import Recurrence
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+class RuleCache:
+    """Compiled calculations keyed by recurrence id and updated_at
+
+    Editing a recurrence bumps updated_at, so a stale entry is never hit;
+    it just ages out of the LRU.
+    """
+    def __init__(self, max_entries: int):
+        self.entries = LRUCache(max_entries)
+
+    def compiled(self, recurrence_id: Any, updated_at: datetime, calculation: Optional[str]) -> CompiledCalculation:
+        key = (recurrence_id, updated_at)
+        compiled = self.entries.get(key)
+        if compiled is None:
+            compiled = compile_calculation(calculation)
+            self.entries.set(key, compiled)
+        return compiled
+
+    def rule(self, recurrence: Recurrence, recurrence_value: Optional[int] = None) -> RecurrenceRule:
+        return self.compiled(recurrence.id, recurrence.updated_at, recurrence.calculation).rule(recurrence_value)
+
+# Create a singleton instance
+rule_cache = RuleCache(settings.RECURRENCE_RULE_CACHE_SIZE)
+
+def _series_query(user_ids: Optional[List[Any]] = None, bill_ids: Optional[List[int]] = None):
+    """Latest due bill of every recurring bill, with its series anchor
+
+    Archived occurrences still count towards the series so a bill the user
+    removed is not recreated; the unique (bill, due_date) index enforces it.
+    """
+    query = (
+        select(
+            DueBill,
+            func.min(DueBill.due_date).over(partition_by=DueBill.bill).label("anchor"),
+            Recurrence.id.label("recurrence_id"),
+            Recurrence.updated_at.label("recurrence_updated_at"),
+            Recurrence.calculation,
+            func.coalesce(DueBill.recurrence_value, Bill.recurrence_value).label("recurrence_value"),
+        )
+        .join(Bill, Bill.id == DueBill.bill)
+        .join(Recurrence, Recurrence.id == DueBill.recurrence)
+        .where(
+            Bill.archived == False,
+            Recurrence.archived == False,
+        )
+        .distinct(DueBill.bill)
+        .order_by(DueBill.bill, DueBill.due_date.desc(), DueBill.id.desc())
+    )
+    if user_ids is not None:
+        query = query.where(DueBill.user_id.in_(user_ids))
+    if bill_ids is not None:
+        query = query.where(DueBill.bill.in_(bill_ids))
+    return query
+
+def _occurrence_row(template: DueBill, due_date: date) -> Dict[str, Any]:
+    return {
+        "id": uuid.uuid4(),
+        "user_id": template.user_id,
+        "bill": template.bill,
+        "recurrence": template.recurrence,
+        "recurrence_value": template.recurrence_value,
+        "priority": template.priority,
+        "due_date": due_date,
+        "min_amount_due": template.min_amount_due,
+        "total_amount_due": template.total_amount_due,
+        "draft_account": template.draft_account,
+        "archived": False,
+    }
+
+async def _insert_occurrences(session: AsyncSession, rows: List[Dict[str, Any]]) -> List[Any]:
+    """Multi-row INSERT ... ON CONFLICT DO NOTHING; returns the owner of each row inserted"""
+    if not rows:
+        return []
+    result = await session.execute(
+        insert(DueBill)
+        .on_conflict_do_nothing(index_elements=[DueBill.bill, DueBill.due_date])
+        .returning(DueBill.user_id),
+        rows
+    )
+    return result.scalars().all()
+
+async def _commit_occurrences(session: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+    """Insert and commit a batch, then drop cached reads of the users who gained rows
+
+    Invalidation mirrors BaseRouter's write listeners and runs after the
+    commit, so a concurrent read cannot re-cache the old state.
+    """
+    owners = await _insert_occurrences(session, rows)
+    await session.commit()
+    for user_id in set(owners):
+        await response_cache.invalidate(DueBill.__tablename__, user_id)
+        await projection_cache.handle_write(DueBill, user_id)
+    return len(owners)
+
+async def expand_due_bills(
+    session: AsyncSession,
+    through: date,
+    user_ids: Optional[List[Any]] = None,
+    bill_ids: Optional[List[int]] = None
+) -> int:
+    """Create every missing due bill occurrence up to `through`
+
+    One row per recurring bill is read, then occurrences are inserted
+    RECURRENCE_INSERT_BATCH rows per statement with a commit after each
+    batch. Existing (bill, due_date) pairs are skipped by the database, so
+    reruns and overlapping jobs are harmless.
+    """
+    series = (await session.execute(_series_query(user_ids, bill_ids))).all()
+    inserted = 0
+    pending: List[Dict[str, Any]] = []
+    for template, anchor, recurrence_id, updated_at, calculation, recurrence_value in series:
+        try:
+            rule = rule_cache.compiled(recurrence_id, updated_at, calculation).rule(recurrence_value)
+        except RecurrenceError as exc:
+            logger.warning(f"Skipping bill {template.bill}: {exc}")
+            continue
+        for due_date in rule.expand(anchor, template.due_date, through):
+            pending.append(_occurrence_row(template, due_date))
+            if len(pending) >= settings.RECURRENCE_INSERT_BATCH:
+                inserted += await _commit_occurrences(session, pending)
+                pending = []
+    inserted += await _commit_occurrences(session, pending)
+    return inserted
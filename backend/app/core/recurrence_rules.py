@@ -0,0 +1,112 @@
+import calendar
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterator, Optional
+
+class RecurrenceError(ValueError):
+    """A recurrence calculation that cannot be interpreted"""
+
+# Named calculations as (unit, interval)
+NAMED_CALCULATIONS = {
+    "daily": ("days", 1),
+    "weekly": ("days", 7),
+    "biweekly": ("days", 14),
+    "monthly": ("months", 1),
+    "bimonthly": ("months", 2),
+    "quarterly": ("months", 3),
+    "semiannually": ("months", 6),
+    "annually": ("months", 12),
+    "yearly": ("months", 12),
+}
+
+# Calculations whose interval comes from recurrence_value
+VALUE_CALCULATIONS = {
+    "n_days": ("days", 1),
+    "n_weeks": ("days", 7),
+    "n_months": ("months", 1),
+    "n_years": ("months", 12),
+}
+
+# Units accepted in legacy "<n> <unit>" calculations
+UNIT_ALIASES = {
+    "day": ("days", 1),
+    "days": ("days", 1),
+    "week": ("days", 7),
+    "weeks": ("days", 7),
+    "month": ("months", 1),
+    "months": ("months", 1),
+    "year": ("months", 12),
+    "years": ("months", 12),
+}
+
+@dataclass(frozen=True)
+class RecurrenceRule:
+    """Every `interval` days or calendar months"""
+    unit: str
+    interval: int
+
+    def occurrence(self, anchor: date, index: int) -> date:
+        """The index-th occurrence counted from anchor
+
+        Month steps are always taken from the anchor and clamped to the
+        month's last day, so a series anchored on the 31st lands on Feb 28
+        (or 29) and returns to the 31st in March instead of drifting.
+        """
+        if self.unit == "days":
+            return anchor + timedelta(days=self.interval * index)
+        months = anchor.month - 1 + self.interval * index
+        year = anchor.year + months // 12
+        month = months % 12 + 1
+        day = min(anchor.day, calendar.monthrange(year, month)[1])
+        return date(year, month, day)
+
+    def expand(self, anchor: date, after: date, through: date) -> Iterator[date]:
+        """Occurrences of the series anchored at anchor in (after, through]"""
+        if self.unit == "days":
+            index = max((after - anchor).days // self.interval, 0)
+        else:
+            elapsed = (after.year - anchor.year) * 12 + after.month - anchor.month
+            index = max(elapsed // self.interval, 0)
+        while True:
+            occurrence = self.occurrence(anchor, index)
+            if occurrence > through:
+                return
+            if occurrence > after:
+                yield occurrence
+            index += 1
+
+    def next_after(self, anchor: date, after: date) -> date:
+        """The first occurrence strictly after `after`"""
+        return next(self.expand(anchor, after, date.max))
+
+@dataclass(frozen=True)
+class CompiledCalculation:
+    """A parsed Recurrence.calculation, ready to produce rules without string handling"""
+    unit: str
+    step: int
+    uses_value: bool = False
+
+    def rule(self, recurrence_value: Optional[int] = None) -> RecurrenceRule:
+        """The rule for a bill, scaling the step by recurrence_value where it applies"""
+        if not self.uses_value:
+            return RecurrenceRule(self.unit, self.step)
+        if not recurrence_value or recurrence_value < 1:
+            raise RecurrenceError("This recurrence requires a positive recurrence_value")
+        return RecurrenceRule(self.unit, self.step * recurrence_value)
+
+def compile_calculation(calculation: Optional[str]) -> CompiledCalculation:
+    """Parse a Recurrence.calculation, raising RecurrenceError if it is not valid"""
+    text = (calculation or "").strip().lower()
+    if text in NAMED_CALCULATIONS:
+        return CompiledCalculation(*NAMED_CALCULATIONS[text])
+    if text in VALUE_CALCULATIONS:
+        return CompiledCalculation(*VALUE_CALCULATIONS[text], uses_value=True)
+    parts = text.split()
+    if len(parts) == 2 and parts[0].isdigit() and parts[1] in UNIT_ALIASES and int(parts[0]) > 0:
+        unit, step = UNIT_ALIASES[parts[1]]
+        return CompiledCalculation(unit, step * int(parts[0]))
+    raise RecurrenceError(f"Unknown recurrence calculation '{calculation}'")
+
+def parse_calculation(calculation: Optional[str], recurrence_value: Optional[int] = None) -> RecurrenceRule:
+    """Interpret a Recurrence.calculation (plus recurrence_value where it applies)"""
+    return compile_calculation(calculation).rule(recurrence_value)
@@ -1,25 +1,234 @@
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import socket
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from fastapi import FastAPI
-from fastapi_utils.tasks import repeat_every
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import get_session
-from app.core.background_tasks import (
-    update_bank_account_balances,
-    cleanup_old_audit_logs
-)
+from app.config import get_settings
+from app.core import background_tasks  # registers the job handlers
+from app.core.cron import CronSchedule
+from app.core.jobs import enqueue
+from app.database import async_session_maker, engine
+from app.models.job_run import JobRun
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ScheduledJob:
+    """A job run at most once per cron slot across the whole fleet"""
+    name: str
+    func: Callable[[AsyncSession], Awaitable[Any]]
+    cron: str
+    jitter_seconds: float = 0.0        # random delay after the slot, spreads lock attempts
+    max_runtime_seconds: float = 3600.0
+    schedule: CronSchedule = field(init=False)
+
+    def __post_init__(self):
+        self.schedule = CronSchedule(self.cron)
+
+    @property
+    def lock_key(self) -> int:
+        """Stable 64-bit advisory lock key (hash() is salted per process)"""
+        digest = hashlib.sha1(f"scheduler:{self.name}".encode()).digest()
+        return int.from_bytes(digest[:8], "big", signed=True)
+
+class Scheduler:
+    """Cron scheduler that is safe to start in every worker on every node
+
+    Each job runs under a session-level Postgres advisory lock held on a
+    dedicated connection, so runs never overlap; if the process dies the
+    connection closes and the lock goes with it. Holding the lock, the
+    instance then claims the slot by inserting its job_run row, so a worker
+    whose jitter delayed it past a finished run skips that slot too. Missed
+    slots are not caught up: the next slot runs as usual.
+    """
+    def __init__(self):
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    def register(self, job: ScheduledJob) -> None:
+        self.jobs[job.name] = job
+        self.counters[job.name] = {
+            "ran": 0, "failed": 0, "timed_out": 0, "skipped_locked": 0, "skipped_claimed": 0,
+        }
+
+    async def _claim(self, job: ScheduledJob, slot: datetime) -> Optional[int]:
+        """Record the run for this slot; None if another instance already has it"""
+        async with async_session_maker() as session:
+            # Holding the lock means no run of this job is live anywhere, so
+            # rows still 'running' belong to an instance that died mid-run
+            await session.execute(
+                update(JobRun)
+                .where(JobRun.job_name == job.name, JobRun.status == "running")
+                .values(status="abandoned", finished_at=func.now())
+            )
+            run_id = await session.scalar(
+                insert(JobRun)
+                .values(
+                    job_name=job.name,
+                    scheduled_for=slot,
+                    started_at=func.now(),
+                    status="running",
+                    worker=self.worker,
+                )
+                .on_conflict_do_nothing(constraint="uq_job_run_job_scheduled")
+                .returning(JobRun.id)
+            )
+            await session.commit()
+            return run_id
+
+    async def _finish(self, run_id: int, status: str, duration_ms: int, error: Optional[str]) -> None:
+        async with async_session_maker() as session:
+            await session.execute(
+                update(JobRun)
+                .where(JobRun.id == run_id)
+                .values(status=status, finished_at=func.now(), duration_ms=duration_ms, error=error)
+            )
+            await session.commit()
+
+    async def _execute(self, job: ScheduledJob, run_id: int) -> None:
+        counters = self.counters[job.name]
+        status, error = "succeeded", None
+        started = time.monotonic()
+        try:
+            async with async_session_maker() as session:
+                await asyncio.wait_for(job.func(session), timeout=job.max_runtime_seconds)
+        except asyncio.TimeoutError:
+            status, error = "timeout", f"Exceeded {job.max_runtime_seconds}s"
+            counters["timed_out"] += 1
+            logger.error(f"Scheduled job {job.name} exceeded {job.max_runtime_seconds}s and was cancelled")
+        except Exception as exc:
+            status, error = "failed", str(exc)
+            counters["failed"] += 1
+            logger.exception(f"Scheduled job {job.name} failed")
+        duration_ms = int((time.monotonic() - started) * 1000)
+        counters["ran"] += 1
+        await self._finish(run_id, status, duration_ms, error)
+        logger.info(f"Scheduled job {job.name} {status} in {duration_ms}ms")
+
+    async def run_job(self, job: ScheduledJob, slot: datetime) -> None:
+        """Run job for slot if no other instance is running or has run it"""
+        counters = self.counters[job.name]
+        async with engine.connect() as lock_conn:
+            acquired = await lock_conn.scalar(select(func.pg_try_advisory_lock(job.lock_key)))
+            # Session-level lock: commit so the connection is not left idle in
+            # a transaction for the whole run
+            await lock_conn.commit()
+            if not acquired:
+                counters["skipped_locked"] += 1
+                return
+            try:
+                run_id = await self._claim(job, slot)
+                if run_id is None:
+                    counters["skipped_claimed"] += 1
+                    return
+                await self._execute(job, run_id)
+            finally:
+                try:
+                    await lock_conn.scalar(select(func.pg_advisory_unlock(job.lock_key)))
+                    await lock_conn.commit()
+                except BaseException:
+                    # Never hand a connection still holding the lock back to the pool
+                    await lock_conn.invalidate()
+                    raise
+
+    async def _loop(self, job: ScheduledJob) -> None:
+        while True:
+            slot = job.schedule.next_after(datetime.now(timezone.utc))
+            delay = (slot - datetime.now(timezone.utc)).total_seconds()
+            await asyncio.sleep(max(delay, 0) + random.uniform(0, job.jitter_seconds))
+            try:
+                await self.run_job(job, slot)
+            except Exception as exc:
+                logger.error(f"Scheduler could not run {job.name}: {exc}")
+
+    def start(self) -> None:
+        for job in self.jobs.values():
+            self._tasks.append(asyncio.create_task(self._loop(job)))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def last_runs(self) -> List[Dict[str, Any]]:
+        """The most recent run of each job, from any instance"""
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(JobRun)
+                .where(JobRun.job_name.in_(list(self.jobs)))
+                .distinct(JobRun.job_name)
+                .order_by(JobRun.job_name, JobRun.started_at.desc())
+            )
+            return [
+                {
+                    "job_name": run.job_name,
+                    "scheduled_for": run.scheduled_for,
+                    "started_at": run.started_at,
+                    "duration_ms": run.duration_ms,
+                    "status": run.status,
+                    "worker": run.worker,
+                }
+                for run in result.scalars()
+            ]
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "worker": self.worker,
+            "jobs": {
+                name: {"cron": job.cron, **self.counters[name]}
+                for name, job in self.jobs.items()
+            },
+            "last_runs": await self.last_runs(),
+        }
+
+# Create a singleton instance
+scheduler = Scheduler()
+
+def enqueue_job(job_type: str) -> Callable[[AsyncSession], Awaitable[Any]]:
+    """A scheduled job body that hands the work to the job queue workers"""
+    async def run(db: AsyncSession) -> None:
+        # unique: a backlog (workers down) holds one pending run, not one per slot
+        await enqueue(db, job_type, unique=True)
+        await db.commit()
+    return run
 
 def init_scheduler(app: FastAPI) -> None:
-    """Initialize background task scheduler"""
+    """Initialize background task scheduler
 
-    @app.on_event("startup")
-    @repeat_every(seconds=60 * 60)  # Run every hour
-    async def update_balances() -> None:
-        """Update bank account balances"""
-        async with get_session() as session:
-            await update_bank_account_balances(session, app.background_tasks)
+    Scheduled jobs only enqueue; the work itself runs in `python -m app.worker`
+    processes so it stays off the API workers.
+    """
+    for name, job_type, cron in (
+        ("update_balances", "balances.update", settings.BALANCE_UPDATE_CRON),
+        ("cleanup_logs", "audit.retention", settings.AUDIT_RETENTION_CRON),
+        ("expand_recurrences", "recurrence.expand", settings.RECURRENCE_EXPANSION_CRON),
+    ):
+        scheduler.register(ScheduledJob(
+            name=name,
+            func=enqueue_job(job_type),
+            cron=cron,
+            jitter_seconds=settings.SCHEDULER_JITTER_SECONDS,
+            max_runtime_seconds=settings.SCHEDULER_ENQUEUE_TIMEOUT_SECONDS,
+        ))
 
     @app.on_event("startup")
-    @repeat_every(seconds=60 * 60 * 24)  # Run daily
-    async def cleanup_logs() -> None:
-        """Clean up old audit logs"""
-        async with get_session() as session:
-            await cleanup_old_audit_logs(session, app.background_tasks)
+    async def start_scheduler() -> None:
+        if settings.SCHEDULER_ENABLED:
+            scheduler.start()
+
+    @app.on_event("shutdown")
+    async def stop_scheduler() -> None:
+        await scheduler.stop()
@@ -1,18 +1,121 @@
-from typing import AsyncGenerator
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+import logging
+import threading
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from redis.exceptions import RedisError
 from app.config import get_settings
+from app.core.cache import redis_client
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
-# Create async engine
-engine = create_async_engine(
-    settings.database_url.replace("postgresql://", "postgresql+asyncpg://"),
-    echo=settings.DEBUG,  # Only echo in debug mode
-    poolclass=NullPool,  # Use NullPool for async operations
-    future=True,  # Use SQLAlchemy 2.0 style
-)
+class PoolMetrics:
+    """Counters describing connection pool saturation"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.timeouts = 0
+        self.acquire_count = 0
+        self.acquire_total_seconds = 0.0
+        self.acquire_max_seconds = 0.0
+
+    def start_wait(self) -> float:
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+        return time.perf_counter()
+
+    def end_wait(self, started: float, timed_out: bool = False) -> None:
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.waiting -= 1
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.acquire_count += 1
+            self.acquire_total_seconds += elapsed
+            self.acquire_max_seconds = max(self.acquire_max_seconds, elapsed)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            avg = (
+                self.acquire_total_seconds / self.acquire_count
+                if self.acquire_count else 0.0
+            )
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "waiting": self.waiting,
+                "max_waiting": self.max_waiting,
+                "timeouts": self.timeouts,
+                "acquire_avg_ms": round(avg * 1000, 3),
+                "acquire_max_ms": round(self.acquire_max_seconds * 1000, 3),
+            }
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection"""
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = self.metrics.start_wait()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            self.metrics.end_wait(started, timed_out=True)
+            raise
+        self.metrics.end_wait(started)
+        return connection
+
+def _build_engine(url: str):
+    """Create a pooled async engine instrumented with its own metrics"""
+    metrics = PoolMetrics()
+    # Bind metrics at class level so they survive pool recreation on dispose()
+    pool_class = type("InstrumentedQueuePool", (InstrumentedQueuePool,), {"metrics": metrics})
+    new_engine = create_async_engine(
+        url.replace("postgresql://", "postgresql+asyncpg://"),
+        echo=settings.DEBUG,  # Only echo in debug mode
+        poolclass=pool_class,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        future=True,  # Use SQLAlchemy 2.0 style
+    )
+
+    @event.listens_for(new_engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        with metrics._lock:
+            metrics.connects += 1
+
+    @event.listens_for(new_engine.sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        with metrics._lock:
+            metrics.checkouts += 1
+
+    @event.listens_for(new_engine.sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        with metrics._lock:
+            metrics.checkins += 1
+
+    return new_engine
+
+# The single engine for the process: auth (app.auth.database), get_session and
+# app.dependencies.get_db all share this pool and its connection budget.
+engine = _build_engine(settings.database_url)
 
 # Create async session factory
 async_session_maker = async_sessionmaker(
@@ -23,9 +126,129 @@ async_session_maker = async_sessionmaker(
     autoflush=False,
 )
 
+class ReplicaSet:
+    """Round-robin over read replicas, skipping ones that fail health checks
+
+    Health checks run in a background task (monitor), so picking a replica
+    never waits on a probe of an unreachable host.
+    """
+    def __init__(self, urls: List[str], check_interval: int, check_timeout: float):
+        self.engines = [_build_engine(url) for url in urls]
+        self.session_makers = [
+            async_sessionmaker(
+                replica_engine,
+                class_=AsyncSession,
+                expire_on_commit=False,
+                autocommit=False,
+                autoflush=False,
+            )
+            for replica_engine in self.engines
+        ]
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self._healthy = [True] * len(self.engines)
+        self._checked_at = [0.0] * len(self.engines)
+        self._cursor = itertools.count()
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    async def _probe(self, index: int) -> None:
+        async with self.engines[index].connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def check(self, index: int) -> bool:
+        """Probe a replica and record whether it is reachable"""
+        try:
+            await asyncio.wait_for(self._probe(index), timeout=self.check_timeout)
+            healthy = True
+        except Exception as exc:
+            logger.warning(f"Read replica {index} failed health check: {exc}")
+            healthy = False
+        self._healthy[index] = healthy
+        self._checked_at[index] = time.monotonic()
+        return healthy
+
+    def mark_unhealthy(self, index: int) -> None:
+        self._healthy[index] = False
+        self._checked_at[index] = time.monotonic()
+
+    def pick(self) -> Optional[int]:
+        """Get the next healthy replica index, or None to fall back to the primary"""
+        count = len(self.engines)
+        start = next(self._cursor)
+        for offset in range(count):
+            index = (start + offset) % count
+            if self._healthy[index]:
+                return index
+        return None
+
+    async def monitor(self) -> None:
+        """Probe every replica each check_interval until cancelled"""
+        while True:
+            await asyncio.gather(*(self.check(index) for index in range(len(self.engines))))
+            await asyncio.sleep(self.check_interval)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "healthy": self._healthy[index],
+                "checked_out": replica_engine.pool.checkedout(),
+                **replica_engine.pool.metrics.snapshot(),
+            }
+            for index, replica_engine in enumerate(self.engines)
+        ]
+
+    async def dispose(self) -> None:
+        for replica_engine in self.engines:
+            await replica_engine.dispose()
+
+replicas = ReplicaSet(
+    settings.DATABASE_REPLICA_URLS,
+    settings.REPLICA_HEALTH_CHECK_INTERVAL,
+    settings.REPLICA_HEALTH_CHECK_TIMEOUT,
+)
+
+def _pin_key(user_id: Any) -> str:
+    return f"pin:primary:{user_id}"
+
+async def pin_to_primary(user_id: Any) -> None:
+    """Route this user's reads to the primary for the read-after-write window
+
+    The pin lives in Redis with a TTL, so it holds on every worker and
+    expires on its own.
+    """
+    if not replicas:
+        return
+    try:
+        await redis_client.set(_pin_key(user_id), 1, ex=settings.READ_AFTER_WRITE_SECONDS)
+    except RedisError as exc:
+        logger.warning(f"Primary pin write failed: {exc}")
+
+async def is_pinned_to_primary(user_id: Any) -> bool:
+    """Check for a primary pin, reading from the primary when Redis is unavailable"""
+    try:
+        return bool(await redis_client.exists(_pin_key(user_id)))
+    except RedisError as exc:
+        logger.warning(f"Primary pin read failed: {exc}")
+        return True
+
 # Create base class for models
 Base = declarative_base()
 
+def get_pool_stats() -> Dict[str, Any]:
+    """Get current pool occupancy and cumulative checkout metrics"""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        **pool.metrics.snapshot(),
+        "replicas": replicas.stats(),
+    }
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """Get database session"""
     async with async_session_maker() as session:
@@ -34,6 +257,29 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         finally:
             await session.close()
 
+async def get_replica_session(user_id: Any) -> AsyncGenerator[AsyncSession, None]:
+    """Get a read-only session on a replica, falling back to the primary"""
+    index = None
+    if replicas and not await is_pinned_to_primary(user_id):
+        index = replicas.pick()
+    if index is None:
+        async for session in get_session():
+            yield session
+        return
+
+    async with replicas.session_makers[index]() as session:
+        try:
+            yield session
+        except (OSError, DBAPIError):
+            replicas.mark_unhealthy(index)
+            raise
+        finally:
+            await session.close()
+
+# For use outside dependencies: the session is closed when the block exits,
+# even when it is left by return or an exception
+replica_session = asynccontextmanager(get_replica_session)
+
 async def init_db():
     """Initialize database"""
     async with engine.begin() as conn:
@@ -42,3 +288,4 @@ async def init_db():
 async def close_db():
     """Close database connections"""
     await engine.dispose()
+    await replicas.dispose()
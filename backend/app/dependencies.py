@@ -1,13 +1,22 @@
 from typing import AsyncGenerator
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from .database import get_session
+from .database import get_session, get_replica_session
+from .auth.user_manager import get_current_user
+from .auth.principal_cache import Principal
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Get database session dependency"""
     async for session in get_session():
         yield session
 
+async def get_read_db(
+    current_user: Principal = Depends(get_current_user)
+) -> AsyncGenerator[AsyncSession, None]:
+    """Get a session for read-only routes, served by a replica when one is healthy"""
+    async for session in get_replica_session(current_user.id):
+        yield session
+
 # Example of how to use the dependency in a route:
 # @router.get("/items")
 # async def get_items(db: AsyncSession = Depends(get_db)):
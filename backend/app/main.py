@@ -1,4 +1,4 @@
-from fastapi import FastAPI, Request, status, HTTPException
+from fastapi import APIRouter, Depends, FastAPI, Request, status, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
@@ -14,11 +14,21 @@ import os
 import logging
 from pathlib import Path
 from app.auth.routes import router as auth_router
-from app.database import init_db, close_db
+from app.auth.user_manager import get_current_superuser
+from app.routers.dashboard import router as dashboard_router
+from app.routers.projection import router as projection_router
+from app.routers.audit import router as audit_router
+from app.database import init_db, close_db, get_pool_stats, async_session_maker, replicas
+from app.core.cache import response_cache, redis_pool
+from app.auth.principal_cache import principal_cache
+from app.core.projection import projection_cache
+from app.core.audit_writer import audit_writer
+import asyncio
 from app.config import get_settings
 from app.middleware.rate_limit import RateLimitMiddleware
 from app.middleware.error_handler import ErrorHandlerMiddleware
-from app.core.scheduler import init_scheduler
+from app.core.scheduler import init_scheduler, scheduler
+from app.core.jobs import queue_stats
 from app.core.logging import setup_logging
 
 settings = get_settings()
@@ -154,11 +164,20 @@ app.add_middleware(
         "Origin",
         "X-Requested-With",
         "X-CSRF-Token",
+        "If-None-Match",
+        "X-Cache-Bypass",
     ],
     expose_headers=[
         "Content-Range",
         "X-Total-Count",
+        "X-Next-Cursor",
+        "ETag",
+        "X-Cache",
         "X-Error-Message",
+        "X-RateLimit-Limit",
+        "X-RateLimit-Remaining",
+        "X-RateLimit-Reset",
+        "Retry-After",
     ],
     max_age=600,  # 10 minutes
 )
@@ -186,6 +205,9 @@ init_scheduler(app)
 
 # Include auth routes
 app.include_router(auth_router)
+app.include_router(dashboard_router)
+app.include_router(projection_router)
+app.include_router(audit_router)
 
 # Custom exception handlers
 @app.exception_handler(RequestValidationError)
@@ -228,16 +250,81 @@ async def add_security_headers(request: Request, call_next):
 async def root(request: Request):
     return {"message": "Welcome to Budg API"}
 
+# Operational metrics expose cross-user state, so only superusers may read them
+metrics_router = APIRouter(
+    prefix="/api/metrics",
+    tags=["metrics"],
+    dependencies=[Depends(get_current_superuser)]
+)
+
+@metrics_router.get("/db-pool")
+@limiter.limit("30/minute")
+async def db_pool_metrics(request: Request):
+    """Connection pool occupancy and acquire latency for this worker"""
+    return get_pool_stats()
+
+@metrics_router.get("/response-cache")
+@limiter.limit("30/minute")
+async def response_cache_metrics(request: Request):
+    """Response cache hit/miss counters for this worker and Redis evictions"""
+    return await response_cache.stats()
+
+@metrics_router.get("/auth-cache")
+@limiter.limit("30/minute")
+async def auth_cache_metrics(request: Request):
+    """Principal cache counters for this worker"""
+    return principal_cache.stats()
+
+@metrics_router.get("/projection-cache")
+@limiter.limit("30/minute")
+async def projection_cache_metrics(request: Request):
+    """Projection cache counters for this worker"""
+    return projection_cache.entries.stats()
+
+@metrics_router.get("/audit-writer")
+@limiter.limit("30/minute")
+async def audit_writer_metrics(request: Request):
+    """Application-side audit writer counters for this worker"""
+    return audit_writer.stats()
+
+@metrics_router.get("/scheduler")
+@limiter.limit("30/minute")
+async def scheduler_metrics(request: Request):
+    """Scheduled job counters for this worker and the latest run of each job"""
+    return await scheduler.stats()
+
+@metrics_router.get("/jobs")
+@limiter.limit("30/minute")
+async def job_queue_metrics(request: Request):
+    """Backlog, throughput and latency per job type across all workers"""
+    async with async_session_maker() as session:
+        return await queue_stats(session)
+
+app.include_router(metrics_router)
+
 @app.on_event("startup")
 async def on_startup():
     # Initialize database
     await init_db()
+    # Apply principal cache invalidations published by other workers
+    app.state.principal_listener = asyncio.create_task(principal_cache.listen())
+    app.state.projection_listener = asyncio.create_task(projection_cache.listen())
+    # Probe read replicas off the request path
+    app.state.replica_monitor = asyncio.create_task(replicas.monitor())
+    # Flush buffered or outboxed audit changes off the request path
+    app.state.audit_writer = asyncio.create_task(audit_writer.run())
     logger.info("Application startup complete")
 
 @app.on_event("shutdown")
 async def on_shutdown():
+    app.state.principal_listener.cancel()
+    app.state.projection_listener.cancel()
+    app.state.replica_monitor.cancel()
+    app.state.audit_writer.cancel()
+    await audit_writer.close()
     # Close database connections
     await close_db()
+    await redis_pool.disconnect()
     logger.info("Application shutdown complete")
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
+from app.core.exceptions import RateLimitException
 from app.core.rate_limiter import rate_limiter
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
@@ -9,8 +10,16 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             return await call_next(request)
 
         # Check rate limits
-        await rate_limiter.check_rate_limit(request)
+        result = await rate_limiter.check_rate_limit(request)
+        if result is not None and not result.allowed:
+            scope = result.exceeded[0].scope if result.exceeded else "request"
+            raise RateLimitException(
+                detail=f"{scope.capitalize()} rate limit exceeded",
+                headers=result.headers()
+            )
 
         # Process request
         response = await call_next(request)
+        if result is not None:
+            response.headers.update(result.headers())
         return response
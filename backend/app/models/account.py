@@ -1,7 +1,6 @@
 from sqlalchemy import Column, String, ForeignKey, Numeric, Boolean
 from sqlalchemy.orm import relationship
-from app.models.base import Base
-from app.models.audit_log import AuditLogMixin
+from app.models.base import Base, AuditLogMixin
 
 class Account(Base, AuditLogMixin):
     __tablename__ = "accounts"
@@ -0,0 +1,35 @@
+from datetime import datetime
+from sqlalchemy import ForeignKey, Numeric
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from .base import Base
+
+class AppliedPayment(Base):
+    """Paid due bill already deducted from its bank account's balance
+
+    The balance job claims a payment by inserting its row here in the same
+    statement that writes the new balance, so a rerun cannot apply it twice.
+    """
+    __tablename__ = "applied_payment"
+
+    # The paid due bill's id
+    id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("due_bills.id"),
+        primary_key=True
+    )
+    user_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id"),
+        nullable=False,
+        index=True
+    )
+    bank_account: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("bank_account.id"),
+        nullable=False
+    )
+    amount: Mapped[float] = mapped_column(
+        Numeric(10, 2),
+        nullable=False
+    )
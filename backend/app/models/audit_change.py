@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import Any, Dict
+from sqlalchemy import BigInteger, String, CheckConstraint, Index
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from .base import Base
+
+class AuditChange(Base):
+    """One audited insert, update or delete with a JSONB diff of its fields
+
+    Written by the log_changes_jsonb() trigger. changes maps each changed
+    field to [value_before, value_after]; inserts have a null before value
+    and deletes a null after value.
+    """
+    __tablename__ = "audit_change"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    # No foreign key: history must outlive the user it describes
+    user_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=False,
+        index=True
+    )
+    table_name: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False
+    )
+    row_id: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False
+    )
+    action: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False
+    )
+    changes: Mapped[Dict[str, Any]] = mapped_column(
+        JSONB,
+        nullable=False
+    )
+
+    __table_args__ = (
+        CheckConstraint("action IN ('add', 'update', 'delete')", name="check_audit_change_action"),
+        # Per-row history reads
+        Index("ix_audit_change_table_row", "table_name", "row_id", "created_at"),
+        # Retention
+        Index("ix_audit_change_created_at", "created_at"),
+    )
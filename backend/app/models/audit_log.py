@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, Integer, ForeignKey, CheckConstraint
+from sqlalchemy import String, Integer, ForeignKey, CheckConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base import Base
@@ -49,4 +49,6 @@ class AuditLog(Base):
 
     __table_args__ = (
         CheckConstraint("action IN ('add', 'update', 'delete')", name="check_action"),
+        # Drives retention; the table is range-partitioned on created_at by month
+        Index("ix_audit_log_created_at", "created_at"),
     )
@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import Any, Dict
+from sqlalchemy import BigInteger, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from .base import Base
+
+class AuditOutbox(Base):
+    """Audit changes committed with their transaction, awaiting audit_change
+
+    Deliberately unindexed beyond the primary key so writing here is cheap
+    on the request path; the audit writer moves rows out in batches.
+    """
+    __tablename__ = "audit_outbox"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    user_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=False
+    )
+    table_name: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False
+    )
+    row_id: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False
+    )
+    action: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False
+    )
+    changes: Mapped[Dict[str, Any]] = mapped_column(
+        JSONB,
+        nullable=False
+    )
@@ -1,6 +1,6 @@
 from datetime import datetime, date
 from typing import Optional
-from sqlalchemy import ForeignKey, Integer, Numeric, Boolean
+from sqlalchemy import ForeignKey, Integer, Numeric, Boolean, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base import Base
@@ -28,12 +28,10 @@ class BankAccountInstance(Base):
     priority: Mapped[int] = mapped_column(
         Integer,
         default=0,
-        nullable=False,
-        index=True
+        nullable=False
     )
     due_date: Mapped[date] = mapped_column(
-        nullable=False,
-        index=True
+        nullable=False
     )
     pay_date: Mapped[Optional[date]] = mapped_column(
         nullable=True,
@@ -59,3 +57,12 @@ class BankAccountInstance(Base):
     user: Mapped["User"] = relationship(back_populates="bank_account_instances")
     bank_account_obj: Mapped["BankAccount"] = relationship(back_populates="instances")
     status_obj: Mapped[Optional["BillStatus"]] = relationship(back_populates="bank_account_instances")
+
+    __table_args__ = (
+        # Dashboard and keyset list order for a user's active rows
+        Index(
+            "ix_bank_account_instance_user_due_date_priority",
+            "user_id", "due_date", "priority", "id",
+            postgresql_where=text("archived = false")
+        ),
+    )
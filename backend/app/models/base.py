@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Any
 from sqlalchemy import DateTime, func, String, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.orm import DeclarativeBase, Mapped, declared_attr, mapped_column, relationship
 from uuid import uuid4
 from .user import User  # Import User for type hints
 
@@ -45,5 +45,7 @@ class AuditLogMixin:
         index=True
     )
 
-    # Relationship
-    user: Mapped["User"] = relationship(back_populates="audit_logs")
+    # Relationship; User.audit_logs belongs to AuditLog, so nothing to back-populate
+    @declared_attr
+    def user(cls) -> Mapped["User"]:
+        return relationship()
@@ -1,7 +1,6 @@
 from sqlalchemy import Column, String, ForeignKey, Numeric, Date, Boolean
 from sqlalchemy.orm import relationship
-from app.models.base import Base
-from app.models.audit_log import AuditLogMixin
+from app.models.base import Base, AuditLogMixin
 
 class Budget(Base, AuditLogMixin):
     __tablename__ = "budgets"
@@ -1,6 +1,6 @@
 from datetime import datetime, date
 from typing import Optional
-from sqlalchemy import String, Boolean, ForeignKey, Integer, Numeric, Text, CheckConstraint
+from sqlalchemy import String, Boolean, ForeignKey, Integer, Numeric, Text, CheckConstraint, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base import Base
@@ -15,8 +15,7 @@ class DueBill(Base):
 
     id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True),
-        primary_key=True,
-        index=True
+        primary_key=True
     )
     user_id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -41,12 +40,10 @@ class DueBill(Base):
     priority: Mapped[int] = mapped_column(
         Integer,
         default=0,
-        nullable=False,
-        index=True
+        nullable=False
     )
     due_date: Mapped[date] = mapped_column(
-        nullable=False,
-        index=True
+        nullable=False
     )
     pay_date: Mapped[Optional[date]] = mapped_column(
         nullable=True,
@@ -93,4 +90,18 @@ class DueBill(Base):
 
     __table_args__ = (
         CheckConstraint("recurrence_value > 0", name="check_recurrence_value"),
+        # One occurrence per bill and date; recurrence expansion relies on it
+        Index("uq_due_bills_bill_due_date", "bill", "due_date", unique=True),
+        # Recently paid bills, scanned by the hourly balance job
+        Index(
+            "ix_due_bills_paid_updated_at",
+            "updated_at",
+            postgresql_where=text("pay_date IS NOT NULL")
+        ),
+        # Dashboard and keyset list order for a user's active rows
+        Index(
+            "ix_due_bills_user_due_date_priority",
+            "user_id", "due_date", "priority", "id",
+            postgresql_where=text("archived = false")
+        ),
     )
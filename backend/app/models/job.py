@@ -0,0 +1,80 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+from sqlalchemy import BigInteger, DateTime, Integer, String, Text, CheckConstraint, Index, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from .base import Base
+
+class Job(Base):
+    """A unit of background work in the durable queue
+
+    Workers claim queued rows with FOR UPDATE SKIP LOCKED and lease them
+    until locked_until. Failed jobs go back to queued with a later run_at
+    until max_attempts, then stay here as dead letters.
+    """
+    __tablename__ = "job"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    job_type: Mapped[str] = mapped_column(
+        String(100),
+        nullable=False
+    )
+    payload: Mapped[Dict[str, Any]] = mapped_column(
+        JSONB,
+        nullable=False,
+        server_default=text("'{}'::jsonb")
+    )
+    status: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        server_default="queued"
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        server_default="0"
+    )
+    max_attempts: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False
+    )
+    # Not claimed before this time (retry backoff, delayed jobs)
+    run_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now()
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True
+    )
+    # Lease: a running job past this time belonged to a worker that died
+    locked_until: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True
+    )
+    locked_by: Mapped[Optional[str]] = mapped_column(
+        String(255),
+        nullable=True
+    )
+    last_error: Mapped[Optional[str]] = mapped_column(
+        Text,
+        nullable=True
+    )
+
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('queued', 'running', 'succeeded', 'dead')",
+            name="check_job_status"
+        ),
+        # The claim query: only queued rows, oldest due first
+        Index("ix_job_queued_run_at", "run_at", postgresql_where=text("status = 'queued'")),
+        # Expired leases
+        Index("ix_job_running_locked_until", "locked_until", postgresql_where=text("status = 'running'")),
+        # Metrics and cleanup of finished jobs
+        Index("ix_job_type_finished_at", "job_type", "finished_at"),
+    )
@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import BigInteger, DateTime, Integer, String, Text, CheckConstraint, Index, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from .base import Base
+
+class JobRun(Base):
+    """One run of a scheduled job
+
+    The (job_name, scheduled_for) pair is unique: the first instance to
+    insert it owns that slot, so a slot runs once however many workers
+    wake up for it.
+    """
+    __tablename__ = "job_run"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    job_name: Mapped[str] = mapped_column(
+        String(100),
+        nullable=False
+    )
+    # The cron slot this run is for
+    scheduled_for: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False
+    )
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True
+    )
+    duration_ms: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        nullable=True
+    )
+    status: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False
+    )
+    error: Mapped[Optional[str]] = mapped_column(
+        Text,
+        nullable=True
+    )
+    # host:pid of the instance that ran it
+    worker: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False
+    )
+
+    __table_args__ = (
+        UniqueConstraint("job_name", "scheduled_for", name="uq_job_run_job_scheduled"),
+        CheckConstraint(
+            "status IN ('running', 'succeeded', 'failed', 'timeout', 'abandoned')",
+            name="check_job_run_status"
+        ),
+        # Latest runs per job
+        Index("ix_job_run_job_started", "job_name", "started_at"),
+    )
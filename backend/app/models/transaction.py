@@ -1,7 +1,6 @@
 from sqlalchemy import Column, String, ForeignKey, Numeric, Date, Boolean, Text
 from sqlalchemy.orm import relationship
-from app.models.base import Base
-from app.models.audit_log import AuditLogMixin
+from app.models.base import Base, AuditLogMixin
 
 class Transaction(Base, AuditLogMixin):
     __tablename__ = "transactions"
@@ -0,0 +1,83 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import Text, column, func, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.auth.principal_cache import Principal
+from app.auth.user_manager import get_current_user
+from app.dependencies import get_read_db
+from app.models.audit_change import AuditChange
+from app.schemas.audit import AuditFieldChange
+
+router = APIRouter(prefix="/audit", tags=["audit"])
+
+# Tables whose history users may read. users, api_token and oauth_account
+# are left out: rows converted from the old per-field log may hold secrets.
+HISTORY_TABLES = frozenset({
+    "bill_status",
+    "recurrence",
+    "category",
+    "bank_account",
+    "bills",
+    "due_bills",
+    "bank_account_instance",
+    "accounts",
+    "transactions",
+    "budgets",
+})
+
+@router.get("/{table_name}/{row_id}", response_model=List[AuditFieldChange])
+async def get_row_history(
+    table_name: str,
+    row_id: str,
+    field: Optional[str] = Query(None, description="Only changes to this field"),
+    limit: int = Query(100, ge=1, le=1000),
+    session: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Per-field change history of one row, newest first
+
+    Each stored change holds a JSONB diff; it is expanded into one entry
+    per field so callers see the same shape as the per-field audit log.
+    """
+    if table_name not in HISTORY_TABLES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No audit history for table '{table_name}'"
+        )
+    fields = func.jsonb_each(AuditChange.changes).table_valued(
+        column("key", Text),
+        column("value", JSONB),
+    ).alias("fields")
+    query = (
+        select(
+            AuditChange.id,
+            AuditChange.action,
+            AuditChange.created_at,
+            fields.c.key,
+            fields.c.value,
+        )
+        .select_from(AuditChange)
+        .join(fields, True)
+        .where(
+            AuditChange.user_id == current_user.id,
+            AuditChange.table_name == table_name,
+            AuditChange.row_id == row_id,
+        )
+        .order_by(AuditChange.created_at.desc(), AuditChange.id.desc(), fields.c.key)
+        .limit(limit)
+    )
+    if field is not None:
+        query = query.where(fields.c.key == field)
+    result = await session.execute(query)
+    return [
+        {
+            "change_id": row.id,
+            "action": row.action,
+            "field_name": row.key,
+            "value_before_change": row.value[0],
+            "value_after_change": row.value[1],
+            "created_at": row.created_at,
+        }
+        for row in result
+    ]
@@ -0,0 +1,66 @@
+from typing import Any, Dict, Iterable, List, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.audit_writer import audit_writer
+
+Change = Tuple[Dict[str, Any], Dict[str, Any]]
+
+class AuditMixin:
+    """Application-side audit hooks for BaseRouter's statement-level writes
+
+    Statement-level writes skip the ORM flush, so writes to audited models
+    also return each row's previous values and are recorded with the audit
+    writer.
+    """
+    model: Any
+    audited: bool
+
+    @property
+    def _auditing(self) -> bool:
+        return self.audited and audit_writer.enabled
+
+    def _with_before(self, statement: Any, *criteria: Any) -> Any:
+        """Add the values the written rows had before the write to its RETURNING
+
+        The rows matching criteria are read and locked in a FROM subquery of
+        the write itself, so the before-image costs no extra round trip.
+        """
+        if not self._auditing:
+            return statement
+        before = (
+            select(*self.model.__table__.columns)
+            .where(*criteria)
+            .with_for_update()
+            .subquery("previous")
+        )
+        return statement.where(self.model.id == before.c.id).returning(*before.c)
+
+    def _split_before(self, rows: Iterable[Any]) -> List[Tuple[Any, Dict[str, Any]]]:
+        """(returned value, before-image) pairs from a statement built with _with_before"""
+        if not self._auditing:
+            return [(row[0], {}) for row in rows]
+        keys = self.model.__table__.columns.keys()
+        return [(row[0], dict(zip(keys, row[1:]))) for row in rows]
+
+    def _deletion_changes(self, rows: Iterable[Dict[str, Any]]) -> Tuple[str, List[Change]]:
+        """Audit action and (before, after) pairs for deleting or archiving rows"""
+        if hasattr(self.model, 'archived'):
+            return "update", [(row, {**row, "archived": True}) for row in rows]
+        return "delete", [(row, {}) for row in rows]
+
+    def _audit(self, session: AsyncSession, action: str, changes: List[Change]) -> None:
+        """Queue (before, after) row values with the audit writer"""
+        if not self._auditing:
+            return
+        for before, after in changes:
+            row = after or before
+            audit_writer.record(
+                session.sync_session,
+                self.model.__tablename__,
+                row["user_id"],
+                row["id"],
+                action,
+                before,
+                after
+            )
@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from app.core.projection import projection_cache
 from app.routers.base import BaseRouter
 from app.models.bank_account import BankAccount
 from app.schemas.base import (
@@ -13,5 +14,6 @@ router = BaseRouter(
     update_schema=BankAccountUpdate,
     response_schema=BankAccountResponse,
     prefix="/bank-accounts",
-    tags=["bank-accounts"]
+    tags=["bank-accounts"],
+    write_listeners=[projection_cache]
 ).router
@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from app.core.projection import projection_cache
 from app.routers.base import BaseRouter
 from app.models.bank_account_instance import BankAccountInstance
 from app.schemas.base import (
@@ -13,5 +14,8 @@ router = BaseRouter(
     update_schema=BankAccountInstanceUpdate,
     response_schema=BankAccountInstanceResponse,
     prefix="/bank-account-instances",
-    tags=["bank-account-instances"]
+    tags=["bank-account-instances"],
+    sort_keys=("due_date", "priority", "id"),
+    reorderable=True,
+    write_listeners=[projection_cache]
 ).router
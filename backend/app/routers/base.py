@@ -1,20 +1,45 @@
-from typing import Type, TypeVar, Generic, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, Sequence, Type, TypeVar, Generic, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, insert, tuple_
 from sqlalchemy.orm import DeclarativeBase
 
+from app.config import get_settings
 from app.database import get_session
+from app.dependencies import get_read_db
 from app.auth.user_manager import get_current_user
-from app.models.user import User
+from app.auth.principal_cache import Principal
+from app.models.base import AuditLogMixin
+from app.schemas.base import PriorityResponse
+from app.routers.auditing import AuditMixin
+from app.routers.bulk import BulkMixin
+from app.routers.caching import CachingMixin, etag_matches, make_etag, not_modified
+from app.routers.pagination import DEFAULT_PAGE_SIZE, NDJSON_MEDIA_TYPE, PaginationMixin
+from app.routers.reorder import ReorderMixin
 
 T = TypeVar('T', bound=DeclarativeBase)
 CreateSchema = TypeVar('CreateSchema', bound=BaseModel)
 UpdateSchema = TypeVar('UpdateSchema', bound=BaseModel)
 ResponseSchema = TypeVar('ResponseSchema', bound=BaseModel)
 
-class BaseRouter(Generic[T, CreateSchema, UpdateSchema, ResponseSchema]):
+settings = get_settings()
+
+class BaseRouter(
+    PaginationMixin,
+    CachingMixin,
+    BulkMixin,
+    ReorderMixin,
+    AuditMixin,
+    Generic[T, CreateSchema, UpdateSchema, ResponseSchema]
+):
+    """CRUD routes for a user-owned model
+
+    List pagination, caching, bulk operations, reordering and audit hooks
+    live in the mixins this class composes.
+    """
     def __init__(
         self,
         model: Type[T],
@@ -22,90 +47,207 @@ class BaseRouter(Generic[T, CreateSchema, UpdateSchema, ResponseSchema]):
         update_schema: Type[UpdateSchema],
         response_schema: Type[ResponseSchema],
         prefix: str,
-        tags: List[str]
+        tags: List[str],
+        sort_keys: Sequence[str] = ("id",),
+        bulk_max_items: Optional[int] = None,
+        cache_responses: bool = False,
+        reorderable: bool = False,
+        write_listeners: Sequence[Any] = ()
     ):
         self.router = APIRouter(prefix=prefix, tags=tags)
         self.model = model
         self.create_schema = create_schema
         self.update_schema = update_schema
         self.response_schema = response_schema
+        # Columns defining a stable list order; the last one must be unique
+        self.sort_columns = [getattr(model, key) for key in sort_keys]
+        self.bulk_max_items = bulk_max_items or settings.BULK_MAX_ITEMS
+        self.cache_responses = cache_responses and settings.RESPONSE_CACHE_ENABLED
+        # Objects with an async handle_write(model, user_id, items, deleted_ids)
+        self.write_listeners = list(write_listeners)
+        # Statement-level writes skip the ORM flush, so audited models are
+        # recorded here for the application-side audit writer
+        self.audited = issubclass(model, AuditLogMixin)
 
-        self.router.add_api_route(
-            "/",
-            self.create,
-            methods=["POST"],
-            response_model=response_schema,
-            status_code=status.HTTP_201_CREATED
-        )
-        self.router.add_api_route(
-            "/",
-            self.list,
-            methods=["GET"],
-            response_model=List[response_schema]
-        )
-        self.router.add_api_route(
-            "/{id}",
-            self.get,
-            methods=["GET"],
-            response_model=response_schema
-        )
-        self.router.add_api_route(
-            "/{id}",
-            self.update,
-            methods=["PUT"],
-            response_model=response_schema
-        )
-        self.router.add_api_route(
-            "/{id}",
-            self.delete,
-            methods=["DELETE"],
-            status_code=status.HTTP_204_NO_CONTENT
-        )
+        list_of = List[response_schema]
+        routes = [
+            # Bulk routes are registered before "/{id}" so DELETE /bulk is not
+            # captured by the single-item route
+            ("/bulk", self.bulk_create, "POST", list_of, status.HTTP_201_CREATED),
+            ("/bulk", self.bulk_update, "PATCH", list_of, None),
+            ("/bulk", self.bulk_delete, "DELETE", None, status.HTTP_204_NO_CONTENT),
+            ("/", self.create, "POST", response_schema, status.HTTP_201_CREATED),
+            ("/", self.list, "GET", list_of, None),
+            ("/{id}", self.get, "GET", response_schema, None),
+            ("/{id}", self.update, "PUT", response_schema, None),
+            ("/{id}", self.delete, "DELETE", None, status.HTTP_204_NO_CONTENT),
+        ]
+        if reorderable:
+            routes.insert(0, ("/reorder", self.reorder, "POST", List[PriorityResponse], None))
+        for path, endpoint, method, response_model, status_code in routes:
+            self.router.add_api_route(
+                path,
+                endpoint,
+                methods=[method],
+                response_model=response_model,
+                **({"status_code": status_code} if status_code else {})
+            )
 
     async def create(
         self,
         data: CreateSchema,
         session: AsyncSession = Depends(get_session),
-        current_user: User = Depends(get_current_user)
+        current_user: Principal = Depends(get_current_user)
     ) -> ResponseSchema:
-        db_item = self.model(**data.dict(), user_id=current_user.id)
-        session.add(db_item)
+        # INSERT ... RETURNING gives back server defaults without a refresh
+        db_item = await session.scalar(
+            insert(self.model)
+            .values(**data.dict(), user_id=current_user.id)
+            .returning(self.model)
+        )
+        self._audit(session, "add", [({}, db_item.to_dict())])
         await session.commit()
-        await session.refresh(db_item)
+        await self._after_write(current_user.id, items=[db_item])
         return self.response_schema.from_orm(db_item)
 
+    def _not_found(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{self.model.__name__} not found"
+        )
+
+    def _coerce_id(self, value: Any) -> Any:
+        python_type = self.model.id.type.python_type
+        return value if isinstance(value, python_type) else python_type(value)
+
+    def _delete_statement(self, *criteria: Any) -> Any:
+        """Archive rows when the model supports it, otherwise delete them, returning ids"""
+        if hasattr(self.model, 'archived'):
+            # Soft delete
+            statement = update(self.model).where(*criteria).values(archived=True)
+        else:
+            # Hard delete
+            statement = delete(self.model).where(*criteria)
+        return statement.returning(self.model.id).execution_options(synchronize_session=False)
+
     async def list(
         self,
-        session: AsyncSession = Depends(get_session),
-        current_user: User = Depends(get_current_user),
+        request: Request,
+        response: Response,
+        session: AsyncSession = Depends(get_read_db),
+        current_user: Principal = Depends(get_current_user),
         skip: int = 0,
-        limit: int = 100
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+        accept: Optional[str] = Header(None),
+        if_none_match: Optional[str] = Header(None),
+        x_cache_bypass: Optional[str] = Header(None)
     ) -> List[ResponseSchema]:
-        query = select(self.model).where(self.model.user_id == current_user.id)
+        streaming = bool(accept and NDJSON_MEDIA_TYPE in accept)
+        headers = {"Cache-Control": "private, no-cache"}
+        # Answer unchanged collections before loading or serializing any rows
+        generation, etag = await self._list_etag(request, current_user.id, accept)
+        if etag:
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            headers["ETag"] = etag
+
+        cache_key = None
+        if self.cache_responses and not streaming and generation is not None:
+            cache_key, cached = await self._cached_list(
+                request, current_user.id, generation, accept, headers, bool(x_cache_bypass)
+            )
+            if cached is not None:
+                return cached
+
+        if fields:
+            columns, partial_schema = self._resolve_fields(fields)
+            query = select(*columns)
+        else:
+            query = select(self.model)
+        query = query.where(self.model.user_id == current_user.id)
         if hasattr(self.model, 'archived'):
             query = query.where(self.model.archived == False)
-        query = query.offset(skip).limit(limit)
-        result = await session.execute(query)
-        items = result.scalars().all()
-        return [self.response_schema.from_orm(item) for item in items]
+        if cursor is not None:
+            # Keyset pagination: seek past the last row instead of counting offsets
+            query = query.where(
+                tuple_(*self.sort_columns) > tuple_(*self._decode_cursor(cursor))
+            )
+        else:
+            query = query.offset(skip)
+        query = query.order_by(*self.sort_columns)
+
+        if streaming:
+            # Streams are unbounded unless the caller asks for a limit
+            if limit is not None:
+                query = query.limit(limit)
+            return StreamingResponse(
+                self._stream_ndjson(
+                    query,
+                    current_user.id,
+                    partial_schema if fields else self.response_schema,
+                    scalars=not fields
+                ),
+                media_type=NDJSON_MEDIA_TYPE,
+                headers=headers
+            )
+
+        limit = DEFAULT_PAGE_SIZE if limit is None else limit
+        result = await session.execute(query.limit(limit + 1))
+        items = result.all() if fields else result.scalars().all()
+        if len(items) > limit:
+            items = items[:limit]
+            headers["X-Next-Cursor"] = self._encode_cursor(items[-1])
+
+        schema = partial_schema if fields else self.response_schema
+        if cache_key:
+            return await self._store_list(cache_key, items, schema, headers, bool(x_cache_bypass))
+        if fields:
+            # Bypass the full response_model so omitted fields are not required
+            return JSONResponse(
+                content=jsonable_encoder([schema.from_orm(row) for row in items]),
+                headers=headers
+            )
+        response.headers.update(headers)
+        return [schema.from_orm(item) for item in items]
 
     async def get(
         self,
         id: int,
-        session: AsyncSession = Depends(get_session),
-        current_user: User = Depends(get_current_user)
+        response: Response,
+        session: AsyncSession = Depends(get_read_db),
+        current_user: Principal = Depends(get_current_user),
+        fields: Optional[str] = None,
+        if_none_match: Optional[str] = Header(None)
     ) -> ResponseSchema:
-        query = select(self.model).where(
-            self.model.id == id,
-            self.model.user_id == current_user.id
-        )
-        result = await session.execute(query)
-        item = result.scalar_one_or_none()
+        owned = (self.model.id == id, self.model.user_id == current_user.id)
+        if if_none_match:
+            # Revalidate against updated_at alone before loading the row
+            updated_at = await session.scalar(select(self.model.updated_at).where(*owned))
+            etag = make_etag(id, updated_at, fields)
+            if updated_at is not None and etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
+        if fields:
+            columns, partial_schema = self._resolve_fields(fields)
+            query = select(*columns, self.model.updated_at)
+        else:
+            query = select(self.model)
+        result = await session.execute(query.where(*owned))
+        item = result.one_or_none() if fields else result.scalar_one_or_none()
         if item is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"{self.model.__name__} not found"
+            raise self._not_found()
+        headers = {
+            "ETag": make_etag(id, item.updated_at, fields),
+            "Cache-Control": "private, no-cache"
+        }
+        if fields:
+            return JSONResponse(
+                content=jsonable_encoder(partial_schema.from_orm(item)),
+                headers=headers
             )
+        response.headers.update(headers)
         return self.response_schema.from_orm(item)
 
     async def update(
@@ -113,54 +255,47 @@ class BaseRouter(Generic[T, CreateSchema, UpdateSchema, ResponseSchema]):
         id: int,
         data: UpdateSchema,
         session: AsyncSession = Depends(get_session),
-        current_user: User = Depends(get_current_user)
+        current_user: Principal = Depends(get_current_user)
     ) -> ResponseSchema:
-        query = select(self.model).where(
-            self.model.id == id,
-            self.model.user_id == current_user.id
-        )
-        result = await session.execute(query)
-        item = result.scalar_one_or_none()
+        changes = data.dict(exclude_unset=True)
+        owned = (self.model.id == id, self.model.user_id == current_user.id)
+        before = None
+        if changes:
+            # Ownership check, write, read-back and before-image in one statement
+            result = await session.execute(self._with_before(
+                update(self.model)
+                .where(*owned)
+                .values(**changes)
+                .returning(self.model)
+                .execution_options(synchronize_session=False),
+                *owned
+            ))
+            written = self._split_before(result.all())
+            item, before = written[0] if written else (None, None)
+        else:
+            item = await session.scalar(select(self.model).where(*owned))
         if item is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"{self.model.__name__} not found"
-            )
-
-        for key, value in data.dict(exclude_unset=True).items():
-            setattr(item, key, value)
+            raise self._not_found()
 
+        if before:
+            self._audit(session, "update", [(before, item.to_dict())])
         await session.commit()
-        await session.refresh(item)
+        await self._after_write(current_user.id, items=[item])
         return self.response_schema.from_orm(item)
 
     async def delete(
         self,
         id: int,
         session: AsyncSession = Depends(get_session),
-        current_user: User = Depends(get_current_user)
+        current_user: Principal = Depends(get_current_user)
     ) -> None:
-        query = select(self.model).where(
-            self.model.id == id,
-            self.model.user_id == current_user.id
-        )
-        result = await session.execute(query)
-        item = result.scalar_one_or_none()
-        if item is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"{self.model.__name__} not found"
-            )
-
-        if hasattr(self.model, 'archived'):
-            # Soft delete
-            await session.execute(
-                update(self.model)
-                .where(self.model.id == id)
-                .values(archived=True)
-            )
-        else:
-            # Hard delete
-            await session.delete(item)
+        owned = (self.model.id == id, self.model.user_id == current_user.id)
+        result = await session.execute(self._with_before(self._delete_statement(*owned), *owned))
+        deleted = self._split_before(result.all())
+        if not deleted:
+            raise self._not_found()
 
+        deleted_id, before = deleted[0]
+        self._audit(session, *self._deletion_changes([before]))
         await session.commit()
+        await self._after_write(current_user.id, deleted_ids=[deleted_id])
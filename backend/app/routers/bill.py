@@ -13,5 +13,6 @@ router = BaseRouter(
     update_schema=BillUpdate,
     response_schema=BillResponse,
     prefix="/bills",
-    tags=["bills"]
+    tags=["bills"],
+    cache_responses=True
 ).router
@@ -0,0 +1,190 @@
+from typing import Any, Dict, List, Tuple, Type
+from fastapi import Body, Depends, HTTPException, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select, update, insert, values, column
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_session
+from app.auth.user_manager import get_current_user
+from app.auth.principal_cache import Principal
+
+class BulkMixin:
+    """Bulk create, update and delete endpoints for BaseRouter
+
+    Every item is validated before anything is written, and each operation
+    is one multi-row statement (per group of changed columns for updates)
+    in a single transaction.
+    """
+    model: Any
+    create_schema: Type[BaseModel]
+    update_schema: Type[BaseModel]
+    response_schema: Type[BaseModel]
+    bulk_max_items: int
+
+    def _check_bulk_size(self, items: List[Any]) -> None:
+        if not items:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Bulk request must contain at least one item"
+            )
+        if len(items) > self.bulk_max_items:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Bulk requests are limited to {self.bulk_max_items} items"
+            )
+
+    def _validate_bulk(
+        self,
+        items: List[Dict[str, Any]],
+        schema: Type[BaseModel],
+        with_id: bool
+    ) -> List[Tuple[Any, Dict[str, Any]]]:
+        """Validate every item, reporting all failures by index before writing anything"""
+        validated = []
+        errors = []
+        for index, item in enumerate(items):
+            item = dict(item)
+            try:
+                item_id = self._coerce_id(item.pop("id")) if with_id else None
+                data = schema(**item).dict(exclude_unset=with_id)
+            except KeyError:
+                errors.append({"index": index, "errors": [{"loc": ["id"], "msg": "field required"}]})
+                continue
+            except (TypeError, ValueError) as exc:
+                detail = exc.errors() if isinstance(exc, ValidationError) else [{"loc": ["id"], "msg": str(exc)}]
+                errors.append({"index": index, "errors": detail})
+                continue
+            validated.append((item_id, data))
+        if errors:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=errors
+            )
+        return validated
+
+    def _raise_missing(self, requested: List[Any], found: List[Any]) -> None:
+        missing = set(requested) - set(found)
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={
+                    "message": f"{self.model.__name__} not found",
+                    "ids": sorted(str(item_id) for item_id in missing)
+                }
+            )
+
+    async def bulk_create(
+        self,
+        items: List[Dict[str, Any]] = Body(...),
+        session: AsyncSession = Depends(get_session),
+        current_user: Principal = Depends(get_current_user)
+    ) -> List[Any]:
+        self._check_bulk_size(items)
+        rows = [
+            {**data, "user_id": current_user.id}
+            for _, data in self._validate_bulk(items, self.create_schema, with_id=False)
+        ]
+        # Multi-row INSERT ... RETURNING in a single transaction; rows come
+        # back in request order so the response lines up with the items sent
+        result = await session.scalars(
+            insert(self.model).returning(self.model, sort_by_parameter_order=True),
+            rows
+        )
+        created = result.all()
+        self._audit(session, "add", [({}, item.to_dict()) for item in created])
+        await session.commit()
+        await self._after_write(current_user.id, items=created)
+        return [self.response_schema.from_orm(item) for item in created]
+
+    async def bulk_update(
+        self,
+        items: List[Dict[str, Any]] = Body(...),
+        session: AsyncSession = Depends(get_session),
+        current_user: Principal = Depends(get_current_user)
+    ) -> List[Any]:
+        self._check_bulk_size(items)
+        validated = self._validate_bulk(items, self.update_schema, with_id=True)
+        seen = set()
+        duplicates = {item_id for item_id, _ in validated if item_id in seen or seen.add(item_id)}
+        if duplicates:
+            # A row matched twice by UPDATE ... FROM takes an arbitrary one of its values
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={
+                    "message": "Duplicate ids in bulk request",
+                    "ids": sorted(str(item_id) for item_id in duplicates)
+                }
+            )
+
+        # Items touching the same columns share one UPDATE ... FROM (VALUES ...)
+        groups: Dict[Tuple[str, ...], List[Tuple[Any, Dict[str, Any]]]] = {}
+        for item_id, data in validated:
+            groups.setdefault(tuple(sorted(data)), []).append((item_id, data))
+
+        table = self.model.__table__
+        updated = {}
+        before = {}
+        for keys, group in groups.items():
+            owned = (
+                self.model.id.in_([item_id for item_id, _ in group]),
+                self.model.user_id == current_user.id
+            )
+            if not keys:
+                # Nothing to change; still confirm ownership below
+                result = await session.scalars(select(self.model).where(*owned))
+                written = [(item, {}) for item in result.all()]
+            else:
+                rows = values(
+                    column("id", table.c.id.type),
+                    *(column(key, table.c[key].type) for key in keys),
+                    name="bulk_values"
+                ).data([(item_id, *(data[key] for key in keys)) for item_id, data in group])
+                result = await session.execute(self._with_before(
+                    update(self.model)
+                    .where(
+                        self.model.id == rows.c.id,
+                        self.model.user_id == current_user.id
+                    )
+                    .values({key: rows.c[key] for key in keys})
+                    .returning(self.model)
+                    .execution_options(synchronize_session=False),
+                    *owned
+                ))
+                written = self._split_before(result.all())
+            for item, values_before in written:
+                updated[item.id] = item
+                if values_before:
+                    before[item.id] = values_before
+
+        requested = [item_id for item_id, _ in validated]
+        self._raise_missing(requested, list(updated))
+        self._audit(session, "update", [
+            (before[item_id], item.to_dict()) for item_id, item in updated.items() if item_id in before
+        ])
+        await session.commit()
+        await self._after_write(current_user.id, items=list(updated.values()))
+        return [self.response_schema.from_orm(updated[item_id]) for item_id in requested]
+
+    async def bulk_delete(
+        self,
+        ids: List[Any] = Body(..., embed=True),
+        session: AsyncSession = Depends(get_session),
+        current_user: Principal = Depends(get_current_user)
+    ) -> None:
+        self._check_bulk_size(ids)
+        try:
+            ids = [self._coerce_id(item_id) for item_id in ids]
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Invalid id in bulk request"
+            )
+
+        owned = (self.model.id.in_(ids), self.model.user_id == current_user.id)
+        result = await session.execute(self._with_before(self._delete_statement(*owned), *owned))
+        deleted = self._split_before(result.all())
+        deleted_ids = [deleted_id for deleted_id, _ in deleted]
+        self._raise_missing(ids, deleted_ids)
+        self._audit(session, *self._deletion_changes([values_before for _, values_before in deleted if values_before]))
+        await session.commit()
+        await self._after_write(current_user.id, deleted_ids=list(deleted_ids))
@@ -0,0 +1,108 @@
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple, Type
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from app.core.cache import CachedResponse, response_cache
+from app.database import pin_to_primary
+
+def make_etag(*parts: Any) -> str:
+    """Build a strong ETag from the parts identifying a representation"""
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+    )
+
+class CachingMixin:
+    """ETags, the Redis response cache and post-write invalidation for BaseRouter"""
+    model: Any
+    cache_responses: bool
+    write_listeners: List[Any]
+
+    async def _list_etag(
+        self,
+        request: Request,
+        user_id: Any,
+        accept: Optional[str]
+    ) -> Tuple[Optional[int], Optional[str]]:
+        """Get the collection generation and the ETag of a list request
+
+        Both are None when Redis is unavailable; the list is then served
+        without an ETag rather than with one that may not change on writes.
+        """
+        generation = await response_cache.generation(self.model.__tablename__, user_id)
+        if generation is None:
+            return None, None
+        etag = make_etag(self.model.__tablename__, user_id, generation, request.url.query, accept)
+        return generation, etag
+
+    async def _cached_list(
+        self,
+        request: Request,
+        user_id: Any,
+        generation: int,
+        accept: Optional[str],
+        headers: Dict[str, str],
+        bypass: bool
+    ) -> Tuple[str, Optional[Response]]:
+        """Get the response cache key for a list request and a cached response to serve"""
+        cache_key = response_cache.key(
+            self.model.__tablename__,
+            user_id,
+            generation,
+            f"{request.url.query}|{accept}"
+        )
+        cached = None if bypass else await response_cache.get(cache_key)
+        if cached is None:
+            return cache_key, None
+        headers = {**headers, "ETag": cached.etag, "X-Cache": "HIT"}
+        if cached.next_cursor:
+            headers["X-Next-Cursor"] = cached.next_cursor
+        return cache_key, Response(content=cached.body, media_type="application/json", headers=headers)
+
+    async def _store_list(
+        self,
+        cache_key: str,
+        items: List[Any],
+        schema: Type[BaseModel],
+        headers: Dict[str, str],
+        bypassed: bool
+    ) -> Response:
+        """Serialize a list page once, cache it and return it"""
+        body = json.dumps(jsonable_encoder([schema.from_orm(item) for item in items])).encode()
+        await response_cache.set(
+            cache_key,
+            CachedResponse(body, headers["ETag"], headers.get("X-Next-Cursor"))
+        )
+        headers["X-Cache"] = "BYPASS" if bypassed else "MISS"
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def _after_write(
+        self,
+        user_id: Any,
+        items: Optional[List[Any]] = None,
+        deleted_ids: Optional[List[Any]] = None
+    ) -> None:
+        """Keep reads consistent with a committed write
+
+        Listeners get the written rows and deleted ids when known; both None
+        means the change is unspecified and derived state must be dropped.
+        """
+        await pin_to_primary(user_id)
+        # Bumped even when responses are not cached, as it versions list ETags
+        await response_cache.invalidate(self.model.__tablename__, user_id)
+        for listener in self.write_listeners:
+            await listener.handle_write(self.model, user_id, items, deleted_ids)
@@ -0,0 +1,111 @@
+import asyncio
+import heapq
+from datetime import date
+from typing import Any, Dict, List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from app.auth.principal_cache import Principal
+from app.auth.user_manager import get_current_user
+from app.config import get_settings
+from app.database import replica_session
+from app.models.bank_account import BankAccount
+from app.models.bank_account_instance import BankAccountInstance
+from app.models.bill_status import BillStatus
+from app.models.bills import Bill
+from app.models.due_bills import DueBill
+from app.schemas.dashboard import DashboardResponse
+
+settings = get_settings()
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+def _due_bill_query(user_id: Any, start: date, end: date):
+    """Due bills in range with bill name, status colour and draft account colour"""
+    return (
+        select(
+            DueBill.id,
+            Bill.name,
+            DueBill.due_date,
+            DueBill.priority,
+            DueBill.pay_date,
+            DueBill.total_amount_due.label("amount"),
+            DueBill.min_amount_due,
+            DueBill.draft_account.label("account_id"),
+            BankAccount.font_color_hex,
+            DueBill.status.label("status_id"),
+            BillStatus.name.label("status_name"),
+            BillStatus.highlight_color_hex,
+            DueBill.confirmation,
+        )
+        .join(Bill, Bill.id == DueBill.bill)
+        .outerjoin(BillStatus, BillStatus.id == DueBill.status)
+        .outerjoin(BankAccount, BankAccount.id == DueBill.draft_account)
+        .where(
+            DueBill.user_id == user_id,
+            DueBill.archived == False,
+            DueBill.due_date.between(start, end),
+        )
+        .order_by(DueBill.due_date, DueBill.priority, DueBill.id)
+    )
+
+def _bank_account_query(user_id: Any, start: date, end: date):
+    """Bank account balances in range with account name and colours"""
+    return (
+        select(
+            BankAccountInstance.id,
+            BankAccount.name,
+            BankAccountInstance.due_date,
+            BankAccountInstance.priority,
+            BankAccountInstance.pay_date,
+            BankAccountInstance.current_balance.label("amount"),
+            BankAccountInstance.bank_account.label("account_id"),
+            BankAccount.font_color_hex,
+            BankAccountInstance.status.label("status_id"),
+            BillStatus.name.label("status_name"),
+            BillStatus.highlight_color_hex,
+        )
+        .join(BankAccount, BankAccount.id == BankAccountInstance.bank_account)
+        .outerjoin(BillStatus, BillStatus.id == BankAccountInstance.status)
+        .where(
+            BankAccountInstance.user_id == user_id,
+            BankAccountInstance.archived == False,
+            BankAccountInstance.due_date.between(start, end),
+        )
+        .order_by(BankAccountInstance.due_date, BankAccountInstance.priority, BankAccountInstance.id)
+    )
+
+async def _fetch(query, user_id: Any, kind: str) -> List[Dict[str, Any]]:
+    # Each query gets its own session so both can run at once
+    async with replica_session(user_id) as session:
+        result = await session.execute(query)
+        return [{"kind": kind, **row._mapping} for row in result]
+
+@router.get("/", response_model=DashboardResponse)
+async def get_dashboard(
+    start: date = Query(...),
+    end: date = Query(...),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Everything the home-page spreadsheet needs for a date range in one response"""
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end must not be before start"
+        )
+    if (end - start).days > settings.DASHBOARD_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range is limited to {settings.DASHBOARD_MAX_DAYS} days"
+        )
+
+    due_bills, balances = await asyncio.gather(
+        _fetch(_due_bill_query(current_user.id, start, end), current_user.id, "due_bill"),
+        _fetch(_bank_account_query(current_user.id, start, end), current_user.id, "bank_account"),
+    )
+    # Both lists arrive sorted, so a merge keeps date/priority order in O(n)
+    rows = list(heapq.merge(
+        due_bills,
+        balances,
+        key=lambda row: (row["due_date"], row["priority"]),
+    ))
+    return {"start": start, "end": end, "rows": rows}
@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from app.core.projection import projection_cache
 from app.routers.base import BaseRouter
 from app.models.due_bill import DueBill
 from app.schemas.base import (
@@ -13,5 +14,9 @@ router = BaseRouter(
     update_schema=DueBillUpdate,
     response_schema=DueBillResponse,
     prefix="/due-bills",
-    tags=["due-bills"]
+    tags=["due-bills"],
+    sort_keys=("due_date", "priority", "id"),
+    reorderable=True,
+    cache_responses=True,
+    write_listeners=[projection_cache]
 ).router
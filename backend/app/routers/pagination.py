@@ -0,0 +1,107 @@
+import base64
+import json
+from functools import lru_cache
+from typing import Any, AsyncIterator, FrozenSet, List, Sequence, Tuple, Type
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, create_model
+
+from app.config import get_settings
+from app.database import replica_session
+from app.schemas.base import BaseSchema
+
+settings = get_settings()
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+DEFAULT_PAGE_SIZE = 100
+
+def encode_cursor(item: Any, sort_columns: Sequence[Any]) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    key_values = [str(getattr(item, sort_column.key)) for sort_column in sort_columns]
+    return base64.urlsafe_b64encode(json.dumps(key_values).encode()).decode()
+
+def decode_cursor(cursor: str, sort_columns: Sequence[Any]) -> List[Any]:
+    """Decode a cursor back into typed sort key values"""
+    try:
+        key_values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(key_values, list) or len(key_values) != len(sort_columns):
+            raise ValueError("Cursor does not match sort key")
+        decoded = []
+        for sort_column, value in zip(sort_columns, key_values):
+            python_type = sort_column.type.python_type
+            if hasattr(python_type, "fromisoformat"):
+                decoded.append(python_type.fromisoformat(value))
+            else:
+                decoded.append(python_type(value))
+        return decoded
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+@lru_cache(maxsize=settings.PARTIAL_SCHEMA_CACHE_SIZE)
+def partial_schema(response_schema: Type[BaseModel], names: FrozenSet[str]) -> Type[BaseModel]:
+    """Build a response schema holding only the named fields, in schema order"""
+    schema_fields = response_schema.model_fields
+    return create_model(
+        f"{response_schema.__name__}Partial",
+        __base__=BaseSchema,
+        **{name: (field.annotation, ...) for name, field in schema_fields.items() if name in names}
+    )
+
+class PaginationMixin:
+    """Keyset cursors, sparse fieldsets and NDJSON streaming for BaseRouter lists"""
+    model: Any
+    response_schema: Type[BaseModel]
+    sort_columns: List[Any]
+
+    def _encode_cursor(self, item: Any) -> str:
+        return encode_cursor(item, self.sort_columns)
+
+    def _decode_cursor(self, cursor: str) -> List[Any]:
+        return decode_cursor(cursor, self.sort_columns)
+
+    def _resolve_fields(self, fields: str) -> Tuple[List[Any], Type[BaseModel]]:
+        """Get the columns to select and a partial response schema for a fields= list"""
+        requested = frozenset(name.strip() for name in fields.split(",") if name.strip())
+        schema_fields = self.response_schema.model_fields
+        unknown = sorted(
+            name for name in requested
+            if name not in schema_fields or not hasattr(self.model, name)
+        )
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested"
+            )
+
+        # Only validated names reach the cache, so callers cannot grow it
+        # with arbitrary strings and the key ignores order and duplicates
+        schema = partial_schema(self.response_schema, requested)
+        columns = [getattr(self.model, name) for name in schema.model_fields]
+        # Sort columns are always selected so keyset cursors can be built
+        columns += [column for column in self.sort_columns if column.key not in requested]
+        return columns, schema
+
+    async def _stream_ndjson(
+        self,
+        query: Any,
+        user_id: Any,
+        schema: Type[BaseModel],
+        scalars: bool
+    ) -> AsyncIterator[bytes]:
+        """Stream rows from a server-side cursor as newline-delimited JSON"""
+        # The request's session may be closed before streaming ends, so the
+        # stream holds its own connection for the life of the response
+        async with replica_session(user_id) as session:
+            result = await session.stream(
+                query.execution_options(yield_per=settings.STREAM_YIELD_PER)
+            )
+            if scalars:
+                result = result.scalars()
+            async for partition in result.partitions():
+                yield b"".join(
+                    json.dumps(jsonable_encoder(schema.from_orm(row))).encode() + b"\n"
+                    for row in partition
+                )
@@ -0,0 +1,42 @@
+from datetime import date
+from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.auth.principal_cache import Principal
+from app.auth.user_manager import get_current_user
+from app.core.projection import projection_cache
+from app.database import get_session
+from app.schemas.projection import ProjectionResponse
+
+router = APIRouter(prefix="/projections", tags=["projections"])
+
+@router.get("/", response_model=ProjectionResponse)
+async def get_projections(
+    start: date = Query(...),
+    end: date = Query(...),
+    session: AsyncSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Projected balance of each bank account after its unpaid bills draft"""
+    _check_range(start, end)
+    # Misses load from the primary so a lagging replica is never cached
+    accounts = await projection_cache.project(session, current_user.id, start, end)
+    return {"start": start, "end": end, "accounts": accounts}
+
+@router.get("/consistency", response_model=List[Any])
+async def check_projection_consistency(
+    start: date = Query(...),
+    end: date = Query(...),
+    session: AsyncSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Ids of accounts whose cached projection differs from a full recompute"""
+    _check_range(start, end)
+    return await projection_cache.check_consistency(session, current_user.id, start, end)
+
+def _check_range(start: date, end: date) -> None:
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end must not be before start"
+        )
@@ -0,0 +1,178 @@
+from typing import Any, List
+from fastapi import BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy import select, update, tuple_, case, and_, or_, false, values, column
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import async_session_maker, get_session
+from app.auth.user_manager import get_current_user
+from app.auth.principal_cache import Principal
+from app.schemas.base import PriorityResponse, ReorderRequest
+
+settings = get_settings()
+
+class ReorderMixin:
+    """Drag-and-drop ordering over a sparse priority column for BaseRouter"""
+    model: Any
+
+    def _active_rows(self, user_id: Any) -> List[Any]:
+        criteria = [self.model.user_id == user_id]
+        if hasattr(self.model, 'archived'):
+            criteria.append(self.model.archived == False)
+        return criteria
+
+    def _neighbour_priority(self, item_id: Any, user_id: Any) -> Any:
+        return (
+            select(self.model.priority)
+            .where(self.model.id == self._coerce_id(item_id), *self._active_rows(user_id))
+            .scalar_subquery()
+        )
+
+    async def reorder(
+        self,
+        data: ReorderRequest,
+        background_tasks: BackgroundTasks,
+        session: AsyncSession = Depends(get_session),
+        current_user: Principal = Depends(get_current_user)
+    ) -> List[PriorityResponse]:
+        """Move one row between two neighbours with a single UPDATE
+
+        Priorities are kept sparse (PRIORITY_GAP apart), so a move normally
+        takes the midpoint of its neighbours and touches one row. When the
+        neighbours are adjacent, rows after the lower neighbour shift up in the
+        same statement and a background rebalance restores the gaps around
+        the moved row.
+        """
+        if data.before_id is None and data.after_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Either before_id or after_id is required"
+            )
+        gap = settings.PRIORITY_GAP
+        lower = self._neighbour_priority(data.before_id, current_user.id) if data.before_id is not None else None
+        upper = self._neighbour_priority(data.after_id, current_user.id) if data.after_id is not None else None
+        if lower is None:
+            lower = upper - 2 * gap
+        if upper is None:
+            upper = lower + 2 * gap
+
+        moved_id = self._coerce_id(data.id)
+        exhausted = upper - lower < 2
+        new_priority = case((exhausted, lower + 1), else_=(lower + upper) // 2)
+        if data.before_id is not None:
+            # Rows sorting after the lower neighbour (ties broken by id) make
+            # room by moving up two, leaving lower + 1 free for the moved row
+            shifted = and_(
+                exhausted,
+                tuple_(self.model.priority, self.model.id)
+                > tuple_(lower, self._coerce_id(data.before_id))
+            )
+        else:
+            shifted = false()
+        result = await session.execute(
+            update(self.model)
+            .where(
+                *self._active_rows(current_user.id),
+                lower.isnot(None),
+                upper.isnot(None),
+                or_(self.model.id == moved_id, shifted)
+            )
+            .values(
+                priority=case(
+                    (self.model.id == moved_id, new_priority),
+                    else_=self.model.priority + 2
+                )
+            )
+            .returning(self.model.id, self.model.priority, (upper - lower).label("gap"))
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        if not any(row.id == moved_id for row in rows):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"{self.model.__name__} not found"
+            )
+        await session.commit()
+        await self._after_write(current_user.id)
+
+        if rows[0].gap < 4:
+            # The next move between these neighbours would shift rows again
+            moved = next(row for row in rows if row.id == moved_id)
+            background_tasks.add_task(self.rebalance_priorities, current_user.id, moved.id, moved.priority)
+        return [PriorityResponse(id=row.id, priority=row.priority) for row in rows]
+
+    async def _rows_beside(
+        self,
+        session: AsyncSession,
+        user_id: Any,
+        around: Any,
+        limit: int,
+        above: bool
+    ) -> List[Any]:
+        """Up to limit rows nearest around on one side, nearest first, locked"""
+        position = tuple_(self.model.priority, self.model.id)
+        order = (self.model.priority, self.model.id) if above else (self.model.priority.desc(), self.model.id.desc())
+        result = await session.execute(
+            select(self.model.id, self.model.priority)
+            .where(
+                *self._active_rows(user_id),
+                position > tuple_(*around) if above else position <= tuple_(*around)
+            )
+            .order_by(*order)
+            .limit(limit)
+            .with_for_update()
+        )
+        return result.all()
+
+    async def rebalance_priorities(self, user_id: Any, item_id: Any, priority: int) -> None:
+        """Respace the rows around a moved row PRIORITY_GAP apart, keeping their order
+
+        Starts with PRIORITY_REBALANCE_WINDOW rows on each side of the moved
+        row and doubles the window until its rows fit between the rows just
+        outside it, so only the crowded stretch is rewritten.
+        """
+        gap = settings.PRIORITY_GAP
+        window = settings.PRIORITY_REBALANCE_WINDOW
+        around = (priority, item_id)
+        async with async_session_maker() as session:
+            while True:
+                below = await self._rows_beside(session, user_id, around, window + 1, above=False)
+                above = await self._rows_beside(session, user_id, around, window + 1, above=True)
+                # The rows just outside the window bound it and keep their priority
+                floor = below.pop().priority if len(below) > window else None
+                ceiling = above.pop().priority if len(above) > window else None
+                rows = below[::-1] + above
+                if floor is not None and ceiling is not None:
+                    step = (ceiling - floor) // (len(rows) + 1)
+                    if step < gap:
+                        window *= 2
+                        continue
+                    start = floor + step
+                elif floor is not None:
+                    step, start = gap, floor + gap
+                elif ceiling is not None:
+                    step, start = gap, ceiling - gap * len(rows)
+                else:
+                    step, start = gap, rows[0].priority if rows else 0
+                break
+
+            table = self.model.__table__
+            changed = [
+                (row.id, start + index * step)
+                for index, row in enumerate(rows)
+                if row.priority != start + index * step
+            ]
+            if changed:
+                respaced = values(
+                    column("id", table.c.id.type),
+                    column("priority", table.c.priority.type),
+                    name="respaced"
+                ).data(changed)
+                await session.execute(
+                    update(self.model)
+                    .where(self.model.id == respaced.c.id)
+                    .values(priority=respaced.c.priority)
+                    .execution_options(synchronize_session=False)
+                )
+            await session.commit()
+        await self._after_write(user_id)
@@ -0,0 +1,12 @@
+from datetime import datetime
+from typing import Any, Optional
+from pydantic import BaseModel
+
+class AuditFieldChange(BaseModel):
+    """One field's change within an audited insert, update or delete"""
+    change_id: int
+    action: str
+    field_name: str
+    value_before_change: Optional[Any] = None
+    value_after_change: Optional[Any] = None
+    created_at: datetime
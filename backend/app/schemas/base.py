@@ -1,12 +1,24 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from typing import Optional, Union
+from uuid import UUID
 from datetime import datetime, date
 from decimal import Decimal
+from app.core.recurrence_rules import compile_calculation
 
 class BaseSchema(BaseModel):
     class Config:
         from_attributes = True
 
+class ReorderRequest(BaseSchema):
+    """Move a row between its new neighbours in priority order"""
+    id: Union[int, UUID]
+    before_id: Optional[Union[int, UUID]] = None  # row that will sit directly above
+    after_id: Optional[Union[int, UUID]] = None   # row that will sit directly below
+
+class PriorityResponse(BaseSchema):
+    id: Union[int, UUID]
+    priority: int
+
 class UserBase(BaseSchema):
     email: str
     is_active: bool = True
@@ -53,10 +65,19 @@ class RecurrenceBase(BaseSchema):
     name: str
     calculation: Optional[str] = None
 
-class RecurrenceCreate(RecurrenceBase):
+class RecurrenceWrite(RecurrenceBase):
+    # Only writes are validated, so stored rows predating the check still read back
+    @field_validator('calculation')
+    def validate_calculation(cls, v):
+        if v is not None:
+            # RecurrenceError is a ValueError, so the message becomes a 422
+            compile_calculation(v)
+        return v
+
+class RecurrenceCreate(RecurrenceWrite):
     pass
 
-class RecurrenceUpdate(RecurrenceBase):
+class RecurrenceUpdate(RecurrenceWrite):
     archived: Optional[bool] = None
 
 class RecurrenceResponse(RecurrenceBase):
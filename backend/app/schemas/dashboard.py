@@ -0,0 +1,27 @@
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional, Union
+from uuid import UUID
+from pydantic import BaseModel
+
+class DashboardRow(BaseModel):
+    """One pre-joined spreadsheet row: a due bill or a bank account balance"""
+    kind: str  # "due_bill" or "bank_account"
+    id: Union[int, UUID]
+    name: str
+    due_date: date
+    priority: int
+    pay_date: Optional[date] = None
+    amount: Decimal  # total amount due, or current balance for bank accounts
+    min_amount_due: Optional[Decimal] = None
+    account_id: Optional[Union[int, UUID]] = None
+    font_color_hex: Optional[str] = None
+    status_id: Optional[int] = None
+    status_name: Optional[str] = None
+    highlight_color_hex: Optional[str] = None
+    confirmation: Optional[str] = None
+
+class DashboardResponse(BaseModel):
+    start: date
+    end: date
+    rows: List[DashboardRow]
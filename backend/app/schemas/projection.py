@@ -0,0 +1,27 @@
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional, Union
+from uuid import UUID
+from pydantic import BaseModel
+
+class ProjectionPoint(BaseModel):
+    """Projected account balance right after a due bill drafts"""
+    due_bill_id: Union[int, UUID]
+    due_date: date
+    priority: int
+    amount: Decimal
+    balance: Decimal
+
+class AccountProjection(BaseModel):
+    bank_account_id: Union[int, UUID]
+    name: str
+    font_color_hex: Optional[str] = None
+    as_of: date
+    starting_balance: Decimal
+    ending_balance: Decimal
+    points: List[ProjectionPoint]
+
+class ProjectionResponse(BaseModel):
+    start: date
+    end: date
+    accounts: List[AccountProjection]
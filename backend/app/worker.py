@@ -0,0 +1,63 @@
+"""Background job worker
+
+Run alongside the API, as many processes on as many hosts as needed:
+
+    python -m app.worker [--concurrency N] [--job-type TYPE ...]
+    python -m app.worker --requeue-dead [--job-type TYPE]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+from app.config import get_settings
+from app.core import background_tasks  # registers the job handlers
+from app.core.jobs import JOB_HANDLERS, JobWorker, requeue_dead
+from app.core.logging import setup_logging
+from app.database import async_session_maker, close_db
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+async def serve(worker: JobWorker) -> None:
+    loop = asyncio.get_running_loop()
+    # Stop claiming on SIGTERM/SIGINT and let running jobs finish
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, worker.stop)
+    try:
+        await worker.run()
+    finally:
+        await close_db()
+
+async def requeue(job_types) -> None:
+    try:
+        async with async_session_maker() as session:
+            for job_type in job_types or [None]:
+                count = await requeue_dead(session, job_type)
+                logger.info(f"Requeued {count} dead {job_type or 'jobs'}")
+    finally:
+        await close_db()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run background jobs from the job queue")
+    parser.add_argument("--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY)
+    parser.add_argument(
+        "--job-type",
+        action="append",
+        choices=sorted(JOB_HANDLERS),
+        help="only run these job types (repeatable); default all",
+    )
+    parser.add_argument("--requeue-dead", action="store_true", help="requeue dead-lettered jobs and exit")
+    args = parser.parse_args()
+
+    setup_logging(
+        log_file=os.path.join("logs", "worker.log"),
+        level=logging.INFO if not settings.DEBUG else logging.DEBUG
+    )
+    if args.requeue_dead:
+        asyncio.run(requeue(args.job_type))
+        return
+    asyncio.run(serve(JobWorker(args.concurrency, settings.JOB_POLL_INTERVAL_SECONDS, args.job_type)))
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,11 @@ from app.models.due_bills import DueBill
 from app.models.category import Category
 from app.models.recurrence import Recurrence
 from app.models.bill_status import BillStatus
+from app.models.applied_payment import AppliedPayment
+from app.models.audit_change import AuditChange
+from app.models.audit_outbox import AuditOutbox
+from app.models.job_run import JobRun
+from app.models.job import Job
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,78 @@
+"""Add composite partial indexes for dashboard queries
+
+Revision ID: 7c2e4f9a1b3d
+Revises: 323dbae84fae
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e4f9a1b3d'
+down_revision: Union[str, None] = '323dbae84fae'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Composite indexes matching "user_id = ? AND archived = false ORDER BY
+# due_date, priority, id", the shape of every dashboard and list query
+COMPOSITE_INDEXES = [
+    ('ix_due_bills_user_due_date_priority', 'due_bills'),
+    ('ix_bank_account_instance_user_due_date_priority', 'bank_account_instance'),
+]
+
+# Single-column indexes made redundant by the composites (or the primary key)
+REDUNDANT_INDEXES = [
+    ('ix_due_bills_id', 'due_bills', ['id']),
+    ('ix_due_bills_due_date', 'due_bills', ['due_date']),
+    ('ix_due_bills_priority', 'due_bills', ['priority']),
+    ('ix_bank_account_instance_due_date', 'bank_account_instance', ['due_date']),
+    ('ix_bank_account_instance_priority', 'bank_account_instance', ['priority']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for index_name, table_name in COMPOSITE_INDEXES:
+            op.create_index(
+                index_name,
+                table_name,
+                ['user_id', 'due_date', 'priority', 'id'],
+                unique=False,
+                postgresql_where=sa.text('archived = false'),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for index_name, table_name, _ in REDUNDANT_INDEXES:
+            op.drop_index(
+                index_name,
+                table_name=table_name,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for index_name, table_name, columns in REDUNDANT_INDEXES:
+            op.create_index(
+                index_name,
+                table_name,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for index_name, table_name in COMPOSITE_INDEXES:
+            op.drop_index(
+                index_name,
+                table_name=table_name,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
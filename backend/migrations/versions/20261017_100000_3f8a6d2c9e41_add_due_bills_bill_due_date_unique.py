@@ -0,0 +1,56 @@
+"""Make due bill occurrences unique per bill and due date
+
+Revision ID: 3f8a6d2c9e41
+Revises: 7c2e4f9a1b3d
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a6d2c9e41'
+down_revision: Union[str, None] = '7c2e4f9a1b3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Conflict target for recurrence expansion's INSERT ... ON CONFLICT DO NOTHING
+INDEX_NAME = 'uq_due_bills_bill_due_date'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT bill, due_date FROM due_bills "
+        "GROUP BY bill, due_date HAVING count(*) > 1 LIMIT 5"
+    )).all()
+    if duplicates:
+        # Which copy to keep is a user decision, so refuse rather than guess
+        raise RuntimeError(
+            f"due_bills has duplicate (bill, due_date) rows, e.g. {duplicates}; "
+            "archive-merge or delete them before running this migration"
+        )
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            INDEX_NAME,
+            'due_bills',
+            ['bill', 'due_date'],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            INDEX_NAME,
+            table_name='due_bills',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,59 @@
+"""Add applied_payment ledger for the balance update job
+
+Revision ID: 9d4b1e7f2a60
+Revises: 3f8a6d2c9e41
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4b1e7f2a60'
+down_revision: Union[str, None] = '3f8a6d2c9e41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('applied_payment',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('bank_account', sa.UUID(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['bank_account'], ['bank_account.id'], ),
+    sa.ForeignKeyConstraint(['id'], ['due_bills.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_applied_payment_user_id'), 'applied_payment', ['user_id'], unique=False)
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_due_bills_paid_updated_at',
+            'due_bills',
+            ['updated_at'],
+            unique=False,
+            postgresql_where=sa.text('pay_date IS NOT NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_due_bills_paid_updated_at',
+            table_name='due_bills',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_index(op.f('ix_applied_payment_user_id'), table_name='applied_payment')
+    op.drop_table('applied_payment')
@@ -0,0 +1,43 @@
+"""Index audit_log.created_at for chunked retention deletes
+
+Revision ID: b51c7e3a8f02
+Revises: 9d4b1e7f2a60
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b51c7e3a8f02'
+down_revision: Union[str, None] = '9d4b1e7f2a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_audit_log_created_at',
+            'audit_log',
+            ['created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_audit_log_created_at',
+            table_name='audit_log',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,131 @@
+"""Range-partition audit_log by month
+
+The existing table is kept as the audit_log_legacy partition covering
+everything before the first month boundary after its newest row (and at
+least a day ahead), so no rows are copied and writes made while the
+migration runs still fall inside it. Its new primary key and partition
+CHECK are built/validated beforehand without blocking writes; the swap
+itself is a short catalog-only transaction.
+
+Revision ID: e83f0a6c4d17
+Revises: b51c7e3a8f02
+Create Date: 2026-10-17 12:01:00.000000
+
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e83f0a6c4d17'
+down_revision: Union[str, None] = 'b51c7e3a8f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Monthly partitions created up front; the retention job keeps creating more
+MONTHS_AHEAD = 3
+
+# Secondary indexes, defined once on the parent
+INDEXES = [
+    ('ix_audit_log_user_id', ['user_id']),
+    ('ix_audit_log_table_name', ['table_name']),
+    ('ix_audit_log_row_id', ['row_id']),
+    ('ix_audit_log_created_at', ['created_at']),
+]
+
+
+def _add_months(year: int, month: int, months: int) -> str:
+    index = month - 1 + months
+    return f"{year + index // 12:04d}-{index % 12 + 1:02d}-01 00:00:00+00"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The CHECK applies to new rows as soon as it is added, so the boundary
+    # must lie past every existing row and past any write during the migration
+    latest = op.get_bind().scalar(sa.text("SELECT max(created_at) FROM audit_log"))
+    now = datetime.now(timezone.utc)
+    floor = max(latest or now, now + timedelta(days=1))
+    boundary = _add_months(floor.year, floor.month, 1)
+    year, month = int(boundary[:4]), int(boundary[5:7])
+
+    # Prepare the old table to become a partition without long locks:
+    # the (id, created_at) key is built concurrently and the range CHECK is
+    # validated separately, so ATTACH PARTITION needs no table scan
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS audit_log_legacy_pkey "
+            "ON audit_log (id, created_at)"
+        )
+        op.execute(
+            "ALTER TABLE audit_log ADD CONSTRAINT audit_log_legacy_range "
+            f"CHECK (created_at < '{boundary}') NOT VALID"
+        )
+        try:
+            op.execute("ALTER TABLE audit_log VALIDATE CONSTRAINT audit_log_legacy_range")
+        except Exception:
+            # Never leave a committed, unvalidated range CHECK rejecting inserts
+            op.execute("ALTER TABLE audit_log DROP CONSTRAINT IF EXISTS audit_log_legacy_range")
+            raise
+
+    op.execute("SET LOCAL lock_timeout = '10s'")
+    op.execute("ALTER TABLE audit_log RENAME TO audit_log_legacy")
+    op.execute(
+        "ALTER TABLE audit_log_legacy DROP CONSTRAINT audit_log_pkey, "
+        "ADD CONSTRAINT audit_log_legacy_pkey PRIMARY KEY USING INDEX audit_log_legacy_pkey"
+    )
+    for index_name, _ in INDEXES:
+        op.execute(f"ALTER INDEX IF EXISTS {index_name} RENAME TO {index_name.replace('audit_log', 'audit_log_legacy', 1)}")
+    op.execute(
+        "CREATE TABLE audit_log ("
+        "id INTEGER NOT NULL DEFAULT nextval('audit_log_id_seq'), "
+        "user_id UUID NOT NULL REFERENCES users (id), "
+        "table_name VARCHAR(50) NOT NULL, "
+        "row_id INTEGER NOT NULL, "
+        "field_name VARCHAR(100) NOT NULL, "
+        "action VARCHAR(20) NOT NULL, "
+        "value_before_change VARCHAR, "
+        "value_after_change VARCHAR, "
+        "created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(), "
+        "updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(), "
+        "CONSTRAINT audit_log_pkey PRIMARY KEY (id, created_at), "
+        "CONSTRAINT check_action CHECK (action IN ('add', 'update', 'delete'))"
+        ") PARTITION BY RANGE (created_at)"
+    )
+    op.execute("ALTER SEQUENCE audit_log_id_seq OWNED BY audit_log.id")
+    op.execute(
+        "ALTER TABLE audit_log ATTACH PARTITION audit_log_legacy "
+        f"FOR VALUES FROM (MINVALUE) TO ('{boundary}')"
+    )
+    # Matching indexes on the legacy partition are attached, not rebuilt
+    for index_name, columns in INDEXES:
+        op.create_index(index_name, 'audit_log', columns, unique=False)
+    # New partitions continue from the legacy partition's upper bound
+    for offset in range(MONTHS_AHEAD + 1):
+        start = _add_months(year, month, offset)
+        op.execute(
+            f"CREATE TABLE audit_log_p{start[:4]}{start[5:7]} PARTITION OF audit_log "
+            f"FOR VALUES FROM ('{start}') TO ('{_add_months(year, month, offset + 1)}')"
+        )
+    op.execute("CREATE TABLE audit_log_default PARTITION OF audit_log DEFAULT")
+    op.execute("ALTER TABLE audit_log_legacy DROP CONSTRAINT audit_log_legacy_range")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Copies every retained row back into a plain table
+    op.execute(
+        "CREATE TABLE audit_log_flat (LIKE audit_log INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    op.execute("INSERT INTO audit_log_flat SELECT * FROM audit_log")
+    op.execute("ALTER SEQUENCE audit_log_id_seq OWNED BY NONE")
+    op.execute("DROP TABLE audit_log CASCADE")
+    op.execute("ALTER TABLE audit_log_flat RENAME TO audit_log")
+    op.execute("ALTER TABLE audit_log ADD CONSTRAINT audit_log_pkey PRIMARY KEY (id)")
+    op.execute("ALTER TABLE audit_log ADD FOREIGN KEY (user_id) REFERENCES users (id)")
+    op.execute("ALTER SEQUENCE audit_log_id_seq OWNED BY audit_log.id")
+    for index_name, columns in INDEXES:
+        op.create_index(index_name, 'audit_log', columns, unique=False)
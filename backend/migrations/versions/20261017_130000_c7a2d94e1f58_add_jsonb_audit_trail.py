@@ -0,0 +1,155 @@
+"""Add single-row JSONB audit trail and convert per-field audit_log history
+
+Revision ID: c7a2d94e1f58
+Revises: e83f0a6c4d17
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a2d94e1f58'
+down_revision: Union[str, None] = 'e83f0a6c4d17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Columns never written to the trail: bookkeeping plus secrets
+COMMON_EXCLUDED = ['id', 'created_at', 'updated_at']
+AUDITED_TABLES = {
+    'users': ['hashed_password', 'mfa_secret'],
+    'api_token': ['token'],
+    'oauth_account': [],
+    'bill_status': [],
+    'recurrence': [],
+    'category': [],
+    'bank_account': [],
+    'bills': [],
+    'due_bills': [],
+    'bank_account_instance': [],
+}
+
+# The diff is built from to_jsonb(OLD)/to_jsonb(NEW): the row itself
+# carries its column names, so nothing is looked up in the catalog per
+# fire. Excluded columns are fixed per table as trigger arguments.
+LOG_CHANGES_JSONB = """
+CREATE OR REPLACE FUNCTION log_changes_jsonb()
+RETURNS TRIGGER AS $$
+DECLARE
+    old_row JSONB;
+    new_row JSONB;
+    source JSONB;
+    diff JSONB;
+BEGIN
+    IF (TG_OP <> 'INSERT') THEN
+        old_row := to_jsonb(OLD);
+    END IF;
+    IF (TG_OP <> 'DELETE') THEN
+        new_row := to_jsonb(NEW);
+    END IF;
+    source := COALESCE(new_row, old_row);
+
+    SELECT jsonb_object_agg(key, jsonb_build_array(old_row -> key, new_row -> key))
+      INTO diff
+      FROM jsonb_object_keys(source) AS key
+     WHERE key <> ALL (TG_ARGV)
+       AND (old_row -> key) IS DISTINCT FROM (new_row -> key);
+
+    -- Updates touching only excluded columns are not recorded
+    IF diff IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO audit_change (user_id, table_name, row_id, action, changes)
+    VALUES (
+        (CASE WHEN TG_TABLE_NAME = 'users' THEN source ->> 'id' ELSE source ->> 'user_id' END)::uuid,
+        TG_TABLE_NAME,
+        source ->> 'id',
+        CASE TG_OP WHEN 'INSERT' THEN 'add' WHEN 'UPDATE' THEN 'update' ELSE 'delete' END,
+        diff
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def _trigger_name(table_name: str) -> str:
+    # Same names as the per-field triggers in init_db.sql, so they are replaced
+    if table_name == 'users':
+        return 'log_user_changes'
+    return f'log_{table_name}_changes'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('audit_change',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('table_name', sa.String(length=50), nullable=False),
+    sa.Column('row_id', sa.String(length=64), nullable=False),
+    sa.Column('action', sa.String(length=20), nullable=False),
+    sa.Column('changes', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.CheckConstraint("action IN ('add', 'update', 'delete')", name='check_audit_change_action'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_audit_change_user_id'), 'audit_change', ['user_id'], unique=False)
+    op.create_index('ix_audit_change_table_row', 'audit_change', ['table_name', 'row_id', 'created_at'], unique=False)
+    op.create_index('ix_audit_change_created_at', 'audit_change', ['created_at'], unique=False)
+
+    # Rows written by one trigger fire share table, row, action and the
+    # transaction timestamp, so each group becomes one change. The old
+    # per-field trigger recorded every column, secrets included, so only
+    # the fields the new triggers would record are carried over
+    converted = ' OR '.join(
+        f"(table_name = '{table_name}' AND field_name NOT IN "
+        f"({', '.join(repr(column) for column in COMMON_EXCLUDED + excluded)}))"
+        for table_name, excluded in AUDITED_TABLES.items()
+    )
+    op.execute(
+        "INSERT INTO audit_change (user_id, table_name, row_id, action, changes, created_at, updated_at) "
+        "SELECT user_id, table_name, row_id::text, action, "
+        "jsonb_object_agg(field_name, jsonb_build_array("
+        "to_jsonb(value_before_change), to_jsonb(value_after_change))), "
+        "created_at, created_at "
+        f"FROM audit_log WHERE {converted} "
+        "GROUP BY user_id, table_name, row_id, action, created_at "
+        "ORDER BY created_at"
+    )
+
+    op.execute(LOG_CHANGES_JSONB)
+    for table_name, excluded in AUDITED_TABLES.items():
+        arguments = ', '.join(f"'{column}'" for column in COMMON_EXCLUDED + excluded)
+        op.execute(f'DROP TRIGGER IF EXISTS {_trigger_name(table_name)} ON "{table_name}"')
+        op.execute(
+            f'CREATE TRIGGER {_trigger_name(table_name)} '
+            f'AFTER INSERT OR UPDATE OR DELETE ON "{table_name}" '
+            f'FOR EACH ROW EXECUTE FUNCTION log_changes_jsonb({arguments})'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # audit_log keeps the history it had before the upgrade; per-field
+    # triggers come back only where init_db.sql installed log_changes()
+    for table_name in AUDITED_TABLES:
+        name = _trigger_name(table_name)
+        op.execute(f'DROP TRIGGER IF EXISTS {name} ON "{table_name}"')
+        op.execute(
+            "DO $$ BEGIN "
+            "IF EXISTS (SELECT 1 FROM pg_proc WHERE proname = 'log_changes') THEN "
+            f"CREATE TRIGGER {name} AFTER INSERT OR UPDATE OR DELETE ON \"{table_name}\" "
+            "FOR EACH ROW EXECUTE FUNCTION log_changes(); "
+            "END IF; END $$"
+        )
+    op.execute("DROP FUNCTION IF EXISTS log_changes_jsonb()")
+    op.drop_index('ix_audit_change_created_at', table_name='audit_change')
+    op.drop_index('ix_audit_change_table_row', table_name='audit_change')
+    op.drop_index(op.f('ix_audit_change_user_id'), table_name='audit_change')
+    op.drop_table('audit_change')
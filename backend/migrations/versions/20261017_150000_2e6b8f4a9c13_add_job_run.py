@@ -0,0 +1,45 @@
+"""Add job_run for the cluster-safe scheduler
+
+Revision ID: 2e6b8f4a9c13
+Revises: 5a9e3c1d7b24
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e6b8f4a9c13'
+down_revision: Union[str, None] = '5a9e3c1d7b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('job_run',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('job_name', sa.String(length=100), nullable=False),
+    sa.Column('scheduled_for', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('duration_ms', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('worker', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.CheckConstraint("status IN ('running', 'succeeded', 'failed', 'timeout', 'abandoned')", name='check_job_run_status'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('job_name', 'scheduled_for', name='uq_job_run_job_scheduled')
+    )
+    op.create_index('ix_job_run_job_started', 'job_run', ['job_name', 'started_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_job_run_job_started', table_name='job_run')
+    op.drop_table('job_run')
@@ -0,0 +1,52 @@
+"""Add the job table for the durable background job queue
+
+Revision ID: 8b3f1c6e5d29
+Revises: 2e6b8f4a9c13
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b3f1c6e5d29'
+down_revision: Union[str, None] = '2e6b8f4a9c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('job',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('job_type', sa.String(length=100), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), server_default=sa.text("'{}'::jsonb"), nullable=False),
+    sa.Column('status', sa.String(length=20), server_default='queued', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('run_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('locked_by', sa.String(length=255), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.CheckConstraint("status IN ('queued', 'running', 'succeeded', 'dead')", name='check_job_status'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_job_queued_run_at', 'job', ['run_at'], unique=False, postgresql_where=sa.text("status = 'queued'"))
+    op.create_index('ix_job_running_locked_until', 'job', ['locked_until'], unique=False, postgresql_where=sa.text("status = 'running'"))
+    op.create_index('ix_job_type_finished_at', 'job', ['job_type', 'finished_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_job_type_finished_at', table_name='job')
+    op.drop_index('ix_job_running_locked_until', table_name='job')
+    op.drop_index('ix_job_queued_run_at', table_name='job')
+    op.drop_table('job')
@@ -0,0 +1,70 @@
+"""Normalize recurrence calculations and report ones the API would reject
+
+Revision ID: 4d7e2a9c6b15
+Revises: 8b3f1c6e5d29
+Create Date: 2026-10-17 17:00:00.000000
+
+Calculations are now validated when a recurrence is created or updated,
+but rows written before that check are left as they are: responses do not
+validate them, and recurrence expansion skips bills whose calculation it
+cannot interpret (logging a warning). This migration trims and lowercases
+stored values, which the parser ignores anyway, and logs the id of every
+recurrence that is still unrecognized so it can be corrected with a PUT.
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d7e2a9c6b15'
+down_revision: Union[str, None] = '8b3f1c6e5d29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+# Calculations the API accepted when this migration was written, frozen here
+# so later changes to app.core.recurrence_rules do not change what it reports
+NAMED_CALCULATIONS = frozenset((
+    'daily', 'weekly', 'biweekly', 'monthly', 'bimonthly',
+    'quarterly', 'semiannually', 'annually', 'yearly',
+))
+VALUE_CALCULATIONS = frozenset(('n_days', 'n_weeks', 'n_months', 'n_years'))
+UNITS = frozenset(('day', 'days', 'week', 'weeks', 'month', 'months', 'year', 'years'))
+
+
+def is_recognized(calculation: str) -> bool:
+    """Whether a normalized calculation was valid as of this revision"""
+    calculation = calculation.strip()
+    if calculation in NAMED_CALCULATIONS or calculation in VALUE_CALCULATIONS:
+        return True
+    parts = calculation.split()
+    return len(parts) == 2 and parts[0].isdigit() and int(parts[0]) > 0 and parts[1] in UNITS
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    bind.execute(sa.text(
+        "UPDATE recurrence SET calculation = lower(btrim(calculation)) "
+        "WHERE calculation IS DISTINCT FROM lower(btrim(calculation))"
+    ))
+    rows = bind.execute(sa.text(
+        "SELECT id, calculation FROM recurrence WHERE calculation IS NOT NULL ORDER BY id"
+    )).all()
+    for row in rows:
+        if not is_recognized(row.calculation):
+            logger.warning(
+                f"recurrence {row.id} has unrecognized calculation {row.calculation!r}; "
+                "its bills will not be expanded until it is corrected"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Original spacing and case are not kept and carry no meaning
+    pass
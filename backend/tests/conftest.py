@@ -0,0 +1,24 @@
+import os
+from typing import AsyncGenerator
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+# A scratch database migrated to head (alembic upgrade head); tests that
+# need Postgres are skipped without it
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+@pytest.fixture
+async def db_session() -> AsyncGenerator[AsyncSession, None]:
+    """Session in a transaction that is rolled back after the test"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_async_engine(TEST_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"))
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        session = AsyncSession(bind=conn, expire_on_commit=False)
+        try:
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
+    await engine.dispose()
@@ -0,0 +1,114 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+import pytest
+from sqlalchemy import func, insert, select
+
+# Needs the ORM models as well as a database
+background_tasks = pytest.importorskip("app.core.background_tasks", exc_type=ImportError)
+from app.models.applied_payment import AppliedPayment
+from app.models.bank_account import BankAccount
+from app.models.bank_account_instance import BankAccountInstance
+from app.models.bills import Bill
+from app.models.due_bills import DueBill
+from app.models.user import User
+
+async def _insert(session, model, **values):
+    return await session.scalar(insert(model).values(**values).returning(model.id))
+
+async def _latest_balance(session, account_id):
+    return await session.scalar(
+        select(BankAccountInstance.current_balance)
+        .where(BankAccountInstance.bank_account == account_id)
+        .order_by(
+            BankAccountInstance.due_date.desc(),
+            BankAccountInstance.priority.desc(),
+            BankAccountInstance.id.desc(),
+        )
+        .limit(1)
+    )
+
+async def test_paid_bills_are_applied_once_per_account(db_session):
+    user_id = await _insert(db_session, User, email="rollover@example.com")
+    checking = await _insert(db_session, BankAccount, user_id=user_id, name="Checking", font_color_hex="#000000")
+    savings = await _insert(db_session, BankAccount, user_id=user_id, name="Savings", font_color_hex="#ffffff")
+    for account, balance in ((checking, "1000.00"), (savings, "500.00")):
+        await _insert(
+            db_session, BankAccountInstance,
+            user_id=user_id, bank_account=account,
+            due_date=date.today() - timedelta(days=3), current_balance=Decimal(balance),
+        )
+    bill = await _insert(db_session, Bill, user_id=user_id, name="Rent", default_amount_due=Decimal("100.00"))
+    for account, amount, pay_date in (
+        (checking, "100.00", date.today()),
+        (checking, "25.50", date.today()),
+        (savings, "40.00", date.today()),
+        # Unpaid bills are left alone
+        (checking, "999.00", None),
+    ):
+        await _insert(
+            db_session, DueBill,
+            user_id=user_id, bill=bill, due_date=date.today(), pay_date=pay_date,
+            min_amount_due=Decimal(amount), total_amount_due=Decimal(amount), draft_account=account,
+        )
+
+    since = datetime.now(timezone.utc) - timedelta(hours=1)
+    result = await db_session.execute(background_tasks._apply_payments_statement([user_id], since))
+    assert sorted(result.scalars().all()) == [user_id, user_id]
+    assert await _latest_balance(db_session, checking) == Decimal("874.50")
+    assert await _latest_balance(db_session, savings) == Decimal("460.00")
+    assert await db_session.scalar(select(func.count()).select_from(AppliedPayment)) == 3
+
+    # A rerun finds nothing new to claim and writes no balances
+    instances = await db_session.scalar(select(func.count()).select_from(BankAccountInstance))
+    result = await db_session.execute(background_tasks._apply_payments_statement([user_id], since))
+    assert result.scalars().all() == []
+    assert await db_session.scalar(select(func.count()).select_from(BankAccountInstance)) == instances
+
+async def test_future_dated_balance_does_not_drop_earlier_deductions(db_session):
+    user_id = await _insert(db_session, User, email="planned@example.com")
+    checking = await _insert(db_session, BankAccount, user_id=user_id, name="Checking", font_color_hex="#000000")
+    await _insert(
+        db_session, BankAccountInstance,
+        user_id=user_id, bank_account=checking,
+        due_date=date.today() - timedelta(days=3), current_balance=Decimal("1000.00"),
+    )
+    # A planned balance for next month is not the account's current balance
+    await _insert(
+        db_session, BankAccountInstance,
+        user_id=user_id, bank_account=checking,
+        due_date=date.today() + timedelta(days=30), current_balance=Decimal("5000.00"),
+    )
+    bill = await _insert(db_session, Bill, user_id=user_id, name="Power", default_amount_due=Decimal("100.00"))
+
+    async def pay(amount):
+        await _insert(
+            db_session, DueBill,
+            user_id=user_id, bill=bill, due_date=date.today(), pay_date=date.today(),
+            min_amount_due=Decimal(amount), total_amount_due=Decimal(amount), draft_account=checking,
+        )
+
+    async def current_balance():
+        return await db_session.scalar(
+            select(BankAccountInstance.current_balance)
+            .where(
+                BankAccountInstance.bank_account == checking,
+                BankAccountInstance.due_date <= date.today(),
+            )
+            .order_by(BankAccountInstance.due_date.desc(), BankAccountInstance.priority.desc())
+            .limit(1)
+        )
+
+    since = datetime.now(timezone.utc) - timedelta(hours=1)
+    await pay("100.00")
+    await db_session.execute(background_tasks._apply_payments_statement([user_id], since))
+    assert await current_balance() == Decimal("900.00")
+
+    # The second run starts from the first run's balance, not the planned one
+    await pay("50.00")
+    await db_session.execute(background_tasks._apply_payments_statement([user_id], since))
+    assert await current_balance() == Decimal("850.00")
+    assert await db_session.scalar(
+        select(BankAccountInstance.current_balance)
+        .where(BankAccountInstance.due_date > date.today())
+        .where(BankAccountInstance.bank_account == checking)
+    ) == Decimal("5000.00")
@@ -0,0 +1,46 @@
+from datetime import datetime
+import pytest
+from app.core.cron import CronError, CronSchedule
+
+@pytest.mark.parametrize("expression, after, expected", [
+    ("0 * * * *", datetime(2026, 10, 17, 9, 0), datetime(2026, 10, 17, 10, 0)),
+    ("0 * * * *", datetime(2026, 10, 17, 9, 59, 30), datetime(2026, 10, 17, 10, 0)),
+    ("30 3 * * *", datetime(2026, 10, 17, 3, 30), datetime(2026, 10, 18, 3, 30)),
+    ("*/15 * * * *", datetime(2026, 10, 17, 9, 7), datetime(2026, 10, 17, 9, 15)),
+    ("5/20 * * * *", datetime(2026, 10, 17, 9, 46), datetime(2026, 10, 17, 10, 5)),
+    # Saturday -> next weekday is Monday
+    ("0 9 * * 1-5", datetime(2026, 10, 17, 12, 0), datetime(2026, 10, 19, 9, 0)),
+    # 7 and 0 both mean Sunday
+    ("0 0 * * 7", datetime(2026, 10, 17, 0, 0), datetime(2026, 10, 18, 0, 0)),
+    ("0 0 * * 0", datetime(2026, 10, 17, 0, 0), datetime(2026, 10, 18, 0, 0)),
+    ("0 0 1 1 *", datetime(2026, 12, 31, 23, 59), datetime(2027, 1, 1, 0, 0)),
+    ("0 0 31 * *", datetime(2026, 11, 1, 0, 0), datetime(2026, 12, 31, 0, 0)),
+    ("0 0 29 2 *", datetime(2026, 10, 17, 0, 0), datetime(2028, 2, 29, 0, 0)),
+])
+def test_next_after(expression, after, expected):
+    assert CronSchedule(expression).next_after(after) == expected
+
+def test_restricted_day_of_month_and_week_match_either():
+    # The 1st or any Monday, as in cron
+    schedule = CronSchedule("0 0 1 * 1")
+    assert schedule.next_after(datetime(2026, 10, 17)) == datetime(2026, 10, 19)
+    assert schedule.next_after(datetime(2026, 10, 26)) == datetime(2026, 11, 1)
+
+@pytest.mark.parametrize("expression", [
+    "* * * *",
+    "60 * * * *",
+    "* 24 * * *",
+    "* * 0 * *",
+    "* * * 13 *",
+    "* * * * 8",
+    "5-1 * * * *",
+    "*/0 * * * *",
+    "a * * * *",
+])
+def test_invalid_expressions(expression):
+    with pytest.raises(CronError):
+        CronSchedule(expression)
+
+def test_unsatisfiable_expression():
+    with pytest.raises(CronError):
+        CronSchedule("0 0 31 2 *").next_after(datetime(2026, 1, 1))
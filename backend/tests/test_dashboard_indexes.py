@@ -0,0 +1,62 @@
+from datetime import date
+import pytest
+from sqlalchemy import text
+
+USERS = 200
+DAYS = 365
+
+# A year of daily rows for each of USERS users, a tenth of them archived
+SEED = [
+    "INSERT INTO users (id, email, is_active, is_superuser, is_verified) "
+    "SELECT gen_random_uuid(), 'planner' || n || '@example.com', true, false, false "
+    f"FROM generate_series(1, {USERS}) AS n",
+    "INSERT INTO bank_account (id, user_id, name, archived, font_color_hex) "
+    "SELECT gen_random_uuid(), id, 'Checking', false, '#000000' FROM users "
+    "WHERE email LIKE 'planner%'",
+    "INSERT INTO bills (user_id, name, default_amount_due, archived) "
+    "SELECT id, 'Rent', 100, false FROM users WHERE email LIKE 'planner%'",
+    "INSERT INTO due_bills (id, user_id, bill, priority, due_date, min_amount_due, total_amount_due, archived) "
+    "SELECT gen_random_uuid(), bills.user_id, bills.id, n % 5, DATE '2026-01-01' + n, 100, 100, n % 10 = 0 "
+    f"FROM bills CROSS JOIN generate_series(0, {DAYS - 1}) AS n WHERE bills.name = 'Rent'",
+    "INSERT INTO bank_account_instance (user_id, bank_account, priority, due_date, current_balance, archived) "
+    "SELECT bank_account.user_id, bank_account.id, n % 5, DATE '2026-01-01' + n, 1000, n % 10 = 0 "
+    f"FROM bank_account CROSS JOIN generate_series(0, {DAYS - 1}) AS n WHERE bank_account.name = 'Checking'",
+    "ANALYZE users, bank_account, bills, due_bills, bank_account_instance",
+]
+
+# The dashboard's range scans: one user's unarchived rows in date order
+QUERIES = {
+    "due_bills": (
+        "SELECT id FROM due_bills "
+        "WHERE user_id = :user_id AND archived = false AND due_date BETWEEN :start AND :end "
+        "ORDER BY due_date, priority, id"
+    ),
+    "bank_account_instance": (
+        "SELECT id FROM bank_account_instance "
+        "WHERE user_id = :user_id AND archived = false AND due_date BETWEEN :start AND :end "
+        "ORDER BY due_date, priority, id"
+    ),
+}
+
+def _nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+@pytest.mark.parametrize("table", sorted(QUERIES))
+async def test_planner_picks_composite_index(db_session, table):
+    for statement in SEED:
+        await db_session.execute(text(statement))
+    user_id = await db_session.scalar(text("SELECT id FROM users WHERE email = 'planner1@example.com'"))
+
+    plan = await db_session.scalar(
+        text(f"EXPLAIN (FORMAT JSON) {QUERIES[table]}"),
+        {"user_id": user_id, "start": date(2026, 6, 1), "end": date(2026, 6, 30)},
+    )
+    nodes = list(_nodes(plan[0]["Plan"]))
+    assert any(
+        node["Node Type"] == "Index Scan" and node["Index Name"].endswith(f"{table}_user_due_date_priority")
+        for node in nodes
+    ), nodes
+    # The index order satisfies ORDER BY, so no separate sort is planned
+    assert all(node["Node Type"] != "Sort" for node in nodes), nodes
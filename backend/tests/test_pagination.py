@@ -0,0 +1,89 @@
+import base64
+import json
+from datetime import date
+from types import SimpleNamespace
+from typing import Optional
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Date, Integer, String
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from app.routers.pagination import PaginationMixin, decode_cursor, encode_cursor, partial_schema
+from app.schemas.base import BaseSchema
+
+class Base(DeclarativeBase):
+    pass
+
+class Widget(Base):
+    __tablename__ = "widget"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String)
+    due_date: Mapped[date] = mapped_column(Date)
+    notes: Mapped[Optional[str]] = mapped_column(String)
+
+class WidgetResponse(BaseSchema):
+    id: int
+    name: str
+    due_date: date
+    notes: Optional[str] = None
+    # On the schema but not a column, so it cannot be selected
+    label: Optional[str] = None
+
+class WidgetLister(PaginationMixin):
+    model = Widget
+    response_schema = WidgetResponse
+    sort_columns = [Widget.due_date, Widget.id]
+
+SORT_COLUMNS = [Widget.due_date, Widget.id]
+
+def test_cursor_round_trip():
+    row = SimpleNamespace(due_date=date(2028, 2, 29), id=42)
+    assert decode_cursor(encode_cursor(row, SORT_COLUMNS), SORT_COLUMNS) == [date(2028, 2, 29), 42]
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(SimpleNamespace(due_date=date(2026, 10, 17), id=1), SORT_COLUMNS)
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_=")
+
+def _cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    _cursor({"due_date": "2026-10-17"}),
+    _cursor(["2026-10-17"]),
+    _cursor(["2026-10-17", "1", "extra"]),
+    _cursor(["yesterday", "1"]),
+    _cursor(["2026-10-17", "one"]),
+])
+def test_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, SORT_COLUMNS)
+    assert error.value.status_code == 400
+
+def test_resolve_fields_selects_requested_and_sort_columns():
+    columns, schema = WidgetLister()._resolve_fields("name, id")
+    assert [column.key for column in columns] == ["id", "name", "due_date"]
+    # Schema order, and only the requested fields are required
+    assert list(schema.model_fields) == ["id", "name"]
+    item = schema.model_validate(SimpleNamespace(id=1, name="Rent", due_date=date(2026, 10, 1)))
+    assert item.model_dump() == {"id": 1, "name": "Rent"}
+
+def test_resolve_fields_reuses_schema_regardless_of_order_and_duplicates():
+    lister = WidgetLister()
+    _, first = lister._resolve_fields("name,id")
+    _, second = lister._resolve_fields("id,name,name,")
+    assert first is second
+
+@pytest.mark.parametrize("fields", ["name,secret", "label", " , "])
+def test_resolve_fields_rejects_unknown_or_empty(fields):
+    with pytest.raises(HTTPException) as error:
+        WidgetLister()._resolve_fields(fields)
+    assert error.value.status_code == 400
+
+def test_partial_schema_cache_is_bounded():
+    assert partial_schema.cache_info().maxsize is not None
+    # Rejected names never reach the cache
+    before = partial_schema.cache_info().currsize
+    for index in range(10):
+        with pytest.raises(HTTPException):
+            WidgetLister()._resolve_fields(f"name,unknown{index}")
+    assert partial_schema.cache_info().currsize == before
@@ -0,0 +1,58 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import accumulate
+from app.core.projection_series import AccountSeries
+
+def _series() -> AccountSeries:
+    series = AccountSeries(1, "Checking", "#000000")
+    series.balances.insert((date(2026, 10, 1), 0, 100), Decimal("1000.00"))
+    return series
+
+def test_project_running_balance():
+    series = _series()
+    series.upsert_bill(1, (date(2026, 10, 5), 0, 1), Decimal("100.00"))
+    series.upsert_bill(2, (date(2026, 10, 3), 0, 2), Decimal("50.00"))
+    projection = series.project(date(2026, 10, 1), date(2026, 10, 31))
+    assert [point["due_bill_id"] for point in projection["points"]] == [2, 1]
+    assert [point["balance"] for point in projection["points"]] == [Decimal("950.00"), Decimal("850.00")]
+    assert projection["ending_balance"] == Decimal("850.00")
+
+def test_project_from_latest_balance_before_start():
+    series = _series()
+    series.upsert_bill(1, (date(2026, 10, 5), 0, 1), Decimal("100.00"))
+    series.balances.insert((date(2026, 10, 10), 0, 101), Decimal("700.00"))
+    series.upsert_bill(2, (date(2026, 10, 15), 0, 2), Decimal("25.00"))
+    projection = series.project(date(2026, 10, 12), date(2026, 10, 31))
+    assert projection["as_of"] == date(2026, 10, 10)
+    # Bills before the baseline are already reflected in it
+    assert [(point["due_bill_id"], point["balance"]) for point in projection["points"]] == [
+        (2, Decimal("675.00")),
+    ]
+
+def test_project_without_baseline():
+    series = _series()
+    assert series.project(date(2026, 9, 1), date(2026, 9, 30)) is None
+
+def test_moving_and_removing_bills_recomputes_suffix():
+    series = _series()
+    for row_id in range(1, 6):
+        series.upsert_bill(row_id, (date(2026, 10, row_id), 0, row_id), Decimal(row_id))
+    # Move the last bill to the front, then drop one in the middle
+    series.upsert_bill(5, (date(2026, 9, 30), 0, 5), Decimal("10"))
+    series.discard_bill(3)
+    assert [key[2] for key in series.bills.keys] == [5, 1, 2, 4]
+    assert series.totals == [Decimal("10"), Decimal("11"), Decimal("13"), Decimal("17")]
+
+def test_random_edits_match_full_recompute():
+    randomizer = random.Random(20261017)
+    series = _series()
+    for _ in range(500):
+        row_id = randomizer.randrange(40)
+        if randomizer.random() < 0.3:
+            series.discard_bill(row_id)
+        else:
+            key = (date(2026, 10, 1) + timedelta(days=randomizer.randrange(60)), randomizer.randrange(3), row_id)
+            series.upsert_bill(row_id, key, Decimal(randomizer.randrange(1, 10000)) / 100)
+        assert series.bills.keys == sorted(series.bills.keys)
+        assert series.totals == list(accumulate(series.bills.amounts))
@@ -0,0 +1,80 @@
+import fakeredis
+import pytest
+from starlette.requests import Request
+from app.core.rate_limiter import RateLimiter
+from app.config import get_settings
+
+settings = get_settings()
+
+def _request(token: str = "token", ip: str = "203.0.113.7") -> Request:
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": headers,
+        "client": (ip, 1234),
+    })
+
+@pytest.fixture
+def redis():
+    return fakeredis.FakeAsyncRedis()
+
+@pytest.fixture
+def limiter(redis, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_USER", 3)
+    monkeypatch.setattr(settings, "RATE_LIMIT_IP", 5)
+    return RateLimiter(redis, window_seconds=60)
+
+async def test_counts_down_each_window(limiter):
+    result = await limiter.check_rate_limit(_request())
+    assert result.allowed
+    assert [(window.scope, window.limit, window.remaining) for window in result.windows] == [
+        ("user", 3, 2),
+        ("ip", 5, 4),
+    ]
+    assert result.headers()["X-RateLimit-Remaining"] == "2"
+    assert "Retry-After" not in result.headers()
+
+async def test_blocks_at_limit_with_retry_after(limiter):
+    for _ in range(3):
+        assert (await limiter.check_rate_limit(_request())).allowed
+    result = await limiter.check_rate_limit(_request())
+    assert not result.allowed
+    assert [window.scope for window in result.exceeded] == ["user"]
+    headers = result.headers()
+    assert headers["X-RateLimit-Limit"] == "3"
+    assert headers["X-RateLimit-Remaining"] == "0"
+    assert 1 <= int(headers["Retry-After"]) <= 60
+
+async def test_rejected_requests_are_not_recorded(limiter, redis):
+    for _ in range(6):
+        await limiter.check_rate_limit(_request())
+    # Only the three allowed requests count, in every window
+    ip_keys = [key async for key in redis.scan_iter("rate_limit:ip:*")]
+    user_keys = [key async for key in redis.scan_iter("rate_limit:user:*")]
+    assert await redis.zcard(ip_keys[0]) == 3
+    assert await redis.zcard(user_keys[0]) == 3
+
+async def test_ip_window_is_shared_across_users(limiter):
+    for index in range(5):
+        assert (await limiter.check_rate_limit(_request(token=f"user-{index}"))).allowed
+    result = await limiter.check_rate_limit(_request(token="user-5"))
+    assert not result.allowed
+    assert [window.scope for window in result.exceeded] == ["ip"]
+
+async def test_anonymous_requests_use_ip_only(limiter):
+    result = await limiter.check_rate_limit(_request(token=""))
+    assert [window.scope for window in result.windows] == ["ip"]
+
+async def test_tokens_are_hashed_in_keys(limiter, redis):
+    await limiter.check_rate_limit(_request(token="secret-token"))
+    keys = [key.decode() async for key in redis.scan_iter("rate_limit:user:*")]
+    assert keys and all("secret-token" not in key for key in keys)
+
+async def test_fails_open_without_redis():
+    server = fakeredis.FakeServer()
+    server.connected = False
+    limiter = RateLimiter(fakeredis.FakeAsyncRedis(server=server), window_seconds=60)
+    assert await limiter.check_rate_limit(_request()) is None
+    assert limiter.errors == 1
@@ -0,0 +1,76 @@
+from datetime import date
+import pytest
+from app.core.recurrence_rules import (
+    RecurrenceError,
+    RecurrenceRule,
+    compile_calculation,
+    parse_calculation,
+)
+
+def test_month_end_anchor_clamps_and_recovers():
+    rule = RecurrenceRule("months", 1)
+    anchor = date(2027, 1, 31)
+    assert [rule.occurrence(anchor, index) for index in range(4)] == [
+        date(2027, 1, 31),
+        date(2027, 2, 28),
+        date(2027, 3, 31),
+        date(2027, 4, 30),
+    ]
+
+def test_month_end_in_leap_year():
+    rule = RecurrenceRule("months", 1)
+    assert rule.occurrence(date(2028, 1, 31), 1) == date(2028, 2, 29)
+    assert rule.occurrence(date(2028, 1, 30), 1) == date(2028, 2, 29)
+
+def test_yearly_leap_day_anchor():
+    rule = parse_calculation("annually")
+    anchor = date(2024, 2, 29)
+    assert list(rule.expand(anchor, anchor, date(2028, 12, 31))) == [
+        date(2025, 2, 28),
+        date(2026, 2, 28),
+        date(2027, 2, 28),
+        date(2028, 2, 29),
+    ]
+
+def test_expand_is_exclusive_of_after_and_inclusive_of_through():
+    rule = parse_calculation("weekly")
+    anchor = date(2026, 10, 5)
+    assert list(rule.expand(anchor, date(2026, 10, 12), date(2026, 10, 26))) == [
+        date(2026, 10, 19),
+        date(2026, 10, 26),
+    ]
+
+def test_expand_resumes_mid_series():
+    rule = parse_calculation("quarterly")
+    anchor = date(2025, 11, 30)
+    assert list(rule.expand(anchor, date(2026, 5, 30), date(2026, 12, 1))) == [
+        date(2026, 8, 30),
+        date(2026, 11, 30),
+    ]
+
+def test_next_after():
+    rule = parse_calculation("monthly")
+    assert rule.next_after(date(2026, 1, 31), date(2026, 2, 28)) == date(2026, 3, 31)
+
+@pytest.mark.parametrize("calculation, recurrence_value, expected", [
+    ("daily", None, RecurrenceRule("days", 1)),
+    ("Biweekly ", None, RecurrenceRule("days", 14)),
+    ("n_weeks", 3, RecurrenceRule("days", 21)),
+    ("n_years", 2, RecurrenceRule("months", 24)),
+    ("2 months", None, RecurrenceRule("months", 2)),
+    ("1 year", None, RecurrenceRule("months", 12)),
+])
+def test_parse_calculation(calculation, recurrence_value, expected):
+    assert parse_calculation(calculation, recurrence_value) == expected
+
+@pytest.mark.parametrize("calculation", [None, "", "fortnightly", "0 days", "-1 weeks", "2 decades"])
+def test_unknown_calculations(calculation):
+    with pytest.raises(RecurrenceError):
+        compile_calculation(calculation)
+
+def test_value_calculation_requires_positive_value():
+    compiled = compile_calculation("n_days")
+    with pytest.raises(RecurrenceError):
+        compiled.rule(None)
+    with pytest.raises(RecurrenceError):
+        compiled.rule(0)
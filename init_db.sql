@@ -17,7 +17,7 @@ CREATE TABLE encryption_keys (
     is_active BOOLEAN DEFAULT TRUE
 );
 
--- Create audit logging function
+-- Create audit logging function (per-field mode: one audit_log row per changed column)
 CREATE OR REPLACE FUNCTION log_changes()
 RETURNS TRIGGER AS $$
 DECLARE
@@ -82,6 +82,49 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Single-row audit mode: one audit_change row per change with a JSONB diff
+-- of the changed fields. The column set comes from to_jsonb() of the row,
+-- so nothing is looked up in information_schema; trigger arguments name
+-- columns to leave out.
+CREATE OR REPLACE FUNCTION log_changes_jsonb()
+RETURNS TRIGGER AS $$
+DECLARE
+    old_row JSONB;
+    new_row JSONB;
+    source JSONB;
+    diff JSONB;
+BEGIN
+    IF (TG_OP <> 'INSERT') THEN
+        old_row := to_jsonb(OLD);
+    END IF;
+    IF (TG_OP <> 'DELETE') THEN
+        new_row := to_jsonb(NEW);
+    END IF;
+    source := COALESCE(new_row, old_row);
+
+    SELECT jsonb_object_agg(key, jsonb_build_array(old_row -> key, new_row -> key))
+      INTO diff
+      FROM jsonb_object_keys(source) AS key
+     WHERE key <> ALL (TG_ARGV)
+       AND (old_row -> key) IS DISTINCT FROM (new_row -> key);
+
+    -- Updates touching only excluded columns are not recorded
+    IF diff IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO audit_change (user_id, table_name, row_id, action, changes)
+    VALUES (
+        (CASE WHEN TG_TABLE_NAME = 'users' THEN source ->> 'id' ELSE source ->> 'user_id' END)::uuid,
+        TG_TABLE_NAME,
+        source ->> 'id',
+        CASE TG_OP WHEN 'INSERT' THEN 'add' WHEN 'UPDATE' THEN 'update' ELSE 'delete' END,
+        diff
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
 -- Create tables
 CREATE TABLE "user" (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -189,6 +232,16 @@ CREATE TABLE bank_account_instance (
     current_balance DECIMAL(10,2) NOT NULL
 );
 
+-- Paid due bills already deducted by the balance job; one row per bill
+CREATE TABLE applied_payment (
+    id SMALLINT PRIMARY KEY REFERENCES due_bills(id),
+    user_id UUID NOT NULL REFERENCES "user"(id),
+    bank_account SMALLINT NOT NULL REFERENCES bank_account(id),
+    amount DECIMAL(10,2) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
 CREATE TABLE audit_log (
     id SERIAL PRIMARY KEY,
     user_id UUID NOT NULL REFERENCES "user"(id),
@@ -201,46 +254,93 @@ CREATE TABLE audit_log (
     timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Create triggers for all tables except audit_log
+-- Changes as JSONB diffs: [value_before, value_after] per changed field
+CREATE TABLE audit_change (
+    id BIGSERIAL PRIMARY KEY,
+    user_id UUID NOT NULL,
+    table_name VARCHAR(50) NOT NULL,
+    row_id VARCHAR(64) NOT NULL,
+    action VARCHAR(20) NOT NULL CHECK (action IN ('add', 'update', 'delete')),
+    changes JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Scheduled job runs; (job_name, scheduled_for) claims a cron slot fleet-wide
+CREATE TABLE job_run (
+    id BIGSERIAL PRIMARY KEY,
+    job_name VARCHAR(100) NOT NULL,
+    scheduled_for TIMESTAMP WITH TIME ZONE NOT NULL,
+    started_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    finished_at TIMESTAMP WITH TIME ZONE,
+    duration_ms INTEGER,
+    status VARCHAR(20) NOT NULL CHECK (status IN ('running', 'succeeded', 'failed', 'timeout', 'abandoned')),
+    error TEXT,
+    worker VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT uq_job_run_job_scheduled UNIQUE (job_name, scheduled_for)
+);
+
+-- Durable background job queue, claimed with FOR UPDATE SKIP LOCKED
+CREATE TABLE job (
+    id BIGSERIAL PRIMARY KEY,
+    job_type VARCHAR(100) NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'succeeded', 'dead')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    started_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE,
+    locked_until TIMESTAMP WITH TIME ZONE,
+    locked_by VARCHAR(255),
+    last_error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Create triggers for all tables except the audit tables (single-row mode;
+-- switch to log_changes() for per-field audit_log rows)
 CREATE TRIGGER log_user_changes
     AFTER INSERT OR UPDATE OR DELETE ON "users"
-    FOR EACH ROW EXECUTE FUNCTION log_changes();
+    FOR EACH ROW EXECUTE FUNCTION log_changes_jsonb('id', 'created_at', 'updated_at', 'hashed_password', 'mfa_secret');
 
 CREATE TRIGGER log_api_token_changes
     AFTER INSERT OR UPDATE OR DELETE ON api_token
-    FOR EACH ROW EXECUTE FUNCTION log_changes();
+    FOR EACH ROW EXECUTE FUNCTION log_changes_jsonb('id', 'created_at', 'updated_at', 'token');
 
 CREATE TRIGGER log_oauth_account_changes
     AFTER INSERT OR UPDATE OR DELETE ON oauth_account
-    FOR EACH ROW EXECUTE FUNCTION log_changes();
+    FOR EACH ROW EXECUTE FUNCTION log_changes_jsonb('id', 'created_at', 'updated_at');
 
 CREATE TRIGGER log_bill_status_changes
     AFTER INSERT OR UPDATE OR DELETE ON bill_status
-    FOR EACH ROW EXECUTE FUNCTION log_changes();
+    FOR EACH ROW EXECUTE FUNCTION log_changes_jsonb('id', 'created_at', 'updated_at');
 
 CREATE TRIGGER log_recurrence_changes
     AFTER INSERT OR UPDATE OR DELETE ON recurrence
-    FOR EACH ROW EXECUTE FUNCTION log_changes();
+    FOR EACH ROW EXECUTE FUNCTION log_changes_jsonb('id', 'created_at', 'updated_at');
 
 CREATE TRIGGER log_category_changes
     AFTER INSERT OR UPDATE OR DELETE ON category
-    FOR EACH ROW EXECUTE FUNCTION log_changes();
+    FOR EACH ROW EXECUTE FUNCTION log_changes_jsonb('id', 'created_at', 'updated_at');
 
 CREATE TRIGGER log_bank_account_changes
     AFTER INSERT OR UPDATE OR DELETE ON bank_account
-    FOR EACH ROW EXECUTE FUNCTION log_changes();
+    FOR EACH ROW EXECUTE FUNCTION log_changes_jsonb('id', 'created_at', 'updated_at');
 
 CREATE TRIGGER log_bills_changes
     AFTER INSERT OR UPDATE OR DELETE ON bills
-    FOR EACH ROW EXECUTE FUNCTION log_changes();
+    FOR EACH ROW EXECUTE FUNCTION log_changes_jsonb('id', 'created_at', 'updated_at');
 
 CREATE TRIGGER log_due_bills_changes
     AFTER INSERT OR UPDATE OR DELETE ON due_bills
-    FOR EACH ROW EXECUTE FUNCTION log_changes();
+    FOR EACH ROW EXECUTE FUNCTION log_changes_jsonb('id', 'created_at', 'updated_at');
 
 CREATE TRIGGER log_bank_account_instance_changes
     AFTER INSERT OR UPDATE OR DELETE ON bank_account_instance
-    FOR EACH ROW EXECUTE FUNCTION log_changes();
+    FOR EACH ROW EXECUTE FUNCTION log_changes_jsonb('id', 'created_at', 'updated_at');
 
 -- Create indexes
 CREATE INDEX idx_api_token_user_id ON api_token(user_id);
@@ -260,19 +360,29 @@ CREATE INDEX idx_bills_default_draft_account ON bills(default_draft_account);
 CREATE INDEX idx_bills_category ON bills(category);
 CREATE INDEX idx_due_bills_user_id ON due_bills(user_id);
 CREATE INDEX idx_due_bills_bill ON due_bills(bill);
+-- One occurrence per bill and date; recurrence expansion inserts ON CONFLICT DO NOTHING
+CREATE UNIQUE INDEX uq_due_bills_bill_due_date ON due_bills(bill, due_date);
+CREATE INDEX idx_due_bills_paid_updated_at ON due_bills(updated_at) WHERE pay_date IS NOT NULL;
 CREATE INDEX idx_due_bills_recurrence ON due_bills(recurrence);
-CREATE INDEX idx_due_bills_due_date ON due_bills(due_date);
 CREATE INDEX idx_due_bills_pay_date ON due_bills(pay_date);
 CREATE INDEX idx_due_bills_status ON due_bills(status);
 CREATE INDEX idx_due_bills_draft_account ON due_bills(draft_account);
-CREATE INDEX idx_due_bills_priority ON due_bills(priority);
 CREATE INDEX idx_bank_account_instance_user_id ON bank_account_instance(user_id);
 CREATE INDEX idx_bank_account_instance_bank_account ON bank_account_instance(bank_account);
-CREATE INDEX idx_bank_account_instance_due_date ON bank_account_instance(due_date);
 CREATE INDEX idx_bank_account_instance_pay_date ON bank_account_instance(pay_date);
 CREATE INDEX idx_bank_account_instance_status ON bank_account_instance(status);
-CREATE INDEX idx_bank_account_instance_priority ON bank_account_instance(priority);
+-- Dashboard and list queries filter active rows per user, ordered by date and priority
+CREATE INDEX idx_due_bills_user_due_date_priority ON due_bills(user_id, due_date, priority, id) WHERE archived = FALSE;
+CREATE INDEX idx_bank_account_instance_user_due_date_priority ON bank_account_instance(user_id, due_date, priority, id) WHERE archived = FALSE;
+CREATE INDEX idx_applied_payment_user_id ON applied_payment(user_id);
+CREATE INDEX idx_audit_change_user_id ON audit_change(user_id);
+CREATE INDEX idx_audit_change_table_row ON audit_change(table_name, row_id, created_at);
+CREATE INDEX idx_audit_change_created_at ON audit_change(created_at);
 CREATE INDEX idx_audit_log_user_id ON audit_log(user_id);
 CREATE INDEX idx_audit_log_table_name ON audit_log(table_name);
 CREATE INDEX idx_audit_log_row_id ON audit_log(row_id);
 CREATE INDEX idx_audit_log_timestamp ON audit_log(timestamp);
+CREATE INDEX idx_job_run_job_started ON job_run(job_name, started_at);
+CREATE INDEX idx_job_queued_run_at ON job(run_at) WHERE status = 'queued';
+CREATE INDEX idx_job_running_locked_until ON job(locked_until) WHERE status = 'running';
+CREATE INDEX idx_job_type_finished_at ON job(job_type, finished_at);